@@ -3,37 +3,45 @@
 # =======================
 
 import os
+import re
+import sys
+import bisect
+import copy
+import time
+import contextlib
+import hashlib
+import itertools
+import weakref
+import functools
 import datetime
+import threading
+from collections import Counter, OrderedDict
 from io import BytesIO
 
 import numpy as np
 import pandas as pd
 import streamlit as st
-import matplotlib.pyplot as plt
 
-from reportlab.lib import colors
+# matplotlib, the ReportLab layout engine and difflib are imported inside the
+# stages that use them, so a cold start only pays for pandas + Streamlit
 from reportlab.lib.pagesizes import A3, landscape
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
-from reportlab.platypus import (
-    SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Flowable,
-    Image, KeepInFrame
-)
 
 # ─────────────────────────────────────────────────────────────────────────────
 # GLOBAL CONSTANTS / SETTINGS
 # ─────────────────────────────────────────────────────────────────────────────
-st.set_page_config(page_title="TNXL MIAMI Report", layout="wide")
 
-styles = getSampleStyleSheet()
 HEADER_HEIGHT = 1.85 * inch
 LOGO_RATIO = 3.0 / 3.7
 LOGO_SIZE  = HEADER_HEIGHT * LOGO_RATIO
 BAR_WIDTH  = 80
+CHART_SIZE = 205  # heatmap / spray chart, side by side in the right column
 BAR_HEIGHT = 8
 
-DATABASE_FILENAME = "player_database.csv"
-NOTES_FILENAME    = "scout_notes.csv"
+DATABASE_FILENAME   = "player_database.csv"
+NOTES_FILENAME      = "scout_notes.csv"
+THRESHOLDS_FILENAME = "thresholds.csv"
+LOGO_FILENAME       = "TNXL Miami - Updated Logo.png"  # put logo in repo root for Streamlit Cloud
 
 AGE_LABELS = [
     "youth (12–13)",
@@ -48,15 +56,6 @@ LOWER_IS_BETTER = {
     "Time to Contact (sec)",
 }
 
-# ─────────────────────────────────────────────────────────────────────────────
-# SESSION BOOTSTRAP FOR NOTES
-# ─────────────────────────────────────────────────────────────────────────────
-if "notes_df" not in st.session_state:
-    if os.path.exists(NOTES_FILENAME):
-        st.session_state.notes_df = pd.read_csv(NOTES_FILENAME, parse_dates=["Date"])
-    else:
-        st.session_state.notes_df = pd.DataFrame(columns=["Name", "Date", "Note"])
-
 # ─────────────────────────────────────────────────────────────────────────────
 # THRESHOLDS
 # ─────────────────────────────────────────────────────────────────────────────
@@ -92,6 +91,17 @@ def flatten_thresholds(thr: dict, *, pad_factor: float = 0.1) -> pd.DataFrame:
             })
     return pd.DataFrame(rows)
 
+def unflatten_thresholds(df: pd.DataFrame) -> dict:
+    thr = {}
+    for g, m, lo, mid, hi in zip(df["Age Group"], df["Metric"],
+                                 df["below_avg"], df["avg"], df["above_avg"]):
+        thr.setdefault(g, {})[m] = {
+            "below_avg": float(lo),
+            "avg":       float(mid),
+            "above_avg": float(hi),
+        }
+    return thr
+
 metric_thresholds = {
     "Plane Score": {"above_avg": 70, "avg":60,"below_avg":40},
     "Connection Score":{"above_avg": 70, "avg":60,"below_avg":40},
@@ -117,24 +127,29 @@ metric_thresholds = {
     "Lumbar":   {"above_avg":4, "avg":3, "below_avg":1},
 }
 
-if "thresholds" not in st.session_state:
-    st.session_state["thresholds"] = broadcast_metrics_to_ages(metric_thresholds)
-
 # ─────────────────────────────────────────────────────────────────────────────
 # AGE GROUPING + HELPERS
 # ─────────────────────────────────────────────────────────────────────────────
-age_groups = {
-    "youth (12–13)":   lambda age: 12 <= age <= 13,
-    "jv (14–15)":      lambda age: 14 <= age <= 15,
-    "varsity (16–18)": lambda age: 16 <= age <= 18,
-    "college (18+)":   lambda age: age >= 18,
-}
-
-def get_group(age: int) -> str:
-    for grp, fn in age_groups.items():
-        if fn(age):
-            return grp
-    return "unknown"
+# Half-open bins aligned with AGE_LABELS: [12,14) youth, [14,16) jv,
+# [16,19) varsity, 19+ college (an 18-year-old stays varsity).
+AGE_BINS = [12, 14, 16, 19, np.inf]
+
+def derive_ages(player_db: pd.DataFrame, as_of) -> pd.DataFrame:
+    """Recompute ``Age`` and ``Age Group`` from ``DOB`` as of *as_of* in one pass.
+
+    Rows whose DOB cannot be parsed keep their stored ``Age``. Both columns are
+    always present (an empty roster or one without DOBs gets them typed, with
+    ages missing and the group "unknown"), so every caller sees one schema.
+    """
+    as_of = pd.Timestamp(as_of)
+    dob   = pd.to_datetime(player_db["DOB"] if "DOB" in player_db.columns else
+                           pd.Series(pd.NaT, index=player_db.index), errors="coerce")
+    before_bday = (dob.dt.month > as_of.month) | ((dob.dt.month == as_of.month) & (dob.dt.day > as_of.day))
+    age = as_of.year - dob.dt.year - before_bday.astype(int)
+    if "Age" in player_db.columns:
+        age = age.fillna(pd.to_numeric(player_db["Age"], errors="coerce"))
+    group = pd.cut(age, AGE_BINS, right=False, labels=AGE_LABELS).astype(object).fillna("unknown")
+    return player_db.assign(**{"Age": age.round().astype("Int64"), "Age Group": group})
 
 def order_cuts(metric, lo, mid, hi):
     if metric in LOWER_IS_BETTER:
@@ -152,11 +167,10 @@ def order_cuts(metric, lo, mid, hi):
     )
 
 # ─────────────────────────────────────────────────────────────────────────────
-# COLOR SCHEME FOR BARS (uses session thresholds)
+# COLOR SCHEME FOR BARS (uses the report's thresholds)
 # ─────────────────────────────────────────────────────────────────────────────
-def get_bar_color(metric_name: str, value: float, age_group: str) -> str:
-    all_th = st.session_state.get("thresholds", {})
-    thr = all_th.get(age_group, {}).get(metric_name)
+def get_bar_color(metric_name: str, value: float, age_group: str, thresholds: dict) -> str:
+    thr = thresholds.get(age_group, {}).get(metric_name)
     if not thr or value is None:
         return "#7f8c8d"  # gray
 
@@ -178,38 +192,46 @@ def get_bar_color(metric_name: str, value: float, age_group: str) -> str:
 # ─────────────────────────────────────────────────────────────────────────────
 # REPORTLAB VISUAL WIDGETS
 # ─────────────────────────────────────────────────────────────────────────────
-class RangeBar(Flowable):
-    def __init__(self, value, min_value, max_value, width=100, height=6,
-                 fill_color=colors.grey, handle_radius=3, show_range=True):
-        super().__init__()
-        self.value         = value
-        self.min_value     = min_value
-        self.max_value     = max_value
-        self.width         = width
-        self.height        = height
-        self.fill_color    = fill_color
-        self.handle_radius = handle_radius
-        self.show_range    = show_range
-
-    def draw(self):
-        c = self.canv
-        x, y = 0, self.height/2
-        c.setStrokeColor(colors.lightgrey)
-        c.setLineWidth(self.height/3)
-        c.line(x, y, x + self.width, y)
-
-        pct = 0
-        if self.max_value > self.min_value:
-            pct = (self.value - self.min_value) / (self.max_value - self.min_value)
-            pct = max(0, min(pct, 1))
-        filled_width = pct * self.width
-
-        c.setStrokeColor(self.fill_color)
-        c.setLineWidth(self.height/3)
-        c.line(x, y, x + filled_width, y)
-
-        c.setFillColor(self.fill_color)
-        c.circle(x + filled_width, y, self.handle_radius, stroke=0, fill=1)
+@functools.lru_cache(maxsize=None)
+def range_bar_flowable():
+    """The ``RangeBar`` Flowable class, defined on first use so ReportLab loads lazily."""
+    from reportlab.lib import colors
+    from reportlab.platypus import Flowable
+
+    class RangeBar(Flowable):
+        def __init__(self, value, min_value, max_value, width=100, height=6,
+                     fill_color=None, handle_radius=3, show_range=True):
+            super().__init__()
+            self.value         = value
+            self.min_value     = min_value
+            self.max_value     = max_value
+            self.width         = width
+            self.height        = height
+            self.fill_color    = colors.grey if fill_color is None else fill_color
+            self.handle_radius = handle_radius
+            self.show_range    = show_range
+
+        def draw(self):
+            c = self.canv
+            x, y = 0, self.height/2
+            c.setStrokeColor(colors.lightgrey)
+            c.setLineWidth(self.height/3)
+            c.line(x, y, x + self.width, y)
+
+            pct = 0
+            if self.max_value > self.min_value:
+                pct = (self.value - self.min_value) / (self.max_value - self.min_value)
+                pct = max(0, min(pct, 1))
+            filled_width = pct * self.width
+
+            c.setStrokeColor(self.fill_color)
+            c.setLineWidth(self.height/3)
+            c.line(x, y, x + filled_width, y)
+
+            c.setFillColor(self.fill_color)
+            c.circle(x + filled_width, y, self.handle_radius, stroke=0, fill=1)
+
+    return RangeBar
 
 # ─────────────────────────────────────────────────────────────────────────────
 # CSV READ / UTILS
@@ -222,7 +244,37 @@ def smart_read_csv(file_obj, **read_kwargs):
             return pd.read_csv(file_obj, encoding=enc, **read_kwargs) if enc else pd.read_csv(file_obj, **read_kwargs)
         except (UnicodeDecodeError, EmptyDataError, ParserError):
             continue
-    raise UnicodeDecodeError("Unable to decode file with common encodings.")
+    raise ValueError("not a readable CSV (tried utf-8, cp1252 and latin-1)")
+
+# pandas' C tokenizer releases the GIL, so parses can overlap on threads when
+# there are cores to run them; bench_uploads.py times the pool against one-by-one.
+UPLOAD_PARSE_WORKERS = 4
+
+@st.cache_resource
+def upload_parse_pool():
+    """Process-wide pool, so concurrent sessions share one bound on parser threads."""
+    from concurrent.futures import ThreadPoolExecutor
+    return ThreadPoolExecutor(max_workers=UPLOAD_PARSE_WORKERS, thread_name_prefix="upload-csv")
+
+def read_upload_csv(data: bytes) -> pd.DataFrame:
+    if not data.strip():
+        return pd.DataFrame()
+    return smart_read_csv(BytesIO(data))
+
+def read_uploads(files: dict, pool=None):
+    """Parse ``{source: csv bytes}`` concurrently → ``(frames, errors)`` keyed by source.
+
+    A file that cannot be read has no frame; its message is in *errors*.
+    """
+    pool = pool or upload_parse_pool()
+    futures = {src: pool.submit(read_upload_csv, data) for src, data in files.items()}
+    frames, errors = {}, {}
+    for src, fut in futures.items():
+        try:
+            frames[src] = fut.result()
+        except Exception as e:
+            errors[src] = str(e) or type(e).__name__
+    return frames, errors
 
 def safe_float(val):
     try:
@@ -230,39 +282,83 @@ def safe_float(val):
     except:
         return None
 
+# Blast exports: names are assigned per session / device group instead of per swing
+BLAST_GROUP_COLUMNS = ["Session ID", "Session", "Device ID", "Device", "Sensor ID", "Sensor", "Equipment", "Date"]
+BLANK_GROUP = "(blank)"
+BLAST_MAX_GROUPS = 200  # other columns qualify as a grouping only below this many distinct values
+
+def blast_group_options(df) -> list:
+    """Session / device columns first, then any other non-measurement column that
+    actually groups swings (fewer distinct values than rows, at most BLAST_MAX_GROUPS)."""
+    group_cols = [c for c in BLAST_GROUP_COLUMNS if c in df.columns]
+    other = [c for c in df.columns if c not in group_cols and c != "Name"
+             and not pd.api.types.is_float_dtype(df[c]) and df[c].nunique(dropna=False) <= min(BLAST_MAX_GROUPS, len(df) - 1)]
+    return group_cols + other
+
+def blast_group_keys(df, by) -> pd.Series:
+    return df[by].astype(str).where(df[by].notna(), BLANK_GROUP)
+
+def blast_name_groups(df, by) -> pd.DataFrame:
+    """One row per *by* value: swing count and the name, if every swing already has the same one."""
+    keys  = blast_group_keys(df, by)
+    names = df["Name"].astype(str).str.strip().replace({"": np.nan, "nan": np.nan})
+    agg   = names.groupby(keys).agg(["first", "nunique", "count", "size"])
+    out = pd.DataFrame({
+        "Swings": agg["size"],
+        "Name":   agg["first"].where((agg["nunique"] == 1) & (agg["count"] == agg["size"])),
+    }).fillna({"Name": ""})
+    return out.rename_axis(by).reset_index()
+
+def apply_group_names(df, by, groups) -> pd.DataFrame:
+    """Set ``Name`` on every row from the per-group grid; blank entries keep existing names."""
+    # a cleared SelectboxColumn cell comes back as None: blank, not the name "None"
+    mapping = groups.set_index(groups[by].astype(str))["Name"].fillna("").astype(str).str.strip()
+    names   = blast_group_keys(df, by).map(mapping[mapping != ""])
+    return df.assign(Name=names.fillna(df["Name"]))
+
 # ─────────────────────────────────────────────────────────────────────────────
 # PDF HEADER + DECOR
 # ─────────────────────────────────────────────────────────────────────────────
-styles.add(ParagraphStyle(
-    name="HeaderWhite",
-    parent=styles["Heading1"],
-    textColor=colors.white,
-    fontSize=24,
-    leading=28,
-))
-styles.add(ParagraphStyle(
-    name="SubheaderWhite",
-    parent=styles["Heading2"],
-    textColor=colors.white,
-    fontSize=16,
-    leading=20,
-))
-styles.add(ParagraphStyle(
-    name="ProgramTitle",
-    parent=styles["Heading2"],
-    textColor=colors.white,
-    fontSize=18,
-    leading=22,
-))
-styles.add(ParagraphStyle(
-    name="AssessmentDate",
-    parent=styles["Normal"],
-    textColor=colors.white,
-    fontSize=12,
-    leading=14,
-))
+@functools.lru_cache(maxsize=None)
+def pdf_styles():
+    """Sample stylesheet plus the report's header styles, built on the first PDF."""
+    from reportlab.lib import colors
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+
+    styles = getSampleStyleSheet()
+    styles.add(ParagraphStyle(
+        name="HeaderWhite",
+        parent=styles["Heading1"],
+        textColor=colors.white,
+        fontSize=24,
+        leading=28,
+    ))
+    styles.add(ParagraphStyle(
+        name="SubheaderWhite",
+        parent=styles["Heading2"],
+        textColor=colors.white,
+        fontSize=16,
+        leading=20,
+    ))
+    styles.add(ParagraphStyle(
+        name="ProgramTitle",
+        parent=styles["Heading2"],
+        textColor=colors.white,
+        fontSize=18,
+        leading=22,
+    ))
+    styles.add(ParagraphStyle(
+        name="AssessmentDate",
+        parent=styles["Normal"],
+        textColor=colors.white,
+        fontSize=12,
+        leading=14,
+    ))
+    return styles
 
 def draw_header_bg(canvas, doc):
+    from reportlab.lib import colors
+
     w, h = doc.pagesize
     header_h = HEADER_HEIGHT
     x0 = doc.leftMargin + doc.width * 0.20
@@ -278,6 +374,15 @@ def draw_header_bg(canvas, doc):
     canvas.drawPath(path, fill=1, stroke=0)
     canvas.restoreState()
 
+@functools.lru_cache(maxsize=None)
+def logo_bytes(path) -> bytes:
+    """The logo file, read once per process (b"" when it is missing)."""
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except OSError:
+        return b""
+
 def build_header_with_logo_and_player_info(
     logo_path,
     player_info,
@@ -286,7 +391,13 @@ def build_header_with_logo_and_player_info(
     info_style=None,
     program_style=None,
     date_style=None,
+    profile="standard",
 ):
+    from reportlab.lib import colors
+    from reportlab.lib.styles import ParagraphStyle
+    from reportlab.platypus import Image, Paragraph, Spacer, Table, TableStyle
+
+    styles = pdf_styles()
     name_style = name_style or ParagraphStyle(
         name="HeaderSmall",
         parent=styles["HeaderWhite"],
@@ -320,8 +431,8 @@ def build_header_with_logo_and_player_info(
         textColor=colors.white
     )
 
-    if os.path.exists(logo_path):
-        logo = Image(logo_path, width=LOGO_SIZE, height=LOGO_SIZE)
+    if logo_bytes(logo_path):
+        logo = Image(BytesIO(logo_image_bytes(logo_path, profile)), width=LOGO_SIZE, height=LOGO_SIZE)
     else:
         logo = Paragraph("LOGO MISSING", info_style)
 
@@ -370,159 +481,942 @@ def build_header_with_logo_and_player_info(
     return tbl
 
 # ─────────────────────────────────────────────────────────────────────────────
-# METRIC CALCULATIONS
+# METRIC COLUMNS
 # ─────────────────────────────────────────────────────────────────────────────
-def calculate_blast_metrics(df):
-    cols = [c for c in df.columns if c.lower() in {
-        "plane score","connection score","rotation score","bat speed (mph)",
-        "rotational acceleration (g)","on plane efficiency (%)","attack angle (deg)",
-        "early connection (deg)","connection at impact (deg)","vertical bat angle (deg)",
-        "power (kw)","time to contact (sec)","peak hand speed (mph)"
-    }]
-    if not cols:
-        return {},{}
-    avgs = df[cols].mean().to_dict()
-    rngs = {c:(df[c].min(),df[c].max()) for c in cols}
-    return avgs, rngs
+BLAST_METRIC_KEYS = {
+    "plane score","connection score","rotation score","bat speed (mph)",
+    "rotational acceleration (g)","on plane efficiency (%)","attack angle (deg)",
+    "early connection (deg)","connection at impact (deg)","vertical bat angle (deg)",
+    "power (kw)","time to contact (sec)","peak hand speed (mph)"
+}
 
-def calculate_throwing_velocities(df):
-    if df is None:
-        return {}
-    out = {}
-    for col in df.columns:
-        if "velocity" in col.lower():
-            vals = pd.to_numeric(df[col], errors="coerce").dropna()
-            if not vals.empty:
-                out[col] = float(vals.mean())
+DYNAMO_NUMERIC_COLUMNS = [
+    "ROM Asymmetry (%)","Force Asymmetry (%)",
+    "L Max ROM (°)","R Max ROM (°)",
+    "L Max Force (N)","R Max Force (N)",
+]
+
+# ─────────────────────────────────────────────────────────────────────────────
+# BATTED-BALL TRAJECTORIES (Hit_Poly_X/Y/Z, evaluated for all balls at once)
+# ─────────────────────────────────────────────────────────────────────────────
+# Flightscope stores each coordinate as a quartic in time, "c0;c1;c2;c3;c4"
+# (feet, t in seconds from contact): X lateral, Y toward centre field, Z up.
+POLY_DEGREE = 4
+TRAJ_T_MAX  = 10.0  # s, longest flight considered
+TRAJ_DT     = 0.05  # s, coarse grid; the landing time is then interpolated
+TRAJ_CHUNK  = 8192  # balls per batch, bounds the (balls × grid) work arrays
+
+TRAJECTORY_COLUMNS = ["Land_X", "Land_Y", "Carry", "Apex", "Hang_Time", "Spray_Angle"]
+
+def parse_poly_coeffs(col: pd.Series, n: int = POLY_DEGREE + 1) -> np.ndarray:
+    """'a;b;c;d;e' strings → (len, n) float array; rows with fewer than *n* numbers are NaN."""
+    text  = col.astype(str)
+    seps  = text.str.count(";").to_numpy()
+    out   = np.full((len(text), n), np.nan)
+    exact = seps == n - 1
+    if exact.any():
+        # common case: one float parse over all well-formed rows at once
+        try:
+            out[exact] = np.array(";".join(text[exact]).split(";"), dtype=float).reshape(-1, n)
+        except ValueError:
+            exact[:] = False
+    rest = ~exact & (seps >= n - 1)
+    if rest.any():
+        parts = text[rest].str.split(";", expand=True).iloc[:, :n]
+        out[rest] = parts.apply(lambda c: pd.to_numeric(c.str.strip(), errors="coerce")).to_numpy(dtype=float)
+    out[np.isnan(out).any(axis=1)] = np.nan
+    return out
+
+def poly_eval(coeffs: np.ndarray, t: np.ndarray) -> np.ndarray:
+    """Horner evaluation; *t* broadcasts against one coefficient row per ball."""
+    out = coeffs[:, -1:]
+    for k in range(coeffs.shape[1] - 2, -1, -1):
+        out = out * t + coeffs[:, k:k + 1]
     return out
 
-def calculate_running_speeds(df):
-    means, ranges = {}, {}
+def batted_ball_trajectories(df) -> pd.DataFrame:
+    """Landing point, carry, apex, hang time and spray angle for every batted ball.
+
+    Spray angle is in degrees from the centre-field line, positive toward +X.
+    Balls without all three polynomials, or that do not come down within
+    ``TRAJ_T_MAX``, get NaN landing values.
+    """
+    cols = ["Hit_Poly_X", "Hit_Poly_Y", "Hit_Poly_Z"]
+    if df is None or df.empty or not set(cols).issubset(df.columns):
+        return pd.DataFrame(columns=TRAJECTORY_COLUMNS)
+    X, Y, Z = (parse_poly_coeffs(df[c]) for c in cols)
+    out = {c: np.full(len(df), np.nan) for c in TRAJECTORY_COLUMNS}
+    valid = np.flatnonzero(~(np.isnan(X[:, 0]) | np.isnan(Y[:, 0]) | np.isnan(Z[:, 0])))
+    t = np.arange(0.0, TRAJ_T_MAX + TRAJ_DT / 2, TRAJ_DT)
+
+    for start in range(0, len(valid), TRAJ_CHUNK):
+        rows = valid[start:start + TRAJ_CHUNK]
+        z = poly_eval(Z[rows], t[None, :])
+        # first grid step where the ball goes from above to at/below the ground
+        cross = (z[:, :-1] > 0) & (z[:, 1:] <= 0)
+        lands = cross.any(axis=1)
+        k  = cross.argmax(axis=1)
+        ar = np.arange(len(rows))
+        z0, z1 = z[ar, k], z[ar, k + 1]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t_land = np.where(lands, t[k] + TRAJ_DT * z0 / (z0 - z1), np.nan)
+        limit = np.where(lands, t_land, TRAJ_T_MAX)
+        apex  = np.where(t[None, :] <= limit[:, None], z, -np.inf).max(axis=1)
+
+        x = poly_eval(X[rows], t_land[:, None])[:, 0]
+        y = poly_eval(Y[rows], t_land[:, None])[:, 0]
+        dx, dy = x - X[rows, 0], y - Y[rows, 0]
+        out["Land_X"][rows]      = x
+        out["Land_Y"][rows]      = y
+        out["Carry"][rows]       = np.hypot(dx, dy)
+        out["Apex"][rows]        = apex
+        out["Hang_Time"][rows]   = t_land
+        out["Spray_Angle"][rows] = np.degrees(np.arctan2(dx, dy))
+    return pd.DataFrame(out, index=df.index)
+
+# ─────────────────────────────────────────────────────────────────────────────
+# STREAMING FLIGHTSCOPE AGGREGATION (chunked reads, bounded memory)
+# ─────────────────────────────────────────────────────────────────────────────
+# Multi-day exports can outgrow memory, so the file is read in chunks and only
+# per-player accumulators are kept: count / sum / max of exit speed, an EV
+# histogram as a mergeable quantile sketch (p90 to within half a bin), the
+# heatmap's hexagon sums and counts, and a fixed-size random sample of balls
+# per player for the spray chart.
+FS_CHUNK_ROWS           = 50_000
+EV_SKETCH_LO, EV_SKETCH_HI, EV_SKETCH_STEP = 0.0, 130.0, 0.1  # mph
+EV_SKETCH_BINS          = int(round((EV_SKETCH_HI - EV_SKETCH_LO) / EV_SKETCH_STEP))
+HEATMAP_EXTENT          = [-18, 18, 0, 60]  # inches, strike-zone view
+HEATMAP_GRIDSIZE        = (8, 8)
+SPRAY_SAMPLE_PER_PLAYER = 200
+
+def hex_cells(x, y, gridsize=HEATMAP_GRIDSIZE, extent=HEATMAP_EXTENT):
+    """Flat hexagon index per point (-1 outside), the same lattice ``Axes.hexbin`` uses."""
+    nx, ny = gridsize
+    xmin, xmax, ymin, ymax = map(float, extent)
+    pad = 1e-9 * (xmax - xmin)
+    xmin, xmax = xmin - pad, xmax + pad
+    ix, iy = (x - xmin) / ((xmax - xmin) / nx), (y - ymin) / ((ymax - ymin) / ny)
+    with np.errstate(invalid="ignore"):
+        ix1, iy1 = np.round(ix), np.round(iy)
+        ix2, iy2 = np.floor(ix), np.floor(iy)
+        in1 = (0 <= ix1) & (ix1 < nx + 1) & (0 <= iy1) & (iy1 < ny + 1)
+        in2 = (0 <= ix2) & (ix2 < nx) & (0 <= iy2) & (iy2 < ny)
+        near1 = (ix - ix1) ** 2 + 3.0 * (iy - iy1) ** 2 < (ix - ix2 - 0.5) ** 2 + 3.0 * (iy - iy2 - 0.5) ** 2
+    cell1 = np.where(in1, ix1 * (ny + 1) + iy1, -1)
+    cell2 = np.where(in2, (nx + 1) * (ny + 1) + ix2 * ny + iy2, -1)
+    return np.where(near1, cell1, cell2).astype(np.int64)
+
+def hex_centers(gridsize=HEATMAP_GRIDSIZE, extent=HEATMAP_EXTENT):
+    nx, ny = gridsize
+    xmin, xmax, ymin, ymax = map(float, extent)
+    pad = 1e-9 * (xmax - xmin)
+    xmin, xmax = xmin - pad, xmax + pad
+    sx, sy = (xmax - xmin) / nx, (ymax - ymin) / ny
+    cx = np.concatenate([np.repeat(np.arange(nx + 1), ny + 1), np.repeat(np.arange(nx) + 0.5, ny)])
+    cy = np.concatenate([np.tile(np.arange(ny + 1), nx + 1), np.tile(np.arange(ny) + 0.5, nx)])
+    return xmin + cx * sx, ymin + cy * sy
+
+HEX_CELL_COUNT = len(hex_centers()[0])
+SPRAY_SAMPLE_COLUMNS = ["nm", "_key", *TRAJECTORY_COLUMNS, "Exit_Speed"]
+
+class FlightscopeAggregate:
+    """Mergeable per-player accumulators for one (or several) Flightscope files."""
+
+    def __init__(self):
+        self.index    = {}  # nm → row of the arrays below
+        self.names    = []  # first raw spelling seen per player
+        self.count    = np.zeros(0, np.int64)
+        self.total    = np.zeros(0)
+        self.max      = np.zeros(0)
+        self.hist     = np.zeros((0, EV_SKETCH_BINS), np.int64)
+        self.zone_sum = np.zeros((0, HEX_CELL_COUNT))
+        self.zone_n   = np.zeros((0, HEX_CELL_COUNT), np.int64)
+        self.sample   = pd.DataFrame(columns=SPRAY_SAMPLE_COLUMNS)
+        self.rows     = 0
+        self._hash    = hashlib.blake2b(digest_size=16)
+        self._rng     = np.random.default_rng(0)
+
+    @property
+    def empty(self):
+        return self.rows == 0
+
+    @property
+    def digest(self):
+        return self._hash.hexdigest()
+
+    def _rows_for(self, nm, raw):
+        new = pd.unique(nm[~nm.isin(self.index.keys())])
+        if len(new):
+            first = raw.groupby(nm).first()
+            for key in new:
+                self.index[key] = len(self.names)
+                self.names.append(first.get(key, key))
+            grow = len(new)
+            self.count    = np.concatenate([self.count, np.zeros(grow, np.int64)])
+            self.total    = np.concatenate([self.total, np.zeros(grow)])
+            self.max      = np.concatenate([self.max, np.full(grow, -np.inf)])
+            self.hist     = np.vstack([self.hist, np.zeros((grow, EV_SKETCH_BINS), np.int64)])
+            self.zone_sum = np.vstack([self.zone_sum, np.zeros((grow, HEX_CELL_COUNT))])
+            self.zone_n   = np.vstack([self.zone_n, np.zeros((grow, HEX_CELL_COUNT), np.int64)])
+        return nm.map(self.index).to_numpy(dtype=np.int64)
+
+    def add_chunk(self, chunk):
+        if chunk.empty:
+            return
+        _digest_frame(self._hash, chunk)
+        self.rows += len(chunk)
+        name_cols = REPORT_NAME_COLUMNS["flightscope"]
+        nm  = name_key(chunk, name_cols).fillna("")
+        raw = next((chunk[c].astype(str) for c in name_cols if c in chunk.columns), nm)
+        rows = self._rows_for(nm, raw)
+        players = len(self.names)
+
+        ev_col = next((c for c in chunk.columns if "exit" in c.lower() and "speed" in c.lower()), None)
+        ev = (pd.to_numeric(chunk[ev_col], errors="coerce").to_numpy(dtype=float) if ev_col
+              else np.full(len(chunk), np.nan))
+        has = ~np.isnan(ev)
+        self.count += np.bincount(rows[has], minlength=players)
+        self.total += np.bincount(rows[has], weights=ev[has], minlength=players)
+        np.maximum.at(self.max, rows[has], ev[has])
+        bins = np.clip(((ev[has] - EV_SKETCH_LO) / EV_SKETCH_STEP).astype(np.int64), 0, EV_SKETCH_BINS - 1)
+        self.hist += np.bincount(rows[has] * EV_SKETCH_BINS + bins,
+                                 minlength=players * EV_SKETCH_BINS).reshape(players, EV_SKETCH_BINS)
+
+        if {"Hit_Poly_X", "Hit_Poly_Z"}.issubset(chunk.columns):
+            px = parse_poly_coeffs(chunk["Hit_Poly_X"])[:, 0]
+            pz = parse_poly_coeffs(chunk["Hit_Poly_Z"])[:, 0]
+            with np.errstate(invalid="ignore"):
+                ok = ~np.isnan(px) & ~np.isnan(pz) & (ev > 0)
+            cells = hex_cells(px[ok] * 12, pz[ok] * 12)
+            inside = cells >= 0
+            flat = rows[ok][inside] * HEX_CELL_COUNT + cells[inside]
+            size = players * HEX_CELL_COUNT
+            self.zone_sum += np.bincount(flat, weights=ev[ok][inside], minlength=size).reshape(players, -1)
+            self.zone_n   += np.bincount(flat, minlength=size).reshape(players, -1)
+
+        if {"Hit_Poly_X", "Hit_Poly_Y", "Hit_Poly_Z"}.issubset(chunk.columns):
+            # bottom-k random keys per player = uniform sample; only candidates get trajectories
+            keys = pd.DataFrame({"nm": nm.to_numpy(), "_key": self._rng.random(len(chunk))}, index=chunk.index)
+            cand = keys.sort_values("_key").groupby("nm").head(SPRAY_SAMPLE_PER_PLAYER).sort_index()
+            traj = batted_ball_trajectories(chunk.loc[cand.index])
+            fresh = pd.concat([cand, traj], axis=1).assign(Exit_Speed=ev[chunk.index.get_indexer(cand.index)])
+            self._keep_sample(fresh[traj["Carry"].notna()])
+
+    def _keep_sample(self, fresh):
+        sample = pd.concat([self.sample, fresh], ignore_index=True) if len(self.sample) else fresh
+        self.sample = (sample.sort_values("_key").groupby("nm").head(SPRAY_SAMPLE_PER_PLAYER)
+                             .reset_index(drop=True)[SPRAY_SAMPLE_COLUMNS])
+
+    def merge(self, other):
+        """Fold *other* (e.g. another day's file) into this aggregate."""
+        rows = self._rows_for(pd.Series(list(other.index)), pd.Series(other.names))
+        self.count[rows] += other.count
+        self.total[rows] += other.total
+        self.max[rows]    = np.maximum(self.max[rows], other.max)
+        self.hist[rows]  += other.hist
+        self.zone_sum[rows] += other.zone_sum
+        self.zone_n[rows]   += other.zone_n
+        self._keep_sample(other.sample)
+        self.rows += other.rows
+        self._hash.update(other.digest.encode())
+        return self
+
+    def select(self, nms):
+        """A new aggregate holding only the players in *nms* (e.g. one age-group cohort)."""
+        out  = FlightscopeAggregate()
+        keep = [k for k in nms if k in self.index]
+        rows = np.array([self.index[k] for k in keep], dtype=np.int64)
+        out.index = {k: i for i, k in enumerate(keep)}
+        out.names = [self.names[r] for r in rows]
+        for attr in ("count", "total", "max", "hist", "zone_sum", "zone_n"):
+            setattr(out, attr, getattr(self, attr)[rows].copy())
+        out.sample = self.sample[self.sample["nm"].isin(keep)].reset_index(drop=True)
+        out.rows   = int(out.count.sum())
+        out._hash.update(self.digest.encode())
+        out._hash.update("\x1f".join(sorted(keep)).encode("utf-8"))
+        return out
+
+    @staticmethod
+    def _quantile(hist, q):
+        n = hist.sum(axis=-1)
+        rank = q * np.maximum(n - 1, 0)  # same position pandas' linear quantile uses
+        idx = (np.cumsum(hist, axis=-1) <= rank[..., None]).sum(axis=-1)
+        return np.where(n > 0, EV_SKETCH_LO + (np.minimum(idx, EV_SKETCH_BINS - 1) + 0.5) * EV_SKETCH_STEP, np.nan)
+
+    def per_player(self) -> pd.DataFrame:
+        """``nm``-indexed Count / Mean / Max / approximate 90th percentile exit velocity."""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = self.total / self.count
+        top = np.where(self.count > 0, self.max, np.nan)
+        return pd.DataFrame({
+            "Name":            self.names,
+            "Balls":           self.count,
+            "Mean EV (mph)":   mean,
+            "Max EV (mph)":    top,
+            "90th % EV (mph)": np.fmin(self._quantile(self.hist, 0.9), top),
+        }, index=pd.Index(list(self.index), name="nm"))
+
+    def summary(self):
+        """``(max_ev, p90_ev)`` across every player held, as the report shows them."""
+        if not self.count.sum():
+            return None, None
+        top = float(self.max.max())
+        return top, float(min(self._quantile(self.hist.sum(axis=0), 0.9), top))
+
+    def heatmap_points(self) -> pd.DataFrame:
+        """One point per hexagon at its centre carrying the cell mean, for generate_exit_velo_heatmap."""
+        n  = self.zone_n.sum(axis=0)
+        cx, cy = hex_centers()
+        hit = n > 0
+        return pd.DataFrame({"Parsed_X": cx[hit] / 12, "Parsed_Z": cy[hit] / 12,
+                             "Exit_Speed": self.zone_sum.sum(axis=0)[hit] / n[hit]})
+
+def stream_flightscope(src, chunksize=FS_CHUNK_ROWS) -> FlightscopeAggregate:
+    """Aggregate a Flightscope CSV (path or file object) chunk by chunk."""
+    name_cols = set(REPORT_NAME_COLUMNS["flightscope"])
+    wanted = lambda c: c in name_cols or REPORT_COLUMN_FILTERS["flightscope"](str(c))
+    agg = FlightscopeAggregate()
+    if hasattr(src, "seek"):
+        src.seek(0)
+    for chunk in pd.read_csv(src, chunksize=chunksize, usecols=wanted, encoding_errors="replace"):
+        agg.add_chunk(chunk)
+    return agg
+
+# ─────────────────────────────────────────────────────────────────────────────
+# REPORT DATA SELECTION (masks + column projection, no full-frame copies)
+# ─────────────────────────────────────────────────────────────────────────────
+# Peak memory per report, on top of the uploaded frames themselves: selecting
+# the rows and computing the metrics (report_metrics) allocates at most
+# REPORT_PEAK_MULTIPLE times the projected columns below (name keys, masks,
+# selected rows and their temporaries); building the PDF adds at most
+# REPORT_PEAK_FIXED_BYTES of workspace that does not grow with the data
+# (trajectory grids in TRAJ_CHUNK batches, chart rasters, the document).
+# Nothing duplicates a whole upload; tests/test_report_memory.py enforces both
+# parts under tracemalloc.
+REPORT_PEAK_FIXED_BYTES = 64 * 1024 * 1024
+REPORT_PEAK_MULTIPLE    = 1.5
+REPORT_COLUMN_FILTERS = {
+    "blast":       lambda c: c.lower() in BLAST_METRIC_KEYS,
+    "flightscope": lambda c: ("exit" in c.lower() and "speed" in c.lower()) or c.startswith("Hit_Poly_"),
+    "throwing":    lambda c: "velocity" in c.lower(),
+    "running":     lambda c: any(x in c.lower() for x in ["30yd", "60yd", "shuttle"]),
+    "mobility":    lambda c: c in {"Ankle Mobility", "Thoracic Mobility", "Lumbar Mobility"},
+    "dynamo":      lambda c: c in {"Movement", "Type", *DYNAMO_NUMERIC_COLUMNS},
+}
+
+def name_key(df, name_cols):
+    for c in name_cols:
+        if c in df.columns:
+            return df[c].astype(str).str.lower().str.strip()
+    return pd.Series(None, index=df.index, dtype=object)
+
+def age_group_lookup(player_db):
+    """Normalized name → age group, for mapping cohort membership onto uploads."""
+    nm = player_db["Name"].astype(str).str.lower().str.strip()
+    return pd.Series(player_db["Age Group"].to_numpy(), index=nm)[lambda s: ~s.index.duplicated(keep="last")]
+
+def select_report_rows(df, name_cols, source, *, key=None, age_group=None, lookup=None,
+                       window=None, index=None):
+    """Rows of *df* for one player (*key*) or one age-group cohort, projected.
+
+    A single boolean mask picks the rows and only the columns the report reads
+    for *source* are materialized, together with the normalized ``nm`` key.
+    With a ``(start, end)`` *window*, rows come from the source's SessionIndex
+    instead (built here unless *index* is given); undated sources ignore it.
+    """
     if df is None or df.empty:
-        return means, ranges
-    for col in df.columns:
-        low = col.lower()
-        if any(x in low for x in ["30yd", "60yd", "shuttle"]):
-            vals = pd.to_numeric(df[col], errors="coerce").dropna()
-            if not vals.empty:
-                means[col]  = float(vals.mean())
-                ranges[col] = (float(vals.min()), float(vals.max()))
-    return means, ranges
-
-def calculate_flightscope_metrics(data):
-    exit_speed_column = None
-    if data is None:
-        return None, None
-    for col in data.columns:
-        if "exit" in col.lower() and "speed" in col.lower():
-            exit_speed_column = col
-            break
-    if exit_speed_column is None:
-        return None, None
-    data[exit_speed_column] = pd.to_numeric(data[exit_speed_column], errors="coerce")
-    cleaned = data.dropna(subset=[exit_speed_column])
-    if cleaned.empty:
-        return None, None
-    max_ev = cleaned[exit_speed_column].max()
-    percentile_90_ev = cleaned[exit_speed_column].quantile(0.9)
-    return max_ev, percentile_90_ev
-
-# poly helpers (guard for numeric)
-def safe_est_poly_at_t(t, poly_val):
-    """poly_val may be a string 'a;b;c;d;e' or numeric/NaN → return None in non-string."""
-    if not isinstance(poly_val, str):
+        return df
+    if window is not None:
+        index = index if index is not None else SessionIndex(df, name_cols)
+        if index.dated:
+            keys = [key] if key is not None else index.players_in(lookup, age_group)
+            rows = index.positions(keys, *window)
+            keep = REPORT_COLUMN_FILTERS[source]
+            cols = {c: df[c].iloc[rows] for c in df.columns if keep(str(c))}
+            cols["nm"] = index.nm.iloc[rows]
+            return pd.DataFrame(cols, index=df.index[rows])
+    nm = name_key(df, name_cols)
+    if key is not None:
+        mask = (nm == key).to_numpy()
+    else:
+        mask = (nm.map(lookup) == age_group).to_numpy()
+    keep = REPORT_COLUMN_FILTERS[source]
+    cols = {c: df[c][mask] for c in df.columns if keep(str(c))}
+    cols["nm"] = nm[mask]
+    return pd.DataFrame(cols, index=df.index[mask])
+
+def report_projected_bytes(sources) -> int:
+    """Bytes of the columns the report reads (REPORT_COLUMN_FILTERS) across *sources*."""
+    total = 0
+    for name, df in sources.items():
+        if isinstance(df, pd.DataFrame) and not df.empty:  # streamed aggregates hold no rows
+            per_col = df.memory_usage(index=False, deep=True)
+            total  += int(per_col[[c for c in df.columns if REPORT_COLUMN_FILTERS[name](str(c))]].sum())
+    return total
+
+def report_peak_bound(sources) -> int:
+    """The documented peak allocation for one report (metrics and PDF) over *sources*."""
+    return REPORT_PEAK_FIXED_BYTES + int(REPORT_PEAK_MULTIPLE * report_projected_bytes(sources))
+
+# ─────────────────────────────────────────────────────────────────────────────
+# SESSION WINDOWS (rows around an assessment date, sliced by binary search)
+# ─────────────────────────────────────────────────────────────────────────────
+# A season-long upload serves every assessment: each source is indexed once on
+# (player, session date) and a report reads only the sessions inside its window.
+ASSESSMENT_WINDOW_DAYS = 14  # default ± days around the assessment date
+
+def assessment_window(assess_date, days):
+    """``(start, end)`` covering *days* either side of *assess_date*, end exclusive."""
+    day = pd.Timestamp(assess_date).normalize()
+    return day - pd.Timedelta(days=days), day + pd.Timedelta(days=days + 1)
+
+class SessionIndex:
+    """Row positions of one source ordered by (player, session date).
+
+    Every player owns one contiguous run of ``order`` with ascending dates, so
+    the rows of a window are a ``searchsorted`` pair per player rather than a
+    mask over the whole frame. Undated rows (NaT sorts first) fall outside
+    every window; a source without any dates has ``dated`` False.
+    """
+
+    def __init__(self, df, name_cols):
+        self.nm = name_key(df, name_cols)
+        codes, names = pd.factorize(self.nm)
+        stamps = session_dates(df).view("int64")
+        self.order = np.lexsort((stamps, codes))
+        self.stamps = stamps[self.order]
+        bounds = np.searchsorted(codes[self.order], np.arange(len(names) + 1))
+        self.runs  = {nm: (bounds[i], bounds[i + 1]) for i, nm in enumerate(names)}
+        self.dated = bool((stamps != np.iinfo(np.int64).min).any())
+
+    def players_in(self, lookup, age_group):
+        names = pd.Index(list(self.runs))
+        return names[lookup.reindex(names).to_numpy() == age_group].tolist()
+
+    def positions(self, keys, start, end) -> np.ndarray:
+        """Row positions (in frame order) of *keys* with start ≤ session date < end."""
+        lo, hi = (pd.Timestamp(t).as_unit("ns").value for t in (start, end))
+        parts = []
+        for key in keys:
+            a, b = self.runs.get(key, (0, 0))
+            run = self.stamps[a:b]
+            parts.append(self.order[a + np.searchsorted(run, lo): a + np.searchsorted(run, hi)])
+        return np.sort(np.concatenate(parts)) if parts else np.empty(0, dtype=np.intp)
+
+    def span(self):
+        """First and last session date in the source (None when undated)."""
+        dated = self.stamps[self.stamps != np.iinfo(np.int64).min]
+        return (pd.Timestamp(dated.min()), pd.Timestamp(dated.max())) if len(dated) else None
+
+def window_comparison(baseline: dict, current: dict) -> pd.DataFrame:
+    """Metric-by-metric table of two windows' report values (shown_metrics)."""
+    rows = [(m, safe_float(baseline.get(m)), safe_float(current.get(m))) for m in {**baseline, **current}]
+    out = pd.DataFrame(rows, columns=["Metric", "Baseline", "Current"]).dropna(how="all", subset=["Baseline", "Current"])
+    out["Change"] = out["Current"] - out["Baseline"]
+    return out.reset_index(drop=True)
+
+# ─────────────────────────────────────────────────────────────────────────────
+# COHORT PERCENTILES (sorted per-metric arrays, ranks by binary search)
+# ─────────────────────────────────────────────────────────────────────────────
+REPORT_NAME_COLUMNS = {
+    "blast":       ["Name"],
+    "flightscope": ["Name", "Player Name", "Batter"],
+    "throwing":    ["Name", "Player Name"],
+    "running":     ["Name", "Player Name", "AthleteID"],
+    "mobility":    ["Name", "Batter", "Player Name"],
+    "dynamo":      ["Name"],
+}
+
+MOBILITY_COLUMNS = {"Ankle Mobility": "Ankle", "Thoracic Mobility": "Thoracic", "Lumbar Mobility": "Lumbar"}
+
+def per_player_metrics(source, df):
+    """One row per player (``nm`` index) holding the values the report shows for *source*."""
+    if df is None or df.empty or source == "dynamo":
+        return pd.DataFrame()
+    if not isinstance(df, pd.DataFrame):  # streamed FlightscopeAggregate
+        return df.per_player()[["Max EV (mph)", "90th % EV (mph)"]]
+    return player_values(measurement_table({source: df}))
+
+COHORT_BATCH_ITEMS = 32  # shared per-source batches (roster × upload), least recently used dropped
+
+def player_fingerprints(source, df, rows):
+    """``nm`` → hash of that player's rows in upload order; None when *rows* (row hashes) is."""
+    if rows is None:
         return None
-    try:
-        coeffs = [float(x.strip()) for x in poly_val.split(";")]
-        if len(coeffs) < 5 or any(pd.isna(coeff) for coeff in coeffs):
+    nm  = (df["nm"] if "nm" in df.columns else name_key(df, REPORT_NAME_COLUMNS[source])).astype(str)
+    seq = nm.groupby(nm, sort=False).cumcount().to_numpy()
+    mixed = pd.util.hash_pandas_object(pd.DataFrame({"row": rows, "seq": seq}), index=False).to_numpy()
+    return pd.Series(mixed, index=nm.to_numpy()).groupby(level=0).sum()  # uint64, wraps
+
+def cohort_values(players):
+    """``((age group, position or None, metric), values)`` for every array *players* feeds."""
+    for metric in [c for c in players.columns if c not in ("Name", "Age Group", "Position")]:
+        vals = players[["Age Group", "Position", metric]].dropna(subset=["Age Group", metric])
+        for grp, chunk in vals.groupby("Age Group"):
+            yield (grp, None, metric), chunk[metric].to_numpy(dtype=float)
+        for (grp, pos), chunk in vals.dropna(subset=["Position"]).groupby(["Age Group", "Position"]):
+            yield (grp, pos, metric), chunk[metric].to_numpy(dtype=float)
+
+class CohortBatch:
+    """One source's per-player values for one roster, with their sorted arrays.
+
+    Never mutated once built, so every session holding the same upload and
+    roster shares one (``shared_cohort_batch``). Built from the batch of the
+    source's previous upload, only players whose rows changed are measured
+    again, and their old / new values are moved in and out of the sorted
+    arrays by binary search instead of re-sorting.
+    """
+
+    def __init__(self, players, arrays, fingerprints=None, columns=()):
+        self.players, self.arrays = players, arrays
+        self.fingerprints, self.columns = fingerprints, columns
+
+    @classmethod
+    def build(cls, source, df, members, rows=None, base=None):
+        fps     = player_fingerprints(source, df, rows)
+        columns = tuple(map(str, df.columns)) if isinstance(df, pd.DataFrame) else ()
+        measure = lambda frame: per_player_metrics(source, frame).join(members, how="inner")
+        if fps is None or base is None or base.fingerprints is None or base.columns != columns:
+            players = measure(df)
+            return cls(players, {k: np.sort(v) for k, v in cohort_values(players)}, fps, columns)
+
+        common  = fps.index.intersection(base.fingerprints.index)
+        same    = common[base.fingerprints[common].to_numpy() == fps[common].to_numpy()]
+        changed = fps.index.union(base.fingerprints.index).difference(same)
+        nm      = (df["nm"] if "nm" in df.columns else name_key(df, REPORT_NAME_COLUMNS[source])).astype(str)
+        fresh   = measure(df[nm.isin(changed).to_numpy()]) if len(changed) else base.players.iloc[:0]
+        stale   = base.players.index.isin(changed)
+        players = pd.concat([base.players[~stale], fresh]) if len(fresh) else base.players[~stale]
+        return cls(players, cls._moved(base.arrays, base.players[stale], fresh), fps, columns)
+
+    @staticmethod
+    def _moved(arrays, old, new):
+        """*arrays* with the values of *old* taken out and those of *new* put in."""
+        arrays = dict(arrays)
+        gone, come = dict(cohort_values(old)), dict(cohort_values(new))
+        for key in gone.keys() | come.keys():
+            arr = arrays.get(key, np.empty(0))
+            if key in gone:  # the n-th equal value removed sits n places after the first
+                v   = np.sort(gone[key])
+                arr = np.delete(arr, np.searchsorted(arr, v) + np.arange(len(v)) - np.searchsorted(v, v))
+            if key in come:
+                v   = np.sort(come[key])
+                arr = np.insert(arr, np.searchsorted(arr, v), v)
+            if len(arr):
+                arrays[key] = arr
+            else:
+                arrays.pop(key, None)
+        return arrays
+
+@st.cache_resource
+def cohort_batches():
+    """Process-wide (roster digest, source, upload digest) → CohortBatch, least recently used first."""
+    return OrderedDict(), threading.Lock()
+
+def shared_cohort_batch(key, build):
+    batches, lock = cohort_batches()
+    with lock:
+        batch = batches.get(key)
+        if batch is not None:
+            batches.move_to_end(key)
+            return batch
+    batch = build()
+    with lock:
+        batches[key] = batch
+        while len(batches) > COHORT_BATCH_ITEMS:
+            batches.popitem(last=False)
+    return batch
+
+class CohortIndex:
+    """One session's cohort: the shared CohortBatch of each source it ingested.
+
+    ``position=None`` is the whole age group. Each source holds one batch, so a
+    corrected upload or a grown inbox store replaces it and never counts a
+    player twice. A percentile is a binary search in each batch's array for
+    the key, the ranks summed. *tag* identifies the roster/date the cohort
+    membership was derived from; a different tag needs a fresh index.
+    """
+
+    def __init__(self, tag=None):
+        self.tag     = tag
+        self.batches = {}  # source → CohortBatch
+        self.digests = {}  # source → digest of the frame its batch came from
+
+    def ingest(self, source, df, members) -> bool:
+        """Make *df* the batch for *source*; ``False`` when nothing changed."""
+        rows = None
+        if isinstance(df, pd.DataFrame) and not df.empty:
+            try:
+                rows = pd.util.hash_pandas_object(df, index=False).to_numpy()
+            except TypeError:
+                pass
+        h = hashlib.blake2b(digest_size=16)
+        if df is not None and not df.empty:
+            _digest_frame(h, df, rows)
+        if self.digests.get(source) == h.hexdigest():
+            return False
+        self.digests[source] = h.hexdigest()
+        old = self.batches.pop(source, None)
+        if df is not None and not df.empty:
+            roster = hashlib.blake2b(pd.util.hash_pandas_object(members).to_numpy().tobytes(),
+                                     digest_size=16).hexdigest()
+            self.batches[source] = shared_cohort_batch(
+                (roster, source, self.digests[source]),
+                lambda: CohortBatch.build(source, df, members, rows, old))
+        return old is not None or source in self.batches
+
+    def _arrays(self, key):
+        return [b.arrays[key] for b in self.batches.values() if key in b.arrays]
+
+    def _players(self):
+        return [b.players for b in self.batches.values() if not b.players.empty]
+
+    def player_values(self, nm) -> dict:
+        """Metric → the player's own per-player value, over every batch."""
+        return {m: v for f in self._players() if nm in f.index
+                for m, v in f.loc[[nm]].iloc[-1].items() if m not in ("Name", "Age Group", "Position")}
+
+    def percentile(self, age_group, metric, value, position=None):
+        arrays = self._arrays((age_group, position, metric))
+        if not arrays or value is None or pd.isna(value):
             return None
-        return sum(coeffs[i] * (t**i) for i in range(5))
-    except Exception:
+        return float(self.percentiles(arrays, metric, np.asarray([value], dtype=float))[0])
+
+    @staticmethod
+    def percentiles(arrays, metric, values):
+        # mid-rank of ties over every array; flipped where lower is better so 90th always means "good"
+        lo  = sum(np.searchsorted(arr, values, side="left") for arr in arrays)
+        hi  = sum(np.searchsorted(arr, values, side="right") for arr in arrays)
+        pct = (lo + hi) / 2 / sum(len(arr) for arr in arrays) * 100
+        return 100 - pct if metric in LOWER_IS_BETTER else pct
+
+    def metrics_for(self, age_group, position=None):
+        return sorted({m for b in self.batches.values() for g, p, m in b.arrays
+                       if g == age_group and p == position})
+
+    def leaderboard(self, age_group, metric, position=None):
+        arrays = self._arrays((age_group, position, metric))
+        if not arrays:
+            return pd.DataFrame(columns=["Player", metric, "Percentile"])
+        vals = pd.concat([f for f in self._players() if metric in f.columns])
+        vals = vals[vals["Age Group"] == age_group]
+        if position is not None:
+            vals = vals[vals["Position"] == position]
+        vals = vals[[metric, "Name"]].dropna()
+        out = pd.DataFrame({
+            "Player":     vals["Name"].to_numpy(),
+            metric:       vals[metric].to_numpy(),
+            "Percentile": self.percentiles(arrays, metric, vals[metric].to_numpy(dtype=float)).round(0),
+        })
+        return out.sort_values("Percentile", ascending=False, ignore_index=True)
+
+def cohort_members(roster):
+    """``nm``-indexed Name / Age Group / Position for joining per-player metrics."""
+    nm = roster["Name"].astype(str).str.lower().str.strip()
+    members = roster.reindex(columns=["Name", "Age Group", "Position"]).set_index(nm)
+    return members[~members.index.duplicated(keep="last")]
+
+def ordinal(n) -> str:
+    n = int(round(n))
+    suffix = "th" if 10 <= n % 100 <= 20 else {1: "st", 2: "nd", 3: "rd"}.get(n % 10, "th")
+    return f"{n}{suffix}"
+
+def add_percentile_column(data, row_keys, percentiles, col_widths, width):
+    cells = ["Cohort %ile"] + [
+        ordinal(percentiles[k]) if percentiles.get(k) is not None else "—" for k in row_keys
+    ]
+    return [row + [cell] for row, cell in zip(data, cells)], col_widths + [width*0.12]
+
+# ─────────────────────────────────────────────────────────────────────────────
+# MEASUREMENTS (every source as one long table: player, source, metric, value, date, rep)
+# ─────────────────────────────────────────────────────────────────────────────
+# Each upload is scanned once into long rows; per-player values, report stats,
+# Dynamo summaries and the roster export are grouped operations over them.
+# Player (normalized name), source and metric are dictionary-encoded
+# (categoricals); Dynamo metrics are "Movement · Type · column".
+MEASUREMENT_COLUMNS   = ["player", "source", "metric", "value", "date", "rep"]
+SESSION_DATE_COLUMNS  = {"date", "session date", "test date", "assessment date", "timestamp"}
+EXIT_SPEED_METRIC     = "Exit Speed (mph)"
+DYNAMO_METRIC_SEP     = " · "
+
+def metric_columns(source, df) -> dict:
+    """Source column → metric ID for every value column of *df* the report uses."""
+    if source == "flightscope":
+        col = next((c for c in df.columns if "exit" in c.lower() and "speed" in c.lower()), None)
+        return {col: EXIT_SPEED_METRIC} if col else {}
+    if source == "mobility":
+        return {c: m for c, m in MOBILITY_COLUMNS.items() if c in df.columns}
+    if source == "dynamo":
+        return {c: c for c in DYNAMO_NUMERIC_COLUMNS if c in df.columns} if {"Movement", "Type"}.issubset(df.columns) else {}
+    keep = REPORT_COLUMN_FILTERS[source]
+    return {c: c for c in df.columns if keep(str(c))}
+
+def session_dates(df) -> np.ndarray:
+    col = next((c for c in df.columns if str(c).lower().strip() in SESSION_DATE_COLUMNS), None)
+    if col is None:
+        return np.full(len(df), np.datetime64("NaT"), dtype="datetime64[ns]")
+    return pd.to_datetime(df[col], errors="coerce", format="mixed").to_numpy(dtype="datetime64[ns]")
+
+def _long_rows(source, df):
+    """Codes + categories per encoded column, so no per-row strings are built."""
+    cols = metric_columns(source, df)
+    if not cols:
         return None
+    if "nm" in df.columns:  # report slices carry the normalized key already
+        player, players = pd.factorize(df["nm"])
+    else:  # normalize each distinct spelling once, not every row
+        col = next((c for c in REPORT_NAME_COLUMNS[source] if c in df.columns), None)
+        if col is None:
+            return None
+        raw, spellings = pd.factorize(df[col])
+        norm, players = pd.factorize(pd.Index(spellings).astype(str).str.lower().str.strip())
+        player = np.where(raw >= 0, norm[raw], -1)
+    vals = df[list(cols)].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+    metrics = np.array(list(cols.values()), dtype=object)
+    if source == "dynamo":
+        keys = [player, df["Movement"].to_numpy(), df["Type"].to_numpy()]
+        movement, kinds = pd.factorize(df["Movement"].astype(str) + DYNAMO_METRIC_SEP + df["Type"].astype(str)
+                                       + DYNAMO_METRIC_SEP)
+        metric = movement[:, None] * len(metrics) + np.arange(len(metrics))
+        metrics = (np.asarray(kinds, dtype=object)[:, None] + metrics[None, :]).ravel()
+        named = (player >= 0) & df["Movement"].notna().to_numpy() & df["Type"].notna().to_numpy()
+    else:
+        keys = [player]
+        metric = np.broadcast_to(np.arange(len(metrics)), vals.shape)
+        named = player >= 0
+    rep = df.groupby(keys, dropna=False, sort=False).cumcount().to_numpy(dtype=np.int32)
+    r, c = np.nonzero(~np.isnan(vals) & named[:, None])
+    return {"player": (player[r], np.asarray(players, dtype=object)),
+            "source": (np.zeros(len(r), np.int64), np.array([source], dtype=object)),
+            "metric": (metric[r, c], metrics),
+            "value": vals[r, c], "date": session_dates(df)[r], "rep": rep[r]}
+
+def _merge_codes(parts, key, categories=None):
+    cats = pd.Index(pd.unique(np.concatenate([p[key][1] for p in parts]))) if categories is None else pd.Index(categories)
+    codes = [cats.get_indexer(p[key][1])[p[key][0]] for p in parts]
+    return pd.Categorical.from_codes(np.concatenate(codes) if codes else np.array([], np.int64), cats)
+
+def measurement_table(sources: dict) -> pd.DataFrame:
+    """Long rows for every upload in *sources* (frames or report slices); NaN values left out."""
+    parts = [_long_rows(src, df) for src, df in sources.items()
+             if isinstance(df, pd.DataFrame) and not df.empty]
+    parts = [p for p in parts if p is not None]
+    cat = lambda key, dtype: np.concatenate([p[key] for p in parts]).astype(dtype) if parts else np.array([], dtype)
+    return pd.DataFrame({
+        "player": _merge_codes(parts, "player", None if parts else []),
+        "source": _merge_codes(parts, "source", list(REPORT_NAME_COLUMNS)),
+        "metric": _merge_codes(parts, "metric", None if parts else []),  # first-seen order = column order
+        "value":  cat("value", float),
+        "date":   cat("date", "datetime64[ns]"),
+        "rep":    cat("rep", np.int32),
+    }, columns=MEASUREMENT_COLUMNS)
+
+def _player_by_metric(rows, how) -> pd.DataFrame:
+    """Mean (or first reading) per (player, metric) as an ``nm``-indexed wide frame.
+
+    Both keys are category codes, so the groups are one flat ``bincount`` key.
+    """
+    players, metrics = rows["player"].cat.categories, rows["metric"].cat.categories
+    key = rows["player"].cat.codes.to_numpy(np.int64) * len(metrics) + rows["metric"].cat.codes.to_numpy(np.int64)
+    value = rows["value"].to_numpy()
+    n = np.bincount(key, minlength=len(players) * len(metrics))
+    if how == "first":  # rows are in upload order, so the first index per key is the first reading
+        out = np.full(len(n), np.nan)
+        seen, first = np.unique(key, return_index=True)
+        out[seen] = value[first]
+    else:
+        with np.errstate(invalid="ignore"):
+            out = np.bincount(key, weights=value, minlength=len(n)) / n
+    grid = out.reshape(len(players), len(metrics))
+    has = n.reshape(grid.shape) > 0
+    keep_p, keep_m = has.any(axis=1), has.any(axis=0)
+    return pd.DataFrame(grid[np.ix_(keep_p, keep_m)], columns=[str(m) for m in metrics[keep_m]],
+                        index=pd.Index(players[keep_p].astype(str), name="nm")).sort_index()
+
+def player_values(long) -> pd.DataFrame:
+    """One row per player holding the values the report shows (Dynamo excluded).
+
+    Means per metric, the first reading for mobility and max / 90th percentile
+    for exit velocity; a metric name reported by two sources gets " (source)".
+    """
+    parts, codes = [], long["source"].cat.codes.to_numpy()
+    for code in np.unique(codes):
+        source = long["source"].cat.categories[code]
+        if source == "dynamo":
+            continue
+        mask = codes == code
+        rows = long if mask.all() else long[mask]
+        if source == "flightscope":
+            ev = rows.groupby("player", observed=True)["value"]
+            vals = pd.DataFrame({"Max EV (mph)": ev.max(), "90th % EV (mph)": ev.quantile(0.9)})
+            vals.index = pd.Index(vals.index.astype(str), name="nm")
+        else:
+            vals = _player_by_metric(rows, "first" if source == "mobility" else "mean")
+        seen = {c for p in parts for c in p.columns}
+        parts.append(vals.rename(columns={c: f"{c} ({source})" for c in vals.columns if c in seen}))
+    return pd.concat(parts, axis=1) if parts else pd.DataFrame()
+
+def metric_summary(long) -> pd.DataFrame:
+    """``(source, metric)``-indexed mean / min / max / first / 90th percentile over all rows."""
+    g = long.groupby(["source", "metric"], observed=True, sort=False)["value"]
+    return g.agg(["mean", "min", "max", "first"]).assign(p90=g.quantile(0.9))
+
+def dynamo_means(long) -> pd.DataFrame:
+    """Per player / Movement / Type means of the Dynamo columns (sorted like a groupby)."""
+    rows = long[long["source"] == "dynamo"]
+    if rows.empty:
+        return pd.DataFrame(columns=["nm", "Movement", "Type"])
+    means = rows.groupby(["player", "metric"], observed=True)["value"].mean()
+    parts = means.index.get_level_values("metric").astype(str).str.split(DYNAMO_METRIC_SEP, n=2, expand=True)
+    means.index = pd.MultiIndex.from_arrays(
+        [means.index.get_level_values("player").astype(str), parts.get_level_values(0),
+         parts.get_level_values(1), parts.get_level_values(2)], names=["nm", "Movement", "Type", "column"])
+    wide = means.unstack("column").sort_index()
+    return wide.reindex(columns=[c for c in DYNAMO_NUMERIC_COLUMNS if c in wide.columns]).reset_index()
 
 # ─────────────────────────────────────────────────────────────────────────────
-# TABLE BUILDERS FOR PDF
+# TABLE ROW MODELS (shared by the PDF tables and the HTML preview)
 # ─────────────────────────────────────────────────────────────────────────────
-def build_gameplay_data_table(
-    averages: dict,
-    ranges: dict,
-    max_ev: float,
-    percentile_90_ev: float,
-    velocities: dict,
-    width: float,
-    thresholds: dict,
-    age_group: str
-):
-    data = [["Metric", "Value", "Range / Visual"]]
-    blast_metrics = [
-        ("Plane Score",              "Plane Score"),
-        ("Connection Score",         "Connection Score"),
-        ("Rotation Score",           "Rotation Score"),
-        ("Attack Angle (°)",         "Attack Angle (deg)"),
-        ("On-Plane Efficiency (%)",  "On Plane Efficiency (%)"),
-        ("Time to Contact (s)",      "Time to Contact (sec)"),
-        ("Bat Speed (mph)",          "Bat Speed (mph)"),
-        ("Rotational Acceleration (g)", "Rotational Acceleration (g)"),
-        ("Peak Hand Speed (mph)",    "Peak Hand Speed (mph)"),
-        ("Connection at Impact (°)", "Connection at Impact (deg)"),
-        ("Early Connection (°)",     "Early Connection (deg)"),
-        ("Vertical Bat Angle (°)",   "Vertical Bat Angle (deg)"),
-    ]
-    for label, key in blast_metrics:
+BLAST_TABLE_METRICS = [
+    ("Plane Score",              "Plane Score"),
+    ("Connection Score",         "Connection Score"),
+    ("Rotation Score",           "Rotation Score"),
+    ("Attack Angle (°)",         "Attack Angle (deg)"),
+    ("On-Plane Efficiency (%)",  "On Plane Efficiency (%)"),
+    ("Time to Contact (s)",      "Time to Contact (sec)"),
+    ("Bat Speed (mph)",          "Bat Speed (mph)"),
+    ("Rotational Acceleration (g)", "Rotational Acceleration (g)"),
+    ("Peak Hand Speed (mph)",    "Peak Hand Speed (mph)"),
+    ("Connection at Impact (°)", "Connection at Impact (deg)"),
+    ("Early Connection (°)",     "Early Connection (deg)"),
+    ("Vertical Bat Angle (°)",   "Vertical Bat Angle (deg)"),
+]
+
+DYNAMO_TABLE_HEADER = ("Movement", "Type", "ROM Asym", "Force Asym", "L Max", "R Max")
+
+def _bar_row(label, key, text, value, rmin, rmax, age_group, thresholds, wrap=False):
+    bar = value is not None and rmin is not None and rmax is not None
+    return {
+        "label": label, "key": key, "text": text, "value": value,
+        "rmin": rmin, "rmax": rmax, "wrap": wrap, "bar": bar,
+        "color": get_bar_color(key, value, age_group, thresholds) if bar else None,
+    }
+
+def gameplay_rows(averages, ranges, max_ev, percentile_90_ev, velocities, thresholds, age_group):
+    rows = []
+    for label, key in BLAST_TABLE_METRICS:
         value = averages.get(key)
-        value_str = f"{value:.2f}" if value is not None else "N/A"
         cuts = thresholds.get(age_group, {}).get(key)
         if cuts:
             rmin, rmax = cuts["below_avg"], cuts["above_avg"]
         else:
             rmin, rmax = ranges.get(key, (None, None))
-        if value is not None and rmin is not None and rmax is not None:
-            color  = get_bar_color(key, value, age_group)
-            visual = RangeBar(value, rmin, rmax, width=BAR_WIDTH, height=BAR_HEIGHT,
-                              fill_color=colors.HexColor(color), show_range=False)
-        else:
-            visual = "—"
-        data.append([Paragraph(label, styles["Normal"]), value_str, visual])
-
-    # Max EV
-    if max_ev is not None:
-        key = "Max EV (mph)"
-        cuts = thresholds.get(age_group, {}).get(key, {})
-        rmin, rmax = cuts.get("below_avg"), cuts.get("above_avg")
-        if rmin is not None and rmax is not None:
-            color  = get_bar_color(key, max_ev, age_group)
-            visual = RangeBar(max_ev, rmin, rmax, width=BAR_WIDTH, height=BAR_HEIGHT,
-                              fill_color=colors.HexColor(color), show_range=False)
-        else:
-            visual = "—"
-        data.append([key, f"{max_ev:.1f}", visual])
+        text = f"{value:.2f}" if value is not None else "N/A"
+        rows.append(_bar_row(label, key, text, value, rmin, rmax, age_group, thresholds, wrap=True))
 
-    # 90th % EV
-    if percentile_90_ev is not None:
-        key = "90th % EV (mph)"
+    for key, value in [("Max EV (mph)", max_ev), ("90th % EV (mph)", percentile_90_ev)]:
+        if value is None:
+            continue
         cuts = thresholds.get(age_group, {}).get(key, {})
-        rmin, rmax = cuts.get("below_avg"), cuts.get("above_avg")
-        if rmin is not None and rmax is not None:
-            color  = get_bar_color(key, percentile_90_ev, age_group)
-            visual = RangeBar(percentile_90_ev, rmin, rmax, width=BAR_WIDTH, height=BAR_HEIGHT,
-                              fill_color=colors.HexColor(color), show_range=False)
-        else:
-            visual = "—"
-        data.append([key, f"{percentile_90_ev:.1f}", visual])
+        rows.append(_bar_row(key, key, f"{value:.1f}", value,
+                             cuts.get("below_avg"), cuts.get("above_avg"), age_group, thresholds))
 
     # Throwing velocities (any column with 'velocity')
     for pitch, velo in velocities.items():
         cuts = thresholds.get(age_group, {}).get(pitch, {})
-        rmin, rmax = cuts.get("below_avg"), cuts.get("above_avg")
-        if velo is not None and rmin is not None and rmax is not None:
-            color  = get_bar_color(pitch, velo, age_group)
-            visual = RangeBar(velo, rmin, rmax, width=BAR_WIDTH, height=BAR_HEIGHT,
-                              fill_color=colors.HexColor(color), show_range=False)
+        text = f"{velo:.1f} mph" if velo is not None else "N/A"
+        rows.append(_bar_row(pitch, pitch, text, velo,
+                             cuts.get("below_avg"), cuts.get("above_avg"), age_group, thresholds))
+    return rows
+
+def profile_rows(mobility, speeds, speed_ranges, thresholds, age_group):
+    rows = []
+    for key in ["Ankle", "Thoracic", "Lumbar"]:
+        score = mobility.get(key)
+        if score is None:
+            val_str, delta = "N/A", "—"
         else:
-            visual = "—"
-        data.append([pitch, f"{velo:.1f} mph" if velo is not None else "N/A", visual])
+            cuts = thresholds.get(age_group, {}).get(key, {})
+            rmin, rmax = cuts.get("below_avg"), cuts.get("above_avg")
+            val_str = f"{float(score):.2f}"
+            if rmin is not None and rmax is not None and rmax != rmin:
+                delta = f"{(rmax - rmin):.2f}"
+            else:
+                delta = "—"
+        rows.append({"label": key, "key": key, "text": val_str, "delta": delta})
+
+    for key in ["30yd Time", "60yd Time", "5-5-10 Shuttle Time"]:
+        avg   = speeds.get(key)
+        rmin, rmax = speed_ranges.get(key, (None, None))
+        if avg is None:
+            val_str, delta = "N/A", "—"
+        else:
+            val_str = f"{avg:.2f} sec"
+            if rmin is not None and rmax is not None and rmax != rmin:
+                delta = f"{(rmax - rmin):.2f}"
+            else:
+                delta = "—"
+        rows.append({"label": key, "key": key, "text": val_str, "delta": delta})
+    return rows
+
+def dynamo_rows(dynamo_data, player_name):
+    """Per Movement/Type means for one player; ``None`` without Dynamo data at all."""
+    if dynamo_data is None or dynamo_data.empty:
+        return None
+    name = str(player_name).lower().strip()
+    # selected slices already carry the normalized key; raw frames fall back to Name
+    nm = dynamo_data["nm"] if "nm" in dynamo_data.columns else name_key(dynamo_data, ["Name"])
+    mask = (nm == name).to_numpy()
+    if not mask.any():
+        return []
+
+    agg  = dynamo_means(measurement_table({"dynamo": dynamo_data[mask]}))
+    rows = []
+    for _, r in agg.iterrows():
+        rows.append([
+            r["Movement"], r["Type"],
+            f"{r.get('ROM Asymmetry (%)'):.1f}" if not pd.isna(r.get("ROM Asymmetry (%)")) else "N/A",
+            f"{r.get('Force Asymmetry (%)'):.1f}" if not pd.isna(r.get("Force Asymmetry (%)")) else "N/A",
+            f"{r.get('L Max ROM (°)'):.1f}" if not pd.isna(r.get("L Max ROM (°)")) else "N/A",
+            f"{r.get('R Max ROM (°)'):.1f}" if not pd.isna(r.get("R Max ROM (°)")) else "N/A"
+        ])
+    return rows
 
-    table = Table(data, colWidths=[width*0.30, width*0.12, width*0.30], hAlign="LEFT")
+# ─────────────────────────────────────────────────────────────────────────────
+# TABLE BUILDERS FOR PDF
+# ─────────────────────────────────────────────────────────────────────────────
+def build_gameplay_data_table(
+    averages: dict,
+    ranges: dict,
+    max_ev: float,
+    percentile_90_ev: float,
+    velocities: dict,
+    width: float,
+    thresholds: dict,
+    age_group: str,
+    percentiles: dict = None,
+):
+    from reportlab.lib import colors
+    from reportlab.platypus import Paragraph, Table, TableStyle
+
+    styles   = pdf_styles()
+    RangeBar = range_bar_flowable()
+    data = [["Metric", "Value", "Range / Visual"]]
+    rows = gameplay_rows(averages, ranges, max_ev, percentile_90_ev, velocities, thresholds, age_group)
+    for r in rows:
+        if r["bar"]:
+            visual = RangeBar(r["value"], r["rmin"], r["rmax"], width=BAR_WIDTH, height=BAR_HEIGHT,
+                              fill_color=colors.HexColor(r["color"]), show_range=False)
+        else:
+            visual = "—"
+        label = Paragraph(r["label"], styles["Normal"]) if r["wrap"] else r["label"]
+        data.append([label, r["text"], visual])
+    row_keys = [r["key"] for r in rows]
+
+    col_widths = [width*0.30, width*0.12, width*0.30]
+    if percentiles is not None:
+        data, col_widths = add_percentile_column(data, row_keys, percentiles, col_widths, width)
+    table = Table(data, colWidths=col_widths, hAlign="LEFT")
     table.setStyle(TableStyle([
         ('BACKGROUND',    (0,0), (-1,0), colors.HexColor('#D4AF37')),
         ('TEXTCOLOR',     (0,0), (-1,0), colors.black),
@@ -537,39 +1431,15 @@ def build_gameplay_data_table(
     return table
 
 def build_dynamo_table(dynamo_data, player_info, width):
+    from reportlab.lib import colors
     from reportlab.lib.styles import getSampleStyleSheet
-    if dynamo_data is None or dynamo_data.empty:
+    from reportlab.platypus import Paragraph, Table, TableStyle
+    rows = dynamo_rows(dynamo_data, player_info.get("Name", ""))
+    if rows is None:
         return Paragraph("No Dynamo Data", getSampleStyleSheet()["Normal"])
-    name = player_info.get("Name", "").lower()
-    df = dynamo_data[dynamo_data["Name"].str.lower() == name]
-    if df.empty:
+    if not rows:
         return Paragraph("No Dynamo Data for this player", getSampleStyleSheet()["Normal"])
-
-    numeric_cols = [
-        "ROM Asymmetry (%)","Force Asymmetry (%)",
-        "L Max ROM (°)","R Max ROM (°)",
-        "L Max Force (N)","R Max Force (N)",
-    ]
-    for col in numeric_cols:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors="coerce")
-    agg = df.groupby(["Movement","Type"], as_index=False).agg({
-        "ROM Asymmetry (%)": "mean",
-        "Force Asymmetry (%)": "mean",
-        "L Max ROM (°)":      "mean",
-        "R Max ROM (°)":      "mean",
-        "L Max Force (N)":    "mean",
-        "R Max Force (N)":    "mean",
-    })
-    data = [["Movement", "Type", "ROM Asym", "Force Asym", "L Max", "R Max"]]
-    for _, r in agg.iterrows():
-        data.append([
-            r["Movement"], r["Type"],
-            f"{r.get('ROM Asymmetry (%)'):.1f}" if not pd.isna(r.get("ROM Asymmetry (%)")) else "N/A",
-            f"{r.get('Force Asymmetry (%)'):.1f}" if not pd.isna(r.get("Force Asymmetry (%)")) else "N/A",
-            f"{r.get('L Max ROM (°)'):.1f}" if not pd.isna(r.get("L Max ROM (°)")) else "N/A",
-            f"{r.get('R Max ROM (°)'):.1f}" if not pd.isna(r.get("R Max ROM (°)")) else "N/A"
-        ])
+    data = [list(DYNAMO_TABLE_HEADER)] + rows
     tbl = Table(data, colWidths=[width/6]*6)
     tbl.setStyle(TableStyle([
         ('BACKGROUND',    (0,0), (-1,0), colors.HexColor('#D4AF37')),
@@ -590,38 +1460,23 @@ def build_profile_table(
     speed_ranges: dict,
     width: float,
     thresholds: dict,
-    age_group: str
+    age_group: str,
+    percentiles: dict = None,
 ):
-    data = [["Metric", "Value", "Δ (max–min)"]]
+    from reportlab.lib import colors
+    from reportlab.platypus import Paragraph, Table, TableStyle
 
-    for key in ["Ankle", "Thoracic", "Lumbar"]:
-        score = mobility.get(key)
-        if score is None:
-            val_str, delta = "N/A", "—"
-        else:
-            cuts = thresholds.get(age_group, {}).get(key, {})
-            rmin, rmax = cuts.get("below_avg"), cuts.get("above_avg")
-            val_str = f"{float(score):.2f}"
-            if rmin is not None and rmax is not None and rmax != rmin:
-                delta = f"{(rmax - rmin):.2f}"
-            else:
-                delta = "—"
-        data.append([Paragraph(key, styles["Normal"]), val_str, Paragraph(delta, styles["Normal"])])
-
-    for key in ["30yd Time", "60yd Time", "5-5-10 Shuttle Time"]:
-        avg   = speeds.get(key)
-        rmin, rmax = speed_ranges.get(key, (None, None))
-        if avg is None:
-            val_str, delta = "N/A", "—"
-        else:
-            val_str = f"{avg:.2f} sec"
-            if rmin is not None and rmax is not None and rmax != rmin:
-                delta = f"{(rmax - rmin):.2f}"
-            else:
-                delta = "—"
-        data.append([Paragraph(key, styles["Normal"]), val_str, Paragraph(delta, styles["Normal"])])
-
-    tbl = Table(data, colWidths=[width*0.30, width*0.12, width*0.30], hAlign="LEFT")
+    styles = pdf_styles()
+    data = [["Metric", "Value", "Δ (max–min)"]]
+    rows = profile_rows(mobility, speeds, speed_ranges, thresholds, age_group)
+    for r in rows:
+        data.append([Paragraph(r["label"], styles["Normal"]), r["text"], Paragraph(r["delta"], styles["Normal"])])
+    row_keys = [r["key"] for r in rows]
+
+    col_widths = [width*0.30, width*0.12, width*0.30]
+    if percentiles is not None:
+        data, col_widths = add_percentile_column(data, row_keys, percentiles, col_widths, width)
+    tbl = Table(data, colWidths=col_widths, hAlign="LEFT")
     tbl.setStyle(TableStyle([
         ('BACKGROUND',    (0,0), (-1,0), colors.HexColor('#D4AF37')),
         ('TEXTCOLOR',     (0,0), (-1,0), colors.black),
@@ -635,12 +1490,132 @@ def build_profile_table(
     ]))
     return tbl
 
+# ─────────────────────────────────────────────────────────────────────────────
+# PDF OUTPUT PROFILES (standard vs. compact for archival / bulk distribution)
+# ─────────────────────────────────────────────────────────────────────────────
+# "standard" is the report as it has always been built. "compact" renders the
+# charts as JPEG at print density (ReportLab embeds JPEG data as-is, while PNGs
+# are re-encoded as raw RGB + alpha mask), downsamples the logo once per process
+# to the size it is printed at, and writes compressed streams as binary instead
+# of wrapping them in ASCII85. Identical charts (the cohort heatmap is the same
+# for every player of an age group) are rendered once and reused; within one
+# PDF, ReportLab already stores repeated image data only once. Text uses the
+# base-14 Helvetica faces, which viewers supply, so no font data is embedded in
+# either profile (ReportLab subsets any TrueType font it is given).
+PDF_PROFILES = {
+    "standard": {"chart_dpi": 150, "chart_format": "png",  "logo_dpi": None, "ascii85": True},
+    "compact":  {"chart_dpi": 110, "chart_format": "jpeg", "logo_dpi": 200,  "ascii85": False},
+}
+PDF_JPEG_QUALITY   = 85
+PDF_SECTIONS       = ["header", "gameplay", "charts", "profile", "notes", "dynamo"]
+RASTER_CACHE_ITEMS = 32
+
+_rasters, _rasters_lock = OrderedDict(), threading.Lock()
+# ReportLab reads ASCII85 wrapping from rl_config.useA85 throughout a build
+# and has no per-document setting: every doc.build runs under this lock with
+# the flag set for its own profile, so overlapping builds never mix outputs.
+_pdf_build_lock = threading.Lock()
+
+@functools.lru_cache(maxsize=None)
+def logo_image_bytes(path, profile="standard") -> bytes:
+    """The logo as embedded by *profile*: the file itself, or flattened onto the
+    black header and downsampled to its printed size (once per process)."""
+    data, dpi = logo_bytes(path), PDF_PROFILES[profile]["logo_dpi"]
+    if not data or dpi is None:
+        return data
+    from PIL import Image as PILImage
+
+    px = max(1, round(LOGO_SIZE / 72 * dpi))
+    with PILImage.open(BytesIO(data)) as im:
+        im = im.convert("RGBA")
+        flat = PILImage.new("RGB", im.size, (0, 0, 0))  # draw_header_bg paints black behind the logo
+        flat.paste(im, mask=im.getchannel("A"))
+    out = BytesIO()
+    # square, like the Image flowable it is drawn into
+    flat.resize((px, px), PILImage.LANCZOS).save(out, format="JPEG", quality=PDF_JPEG_QUALITY, optimize=True)
+    return out.getvalue()
+
+def raster_key(kind, profile, *arrays) -> str:
+    h = hashlib.blake2b(f"{kind}|{profile}".encode(), digest_size=16)
+    for a in arrays:
+        h.update(np.ascontiguousarray(a, dtype=float).tobytes())
+    return h.hexdigest()
+
+def chart_bytes(key, draw, profile="standard") -> bytes:
+    """The matplotlib figure *draw()* returns, encoded for *profile*; charts with
+    the same *key* are drawn once and reused."""
+    with _rasters_lock:
+        data = _rasters.get(key)
+        if data is not None:
+            _rasters.move_to_end(key)
+    if data is None:
+        import matplotlib.pyplot as plt
+
+        opts = PDF_PROFILES[profile]
+        fig = draw()
+        buf = BytesIO()
+        plt.tight_layout(pad=0)
+        if opts["chart_format"] == "jpeg":
+            fig.savefig(buf, format="jpeg", dpi=opts["chart_dpi"], facecolor="white",
+                        pil_kwargs={"quality": PDF_JPEG_QUALITY, "optimize": True})
+        else:
+            fig.savefig(buf, format="png", dpi=opts["chart_dpi"], transparent=True)
+        plt.close(fig)
+        data = buf.getvalue()
+        with _rasters_lock:
+            _rasters[key] = data
+            while len(_rasters) > RASTER_CACHE_ITEMS:
+                _rasters.popitem(last=False)
+    return data
+
+def render_chart(key, draw, size, profile="standard"):
+    from reportlab.platypus import Image
+    return Image(BytesIO(chart_bytes(key, draw, profile)), width=size, height=size)
+
+@contextlib.contextmanager
+def pdf_stream_encoding(profile):
+    """Hold _pdf_build_lock with ASCII85 set for *profile* while a document builds."""
+    from reportlab import rl_config
+
+    with _pdf_build_lock:
+        saved, rl_config.useA85 = rl_config.useA85, int(PDF_PROFILES[profile]["ascii85"])
+        try:
+            yield
+        finally:
+            rl_config.useA85 = saved
+
+def contact_points(fs) -> pd.DataFrame:
+    """Contact location (ft, t=0 of the hit polynomials) and exit speed of every
+    Flightscope row with both."""
+    def _at_contact(col):
+        if col not in fs.columns:
+            return pd.Series(np.nan, index=fs.index)
+        return pd.Series(parse_poly_coeffs(fs[col])[:, 0], index=fs.index)
+
+    px = _at_contact("Hit_Poly_X")
+    pz = _at_contact("Hit_Poly_Z")
+    ev = (pd.to_numeric(fs["Exit_Speed"], errors="coerce") if "Exit_Speed" in fs.columns
+          else pd.Series(np.nan, index=fs.index))
+    ok = (px.notna() & pz.notna() & (ev > 0)).to_numpy()
+    return pd.DataFrame({
+        "Parsed_X":   px[ok],
+        "Parsed_Z":   pz[ok],
+        "Exit_Speed": ev[ok],
+        # catcher view
+        "PlateLocSide":   -px[ok] * 12.0,
+        "PlateLocHeight":  pz[ok] * 12.0,
+    })
+
 # Heatmap used in PDF
-def generate_exit_velo_heatmap(df):
-    import numpy as np
-    import matplotlib.pyplot as plt
+def generate_exit_velo_heatmap(df, size=280, profile="standard"):
+    data = exit_velo_heatmap_bytes(df, profile)
+    if data is None:
+        return None
     from reportlab.platypus import Image
-    from io import BytesIO
+    return Image(BytesIO(data), width=size, height=size)
+
+def exit_velo_heatmap_bytes(df, profile="standard"):
+    import matplotlib.pyplot as plt
     if df is None or df.empty:
         return None
     if not set(["Parsed_X","Parsed_Z","Exit_Speed"]).issubset(df.columns):
@@ -650,33 +1625,67 @@ def generate_exit_velo_heatmap(df):
     y = df["Parsed_Z"].values * 12
     c = df["Exit_Speed"].values
 
-    Zoom_ext = [-18, 18, 0, 60]
-    fig, ax = plt.subplots(figsize=(5,5))
-    hb = ax.hexbin(
-        x, y, C=c, reduce_C_function=np.mean, gridsize=(8,8),
-        cmap="coolwarm", mincnt=1, extent=Zoom_ext
+    def draw():
+        Zoom_ext = HEATMAP_EXTENT
+        fig, ax = plt.subplots(figsize=(5,5))
+        hb = ax.hexbin(
+            x, y, C=c, reduce_C_function=np.mean, gridsize=HEATMAP_GRIDSIZE,
+            cmap="coolwarm", mincnt=1, extent=Zoom_ext
+        )
+        ax.set_xlim(Zoom_ext[0], Zoom_ext[1])
+        ax.set_ylim(Zoom_ext[2], Zoom_ext[3])
+        ax.set_aspect("equal", "box")
+        ax.axis("off")
+
+        offsets = hb.get_offsets()
+        values  = hb.get_array()
+        for (cx, cy), v in zip(offsets, values):
+            ax.text(cx, cy, f"{v:.1f}", ha="center", va="center", fontsize=10, color="white")
+
+        sz_w, sz_h = 17, 25
+        left, bottom = -sz_w/2, 16
+        ax.add_patch(plt.Rectangle((left,bottom), sz_w, sz_h, fill=False, lw=2, edgecolor="black"))
+        ax.add_patch(plt.Rectangle((left,bottom), sz_w, sz_h, fill=False, lw=1, linestyle="--", edgecolor="black"))
+        return fig
+
+    return chart_bytes(raster_key("heatmap", profile, x, y, c), draw, profile)
+
+# Spray chart used in PDF (top-down view, plate at the origin)
+def generate_spray_chart(traj, exit_speed=None, size=280, profile="standard"):
+    import matplotlib.pyplot as plt
+    if traj is None or traj.empty:
+        return None, ""
+    ok = traj["Carry"].notna().to_numpy()
+    if not ok.any():
+        return None, ""
+    x, y = traj["Land_X"].to_numpy()[ok], traj["Land_Y"].to_numpy()[ok]
+    colors_ = exit_speed.to_numpy()[ok] if exit_speed is not None else None
+
+    def draw():
+        fig, ax = plt.subplots(figsize=(5, 5))
+        reach = max(400.0, float(np.nanmax(np.hypot(x, y))) * 1.05)
+        for sign in (-1, 1):  # foul lines
+            ax.plot([0, sign * reach * np.sin(np.pi/4)], [0, reach * np.cos(np.pi/4)], color="black", lw=1)
+        theta = np.linspace(-np.pi/4, np.pi/4, 60)
+        for r in range(100, int(reach) + 1, 100):
+            ax.plot(r * np.sin(theta), r * np.cos(theta), color="lightgrey", lw=0.8, ls="--")
+            ax.text(0, r, f"{r}", ha="center", va="bottom", fontsize=7, color="grey")
+        ax.scatter(x, y, c=colors_ if colors_ is not None else "tab:blue", cmap="coolwarm", s=14, edgecolors="none")
+        ax.set_aspect("equal", "box")
+        ax.axis("off")
+        return fig
+
+    key = raster_key("spray", profile, x, y, *([] if colors_ is None else [colors_]))
+    image = render_chart(key, draw, size, profile)
+
+    carry, apex = traj["Carry"].to_numpy()[ok], traj["Apex"].to_numpy()[ok]
+    spray = traj["Spray_Angle"].to_numpy()[ok]
+    summary = (
+        f"{ok.sum()} balls | avg carry {carry.mean():.0f} ft | max carry {carry.max():.0f} ft | "
+        f"avg apex {apex.mean():.0f} ft | L/C/R "
+        f"{(spray < -15).mean():.0%} / {(abs(spray) <= 15).mean():.0%} / {(spray > 15).mean():.0%}"
     )
-    ax.set_xlim(Zoom_ext[0], Zoom_ext[1])
-    ax.set_ylim(Zoom_ext[2], Zoom_ext[3])
-    ax.set_aspect("equal", "box")
-    ax.axis("off")
-
-    offsets = hb.get_offsets()
-    values  = hb.get_array()
-    for (cx, cy), v in zip(offsets, values):
-        ax.text(cx, cy, f"{v:.1f}", ha="center", va="center", fontsize=10, color="white")
-
-    sz_w, sz_h = 17, 25
-    left, bottom = -sz_w/2, 16
-    ax.add_patch(plt.Rectangle((left,bottom), sz_w, sz_h, fill=False, lw=2, edgecolor="black"))
-    ax.add_patch(plt.Rectangle((left,bottom), sz_w, sz_h, fill=False, lw=1, linestyle="--", edgecolor="black"))
-
-    buf = BytesIO()
-    plt.tight_layout(pad=0)
-    fig.savefig(buf, format="png", dpi=150, transparent=True)
-    plt.close(fig)
-    buf.seek(0)
-    return Image(buf, width=280, height=280)
+    return image, summary
 
 # ─────────────────────────────────────────────────────────────────────────────
 # PDF CREATION
@@ -693,42 +1702,57 @@ def create_combined_pdf(
     flightscope_data,
     mobility=None,
     dynamo_data=None,
+    percentiles=None,
+    flightscope_agg=None,
+    thresholds=None,
+    profile="standard",
+    omit=(),
 ):
+    """The one-page report; *omit* leaves out sections (names from PDF_SECTIONS),
+    which is how pdf_section_bytes() measures each one."""
+    from reportlab.lib import colors
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, KeepInFrame
+
+    styles = pdf_styles()
+    if thresholds is None:
+        thresholds = st.session_state.get("thresholds", {})
     buffer = BytesIO()
     doc = SimpleDocTemplate(
         buffer, pagesize=landscape(A3),
-        rightMargin=30, leftMargin=30, topMargin=10, bottomMargin=30
+        rightMargin=30, leftMargin=30, topMargin=10, bottomMargin=30,
+        pageCompression=1,
     )
     elements = []
 
-    header = build_header_with_logo_and_player_info(
-        "TNXL Miami - Updated Logo.png",  # put logo in repo root for Streamlit Cloud
-        player_info,
-        doc.width
-    )
-    elements.append(header)
+    if "header" not in omit:
+        header = build_header_with_logo_and_player_info(
+            LOGO_FILENAME,
+            player_info,
+            doc.width,
+            profile=profile,
+        )
+        elements.append(header)
     elements.append(Spacer(1, 12))
 
-    # Prepare heatmap
+    # Prepare heatmap (three derived columns only; the session frame is not copied)
     heatmap_img = None
-    if flightscope_data is not None and not flightscope_data.empty:
-        tmp = flightscope_data.copy()
-        tmp["Parsed_X"] = tmp.get("Hit_Poly_X", pd.Series([None]*len(tmp))).apply(
-            lambda p: safe_est_poly_at_t(0, p)
-        )
-        tmp["Parsed_Z"] = tmp.get("Hit_Poly_Z", pd.Series([None]*len(tmp))).apply(
-            lambda p: safe_est_poly_at_t(0, p)
-        )
-        tmp["Exit_Speed"] = pd.to_numeric(tmp.get("Exit_Speed"), errors="coerce")
-        valid = (
-            tmp.dropna(subset=["Parsed_X", "Parsed_Z", "Exit_Speed"])
-               .query("Exit_Speed > 0")
-               .copy()
-        )
-        # catcher view
-        valid["PlateLocSide"]   = -valid["Parsed_X"] * 12.0
-        valid["PlateLocHeight"] =  valid["Parsed_Z"] * 12.0
-        heatmap_img = generate_exit_velo_heatmap(valid)
+    spray_img, spray_txt = None, ""
+    if "charts" in omit:
+        pass
+    elif flightscope_agg is not None and not flightscope_agg.empty:
+        # streamed upload: hexagon means + bounded spray sample stand in for the raw rows
+        sample = flightscope_agg.sample
+        heatmap_img = generate_exit_velo_heatmap(flightscope_agg.heatmap_points(), size=CHART_SIZE, profile=profile)
+        spray_img, spray_txt = generate_spray_chart(sample[TRAJECTORY_COLUMNS], sample["Exit_Speed"],
+                                                    size=CHART_SIZE, profile=profile)
+        if spray_txt:
+            spray_txt += f" (sampled from {int(flightscope_agg.count.sum()):,})"
+    elif flightscope_data is not None and not flightscope_data.empty:
+        fs = flightscope_data
+        ev = (pd.to_numeric(fs["Exit_Speed"], errors="coerce") if "Exit_Speed" in fs.columns
+              else pd.Series(np.nan, index=fs.index))
+        heatmap_img = generate_exit_velo_heatmap(contact_points(fs), size=CHART_SIZE, profile=profile)
+        spray_img, spray_txt = generate_spray_chart(batted_ball_trajectories(fs), ev, size=CHART_SIZE, profile=profile)
 
     # Row 1: Gameplay vs Heatmap
     default_left_w  = doc.width * 0.61
@@ -741,16 +1765,25 @@ def create_combined_pdf(
             Spacer(1, 6),
             build_gameplay_data_table(
                 averages, ranges, max_ev, percentile_90_ev, velocities,
-                default_left_w, thresholds=st.session_state["thresholds"],
-                age_group=player_info["Age Group"]
+                default_left_w, thresholds=thresholds,
+                age_group=player_info["Age Group"], percentiles=percentiles,
             )
         ],
         hAlign="LEFT", mergeSpace=True
     )
 
-    right_contents = [Paragraph("AVG Exit Velocity by Zone", styles["Heading3"]), Spacer(1,6)]
-    right_contents.append(heatmap_img if heatmap_img else Paragraph("No heatmap data", styles["Normal"]))
-    right_frame = KeepInFrame(default_right_w, doc.height, right_contents, hAlign="LEFT", mergeSpace=True)
+    # heatmap and spray chart side by side so the report stays on one page
+    charts = Table(
+        [[Paragraph("AVG Exit Velocity by Zone", styles["Heading3"]), Paragraph("Spray Chart", styles["Heading3"])],
+         [heatmap_img if heatmap_img else Paragraph("No heatmap data", styles["Normal"]),
+          spray_img if spray_img else Paragraph("No trajectory data", styles["Normal"])],
+         ["", Paragraph(spray_txt, styles["Normal"])]],
+        colWidths=[default_right_w / 2] * 2,
+    )
+    charts.setStyle(TableStyle([("VALIGN", (0, 0), (-1, -1), "TOP")]))
+    right_frame = KeepInFrame(default_right_w, doc.height, [charts], hAlign="LEFT", mergeSpace=True)
+    gameplay_frame = "" if "gameplay" in omit else gameplay_frame
+    right_frame = "" if "charts" in omit else right_frame
 
     elements.append(Table([[gameplay_frame, right_frame]], colWidths=[default_left_w, default_right_w]))
     elements.append(Spacer(1, 12))
@@ -769,8 +1802,8 @@ def create_combined_pdf(
             Spacer(1, 6),
             build_profile_table(
                 mobility or {}, speeds or {}, speed_ranges or {}, left_w2,
-                thresholds=st.session_state.get("thresholds", {}),
-                age_group=player_info.get("Age Group"),
+                thresholds=thresholds,
+                age_group=player_info.get("Age Group"), percentiles=percentiles,
             ),
         ],
         hAlign="LEFT", mergeSpace=True,
@@ -795,6 +1828,8 @@ def create_combined_pdf(
         ("BOTTOMPADDING",(0, 0), (-1, -1), 4),
     ]))
 
+    physical_frame = "" if "profile" in omit else physical_frame
+    notes_tbl = "" if "notes" in omit else notes_tbl
     elements.extend([Table([[physical_frame, notes_tbl]], colWidths=[left_w2, notes_w]), Spacer(1, 12)])
 
     # Row 3: Dynamo
@@ -804,12 +1839,781 @@ def create_combined_pdf(
          build_dynamo_table(dynamo_data, player_info, default_left_w)],
         hAlign="LEFT", mergeSpace=True
     )
+    dynamo_frame = "" if "dynamo" in omit else dynamo_frame
     elements.append(Table([[dynamo_frame, '']], colWidths=[default_left_w, default_right_w]))
 
-    doc.build(elements, onFirstPage=draw_header_bg, onLaterPages=draw_header_bg)
+    with pdf_stream_encoding(profile):
+        doc.build(elements, onFirstPage=draw_header_bg, onLaterPages=draw_header_bg)
     buffer.seek(0)
     return buffer
 
+# ─────────────────────────────────────────────────────────────────────────────
+# HTML PREVIEW (same sections as the PDF, no ReportLab / matplotlib)
+# ─────────────────────────────────────────────────────────────────────────────
+PREVIEW_CSS = """
+<style>
+.tnxl {font-family: Helvetica, Arial, sans-serif; font-size: 13px; color: #111;}
+.tnxl .hdr {display: flex; background: linear-gradient(100deg, #000 62%, #D4AF37 62%);
+            color: #fff; padding: 12px 16px; border-radius: 4px;}
+.tnxl .hdr .who {flex: 1;} .tnxl .hdr .prog {text-align: right; color: #000;}
+.tnxl .hdr h2 {margin: 0 0 4px; color: #fff; font-size: 20px;}
+.tnxl .row {display: flex; gap: 16px; margin-top: 12px; align-items: flex-start;}
+.tnxl .row > div {flex: 61;} .tnxl .row > div + div {flex: 39;}
+.tnxl h4 {margin: 0 0 6px;}
+.tnxl table {border-collapse: collapse; width: 100%;}
+.tnxl th {background: #D4AF37; text-align: left;}
+.tnxl th, .tnxl td {border: 1px solid #ddd; padding: 3px 6px;}
+.tnxl tr:nth-child(odd) td {background: #FAFAFA;}
+.tnxl td.num {text-align: right;} .tnxl td.bar {text-align: center;}
+.tnxl .note {border: 1px solid #999; padding: 6px; white-space: pre-wrap;}
+</style>
+"""
+
+def range_bar_svg(value, rmin, rmax, color, width=BAR_WIDTH, height=BAR_HEIGHT, radius=3):
+    """SVG twin of ``RangeBar.draw``."""
+    pct = 0
+    if rmax > rmin:
+        pct = max(0, min((value - rmin) / (rmax - rmin), 1))
+    fill = pct * width
+    y, pad, lw = height / 2 + radius, radius, height / 3
+    return (
+        f'<svg width="{width + 2*pad}" height="{height + 2*radius}">'
+        f'<line x1="{pad}" y1="{y:.1f}" x2="{pad + width}" y2="{y:.1f}" stroke="lightgrey" stroke-width="{lw:.1f}"/>'
+        f'<line x1="{pad}" y1="{y:.1f}" x2="{pad + fill:.1f}" y2="{y:.1f}" stroke="{color}" stroke-width="{lw:.1f}"/>'
+        f'<circle cx="{pad + fill:.1f}" cy="{y:.1f}" r="{radius}" fill="{color}"/></svg>'
+    )
+
+def _html_table(header, rows):
+    """Plain cells are escaped; ``(css_class, html)`` tuples are trusted markup."""
+    from html import escape
+
+    def cell(c):
+        if isinstance(c, tuple):
+            return f'<td class="{c[0]}">{c[1]}</td>'
+        return f"<td>{escape(str(c))}</td>"
+
+    head = "".join(f"<th>{escape(str(h))}</th>" for h in header)
+    body = "".join("<tr>" + "".join(cell(c) for c in row) + "</tr>" for row in rows)
+    return f"<table><tr>{head}</tr>{body}</table>"
+
+def render_report_html(
+    player_info,
+    averages,
+    ranges,
+    max_ev,
+    percentile_90_ev,
+    velocities,
+    speeds,
+    speed_ranges,
+    thresholds,
+    mobility=None,
+    dynamo_data=None,
+    percentiles=None,
+) -> str:
+    """Lightweight HTML/SVG rendering of the combined report for the live preview."""
+    from html import escape
+
+    age_group = player_info.get("Age Group")
+    pct = (lambda k: ordinal(percentiles[k]) if percentiles.get(k) is not None else "—") if percentiles is not None else None
+
+    game = []
+    for r in gameplay_rows(averages, ranges, max_ev, percentile_90_ev, velocities, thresholds, age_group):
+        bar = range_bar_svg(r["value"], r["rmin"], r["rmax"], r["color"]) if r["bar"] else "—"
+        row = [r["label"], ("num", escape(r["text"])), ("bar", bar)]
+        game.append(row + ([pct(r["key"])] if pct else []))
+    game_hdr = ["Metric", "Value", "Range / Visual"] + (["Cohort %ile"] if pct else [])
+
+    prof = []
+    for r in profile_rows(mobility or {}, speeds or {}, speed_ranges or {}, thresholds, age_group):
+        row = [r["label"], ("num", escape(r["text"])), r["delta"]]
+        prof.append(row + ([pct(r["key"])] if pct else []))
+    prof_hdr = ["Metric", "Value", "Δ (max–min)"] + (["Cohort %ile"] if pct else [])
+
+    dyn = dynamo_rows(dynamo_data, player_info.get("Name", ""))
+    if dyn is None:
+        dyn_html = "<p>No Dynamo Data</p>"
+    elif not dyn:
+        dyn_html = "<p>No Dynamo Data for this player</p>"
+    else:
+        dyn_html = _html_table(DYNAMO_TABLE_HEADER, dyn)
+
+    notes_txt = player_info.get("LatestNoteText")
+    notes_txt = str(notes_txt) if notes_txt not in (None, "", "nan", "NaN") else "No scout notes available."
+
+    raw_h = player_info.get("Height", 0) or 0
+    try:
+        ft, inch = divmod(int(raw_h), 12)
+        height_text = f"{ft}′{inch}″"
+    except Exception:
+        height_text = f"{raw_h} in"
+    e = lambda k: escape(str(player_info.get(k, "") or ""))
+
+    return PREVIEW_CSS + f"""
+<div class="tnxl">
+  <div class="hdr">
+    <div class="who">
+      <h2>{e("Name")}</h2>
+      <div>{e("Position")} | {e("High School")} | {e("Class")}</div>
+      <div>Height: {escape(height_text)} | Weight: {e("Weight")} lbs</div>
+      <div>B/T:{e("B/T")}</div><div>DOB: {e("DOB")}</div>
+    </div>
+    <div class="prog"><b>Summer Development Program</b><br>Assessment Date: {e("AssessmentDate")}</div>
+  </div>
+  <div class="row">
+    <div><h4>Gameplay Data</h4>{_html_table(game_hdr, game)}</div>
+    <div><h4>Scout Notes</h4><div class="note">{escape(notes_txt)}</div></div>
+  </div>
+  <div class="row">
+    <div><h4>Physical Profile</h4>{_html_table(prof_hdr, prof)}</div>
+    <div><h4>Dynamo Summary</h4>{dyn_html}</div>
+  </div>
+</div>
+"""
+
+# ─────────────────────────────────────────────────────────────────────────────
+# REPORT INPUTS (one player's numbers; shared by the Reports tab and report_service.py)
+# ─────────────────────────────────────────────────────────────────────────────
+def report_player_info(prow, assess_date, notes_df=None) -> dict:
+    """Header fields for *prow* (a roster row) plus the latest scout note."""
+    info = {
+        "Name": prow["Name"],
+        "Age": int(prow["Age"]) if pd.notna(prow["Age"]) else None,
+        "Age Group": prow["Age Group"],
+        "Position": prow["Position"],
+        "Class": prow["Class"],
+        "High School": prow["High School"],
+        "Height": prow["Height"],
+        "Weight": prow["Weight"],
+        "B/T": f"{prow.get('BattingHandedness','')}/{prow.get('ThrowingHandedness','')}".rstrip("/"),
+        "DOB": prow["DOB"],
+        "AssessmentDate": assess_date.strftime("%m/%d/%Y"),
+    }
+    ndf = notes_df if notes_df is not None else pd.DataFrame(columns=["Name", "Date", "Note"])
+    last_note = ndf[ndf["Name"] == info["Name"]].sort_values("Date", ascending=False).Note.head(1)
+    info["LatestNoteText"] = last_note.iat[0] if not last_note.empty else ""
+    return info
+
+def report_metrics(player_info, sources, lookup, window=None, indexes=None) -> dict:
+    """Report rows and metrics for one player.
+
+    Blast / Flightscope / Dynamo are computed over the player's whole age-group
+    cohort, the other sources over the player alone. ``sources["flightscope"]``
+    may be a streamed FlightscopeAggregate instead of a frame (never windowed).
+    *window* limits every dated source to sessions in ``(start, end)``, using
+    the prebuilt SessionIndex objects in *indexes* where given.
+    """
+    grp = player_info["Age Group"]
+    key = str(player_info["Name"]).lower().strip()
+    fs  = sources.get("flightscope")
+    fs_agg = None if fs is None or isinstance(fs, pd.DataFrame) else fs
+    indexes = indexes or {}
+
+    def pick(source, df, **who):
+        return select_report_rows(df, REPORT_NAME_COLUMNS[source], source, window=window,
+                                  index=indexes.get(source), **who)
+
+    rows = {
+        "blast":       pick("blast",       sources.get("blast"), age_group=grp, lookup=lookup),
+        "flightscope": pick("flightscope", None if fs_agg is not None else fs, age_group=grp, lookup=lookup),
+        "throwing":    pick("throwing",    sources.get("throwing"), key=key),
+        "running":     pick("running",     sources.get("running"),  key=key),
+        "mobility":    pick("mobility",    sources.get("mobility"), key=key),
+        "dynamo":      pick("dynamo",      sources.get("dynamo"), age_group=grp, lookup=lookup),
+    }
+    stats = metric_summary(measurement_table(rows))
+    def stat(source, how):
+        return stats.loc[source, how].to_dict() if source in stats.index.get_level_values(0) else {}
+
+    fs_cohort = None
+    if fs_agg is not None:
+        fs_cohort = fs_agg.select([nm for nm in fs_agg.index if lookup.get(nm) == grp])
+        max_ev, p90_ev = fs_cohort.summary()
+    else:
+        max_ev, p90_ev = stat("flightscope", "max").get(EXIT_SPEED_METRIC), stat("flightscope", "p90").get(EXIT_SPEED_METRIC)
+    blast_lo, blast_hi = stat("blast", "min"), stat("blast", "max")
+    run_lo, run_hi     = stat("running", "min"), stat("running", "max")
+    mobility = stat("mobility", "first")
+    if rows["mobility"] is not None and not rows["mobility"].empty:
+        mobility = {m: mobility.get(m) for m in MOBILITY_COLUMNS.values()}
+    return {
+        "rows": rows, "flightscope_agg": fs_cohort,
+        "max_ev": max_ev, "p90_ev": p90_ev,
+        "averages": stat("blast", "mean"), "ranges": {m: (blast_lo[m], blast_hi[m]) for m in blast_lo},
+        "velocities": stat("throwing", "mean"),
+        "speeds": stat("running", "mean"), "speed_ranges": {m: (run_lo[m], run_hi[m]) for m in run_lo},
+        "mobility": mobility,
+    }
+
+def shown_metrics(metrics) -> dict:
+    """Metric name → value for every number the report prints (cohort percentile keys)."""
+    return {**metrics["averages"], "Max EV (mph)": metrics["max_ev"], "90th % EV (mph)": metrics["p90_ev"],
+            **metrics["velocities"], **metrics["speeds"], **metrics["mobility"]}
+
+def report_percentiles(cohorts, metrics, player_info, position=None) -> dict:
+    """Cohort percentile per shown metric. The Blast and exit-velocity numbers
+    are age-group aggregates, so for those the player's own value is ranked."""
+    grp   = player_info["Age Group"]
+    own   = cohorts.player_values(str(player_info["Name"]).lower().strip())
+    mixed = set(metrics["averages"]) | {"Max EV (mph)", "90th % EV (mph)"}
+    return {m: cohorts.percentile(grp, m, safe_float(own.get(m) if m in mixed else v), position)
+            for m, v in shown_metrics(metrics).items()}
+
+def report_pdf(player_info, metrics, percentiles=None, thresholds=None, profile="standard", omit=()) -> bytes:
+    rows = metrics["rows"]
+    return create_combined_pdf(
+        metrics["max_ev"], metrics["p90_ev"], metrics["averages"], metrics["ranges"],
+        metrics["velocities"], metrics["speeds"], metrics["speed_ranges"],
+        player_info, rows["flightscope"],
+        mobility=metrics["mobility"], dynamo_data=rows["dynamo"],
+        percentiles=percentiles, flightscope_agg=metrics["flightscope_agg"], thresholds=thresholds,
+        profile=profile, omit=omit,
+    ).getvalue()
+
+def pdf_section_bytes(player_info, metrics, percentiles=None, thresholds=None, profile="standard") -> dict:
+    """Bytes each report section adds to the PDF: the full document's size minus
+    its size without that section. "page" is what remains (page background,
+    document structure). Charts come from the raster cache, so the extra builds
+    are cheap."""
+    total = len(report_pdf(player_info, metrics, percentiles, thresholds, profile))
+    sizes = {sec: total - len(report_pdf(player_info, metrics, percentiles, thresholds, profile, omit=(sec,)))
+             for sec in PDF_SECTIONS}
+    sizes["page"] = total - sum(sizes.values())
+    sizes["total"] = total
+    return sizes
+
+# ─────────────────────────────────────────────────────────────────────────────
+# PROGRESSIVE PREVIEW (row sample first, exact numbers once the full parse lands)
+# ─────────────────────────────────────────────────────────────────────────────
+# A season-long upload is parsed on the upload pool in the background. Meanwhile
+# the Reports tab previews from a row sample drawn straight from the raw bytes:
+# random offsets, each taking the row that starts after the next newline. That
+# is uniform over rows of similar length and needs no pass over the file (a
+# reservoir would have to read all of it, which is the wait being avoided).
+PROGRESSIVE_BYTES        = 20 * 1024 * 1024  # uploads above this parse in the background
+PREVIEW_SAMPLE_ROWS      = 20_000
+PROGRESSIVE_POLL_SECONDS = 1.0
+
+def sample_csv_rows(data: bytes, k=PREVIEW_SAMPLE_ROWS, seed=0) -> pd.DataFrame:
+    """Header plus about *k* rows picked at random byte offsets of a CSV."""
+    head = data.find(b"\n") + 1
+    if head <= 0 or head >= len(data):
+        return read_upload_csv(data)
+    offsets = np.sort(np.random.default_rng(seed).integers(head - 1, len(data) - 1, k))
+    starts = sorted({data.find(b"\n", int(o)) + 1 for o in offsets} - {0, len(data)})
+    rows = []
+    for start in starts:
+        end = data.find(b"\n", start)
+        rows.append(data[start:None if end < 0 else end + 1])
+    return read_upload_csv(data[:head] + b"".join(r if r.endswith(b"\n") else r + b"\n" for r in rows))
+
+class ProgressiveParse:
+    """One upload being parsed in the background, with a row sample to preview from."""
+
+    def __init__(self, tag, data, pool=None):
+        self.tag     = tag
+        self.rows    = data.count(b"\n")  # ≈ data rows (header included, last newline optional)
+        self.started = time.time()
+        self.future  = (pool or upload_parse_pool()).submit(read_upload_csv, data)
+        try:
+            self.sample = sample_csv_rows(data)
+        except ValueError:  # unreadable sample (e.g. quoted line breaks): no preview, just wait
+            self.sample = None
+
+    def done(self) -> bool:
+        return self.future.done()
+
+def progressive_preview(jobs, player_info, lookup):
+    """Approximate report numbers from the samples of *jobs* still parsing; the app
+    reruns by itself once every job has finished."""
+    st.info("Large upload still parsing – the numbers below are **approximate** (row sample). "
+            "The exact report replaces them automatically.")
+    samples = {src: job.sample for src, job in jobs.items() if job.sample is not None}
+    for src, job in jobs.items():
+        st.caption(f"{src.title()}: ≈ from {len(job.sample) if job.sample is not None else 0:,} "
+                   f"of ~{job.rows:,} rows")
+    if samples:
+        approx = report_metrics(player_info, samples, lookup)
+        c1, c2 = st.columns([1, 1])
+        with c1:
+            if "flightscope" in samples:
+                m1, m2 = st.columns(2)
+                m1.metric("≈ Max EV (mph)", f"{approx['max_ev']:.1f}" if approx["max_ev"] is not None else "—")
+                m2.metric("≈ 90th % EV (mph)", f"{approx['p90_ev']:.1f}" if approx["p90_ev"] is not None else "—")
+            if approx["averages"]:
+                st.dataframe(pd.DataFrame({"Metric": list(approx["averages"]),
+                                           "≈ Average": list(approx["averages"].values())}),
+                             hide_index=True, use_container_width=True)
+        fs_rows = approx["rows"]["flightscope"]
+        if fs_rows is not None and not fs_rows.empty:
+            heatmap = exit_velo_heatmap_bytes(contact_points(fs_rows))
+            if heatmap:
+                c2.image(heatmap, caption="≈ AVG Exit Velocity by Zone (sample)", width=320)
+
+    @st.fragment(run_every=PROGRESSIVE_POLL_SECONDS)
+    def wait_for_parse():
+        left = [src for src, job in jobs.items() if not job.done()]
+        if not left:
+            st.rerun()
+        waited = time.time() - min(jobs[src].started for src in left)
+        st.caption(f"⏳ Parsing {', '.join(left)} in the background… {waited:.0f} s")
+    wait_for_parse()
+
+# ─────────────────────────────────────────────────────────────────────────────
+# REPORT CACHE (finished PDFs keyed by a digest of their inputs)
+# ─────────────────────────────────────────────────────────────────────────────
+REPORT_CACHE_DIR       = "report_cache"
+REPORT_CACHE_MAX_BYTES = 256 * 1024 * 1024
+REPORT_CACHE_VERSION   = "4"  # bump whenever the PDF layout changes
+
+def _digest_frame(h, df, rows=None):
+    if df is None:
+        h.update(b"<none>")
+        return
+    if not isinstance(df, pd.DataFrame):  # FlightscopeAggregate (class is redefined on every rerun)
+        h.update(f"<agg:{df.digest}>".encode())
+        return
+    h.update("\x1f".join(map(str, df.columns)).encode("utf-8"))
+    h.update(f"#{len(df)}".encode())
+    if df.empty:
+        return
+    try:
+        h.update((pd.util.hash_pandas_object(df, index=False).values if rows is None else rows).tobytes())
+    except TypeError:
+        h.update(df.to_csv(index=False).encode("utf-8"))
+
+def report_digest(player_info: dict, frames: dict, age_thresholds: dict, profile: str = "standard") -> str:
+    """Stable digest of everything that ends up in a player's PDF.
+
+    Only the thresholds of the player's own age group take part, so editing
+    another group's cut-offs leaves this report's cache entry valid.
+    """
+    import json
+
+    h = hashlib.blake2b(digest_size=20)
+    h.update(REPORT_CACHE_VERSION.encode())
+    h.update(profile.encode())
+    h.update(json.dumps(player_info, sort_keys=True, default=str).encode("utf-8"))
+    h.update(json.dumps(age_thresholds or {}, sort_keys=True, default=str).encode("utf-8"))
+    for name in sorted(frames):
+        h.update(name.encode())
+        _digest_frame(h, frames[name])
+    return h.hexdigest()
+
+def _report_cache_path(digest: str) -> str:
+    return os.path.join(REPORT_CACHE_DIR, f"{digest}.pdf")
+
+def report_cache_get(digest: str):
+    path = _report_cache_path(digest)
+    try:
+        with open(path, "rb") as fh:
+            data = fh.read()
+        os.utime(path)  # mark as recently used for eviction
+    except OSError:
+        return None
+    return data
+
+def report_cache_put(digest: str, data: bytes, max_bytes: int = REPORT_CACHE_MAX_BYTES):
+    import tempfile
+
+    os.makedirs(REPORT_CACHE_DIR, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=REPORT_CACHE_DIR, suffix=".tmp")
+    with os.fdopen(fd, "wb") as fh:
+        fh.write(data)
+    os.replace(tmp, _report_cache_path(digest))
+    evict_report_cache(max_bytes)
+
+def evict_report_cache(max_bytes: int = REPORT_CACHE_MAX_BYTES):
+    """Drop least-recently-used PDFs until the store fits in *max_bytes*."""
+    entries = []
+    try:
+        names = os.listdir(REPORT_CACHE_DIR)
+    except OSError:
+        return
+    for fn in names:
+        if not fn.endswith(".pdf"):
+            continue
+        path = os.path.join(REPORT_CACHE_DIR, fn)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+
+# ─────────────────────────────────────────────────────────────────────────────
+# ROSTER ANALYTICS EXPORT (every player's computed metrics → Parquet / Excel)
+# ─────────────────────────────────────────────────────────────────────────────
+EXPORT_CHUNK_ROWS = 5000  # rows per Parquet row group / Excel write batch
+BAND_LABELS       = ["Below", "Avg", "Above"]
+
+def roster_analytics(sources, roster, thresholds):
+    """Per-player metrics for the whole roster, yielded as ``(sheet, frame)`` pieces.
+
+    Sheets come one after the other, each in one piece per age group: ``Players``
+    (one row per roster player, every report metric as a float column),
+    ``Dynamo`` (asymmetries per player / movement / type) and ``Bands`` (each
+    metric against the player's age-group thresholds, same cut-offs as the PDF
+    bar colours). Pieces of a sheet share columns and dtypes (categoricals keep
+    the same categories), so writers stream them out as they arrive.
+    """
+    members = cohort_members(roster)
+    players = members.assign(Age=roster["Age"].set_axis(roster["Name"].astype(str).str.lower().str.strip())
+                                              .groupby(level=0).last())
+    players = players[["Name", "Age", "Age Group", "Position"]]
+    long = measurement_table(sources)
+    vals = player_values(long)
+    fs   = sources.get("flightscope")
+    if fs is not None and not isinstance(fs, pd.DataFrame):  # streamed: aggregates only, no rows
+        vals = vals.join(per_player_metrics("flightscope", fs), how="outer")
+    if not vals.empty:
+        players = players.join(vals, how="left")
+    metric_cols = list(players.columns[4:])
+    seen   = set(players["Age Group"].dropna())
+    groups = pd.CategoricalDtype([g for g in AGE_LABELS if g in seen] + sorted(seen - set(AGE_LABELS), key=str))
+    players = players.reset_index(drop=True).astype(
+        {"Age": "Int64", "Age Group": groups, "Position": "category", **{c: "float64" for c in metric_cols}})
+
+    dynamo = dynamo_means(long)
+    del long, vals  # the measurement rows are not needed past this point
+    if not dynamo.empty:
+        cols = list(dynamo.columns[3:])
+        dynamo = (dynamo.join(members, on="nm", how="inner")
+                        .reindex(columns=["Name", "Age Group", "Position", "Movement", "Type", *cols]))
+    else:
+        dynamo = pd.DataFrame(columns=["Name", "Age Group", "Position", "Movement", "Type"])
+    dynamo = dynamo.astype({"Age Group": groups, "Position": players["Position"].dtype,
+                            "Movement": "category", "Type": "category"}).reset_index(drop=True)
+
+    cuts = flatten_thresholds(copy.deepcopy(thresholds)) if thresholds else pd.DataFrame(
+        columns=["Age Group", "Metric", "below_avg", "avg", "above_avg"])
+    metrics = pd.CategoricalDtype(metric_cols)
+
+    def bands(chunk):
+        long = chunk.melt(id_vars=["Name", "Age Group"], value_vars=metric_cols,
+                          var_name="Metric", value_name="Value").dropna(subset=["Value"])
+        long["Age Group"] = long["Age Group"].astype(object)
+        out = long.merge(cuts, on=["Age Group", "Metric"], how="left")
+        lower = out["Metric"].isin(LOWER_IS_BETTER).to_numpy()
+        v, avg, top = out["Value"].to_numpy(float), out["avg"].to_numpy(float), out["above_avg"].to_numpy(float)
+        # higher-is-better: ≥ above_avg → Above, ≥ avg → Avg; running times mirror it
+        level = np.where(lower, (v <= avg).astype(int) + (v <= top), (v >= avg).astype(int) + (v >= top))
+        out["Band"] = pd.Categorical.from_codes(np.where(np.isnan(avg), -1, level), BAND_LABELS)
+        return out.astype({"Age Group": groups, "Metric": metrics, "Value": "float64", "below_avg": "float64",
+                           "avg": "float64", "above_avg": "float64"}).reset_index(drop=True)
+
+    for sheet, df, piece in [("Players", players, None), ("Dynamo", dynamo, None), ("Bands", players, bands)]:
+        chunks = [chunk for _, chunk in df.groupby("Age Group", observed=True, dropna=False)] or [df]
+        for chunk in chunks:
+            yield sheet, piece(chunk) if piece else chunk.reset_index(drop=True)
+
+def _export_chunks(df, size=EXPORT_CHUNK_ROWS):
+    for start in range(0, len(df), size):
+        yield df.iloc[start:start + size]
+
+def _export_sheets(pieces):
+    """``(sheet, first frame, later frames)`` per sheet of roster_analytics' stream."""
+    for sheet, group in itertools.groupby(pieces, key=lambda piece: piece[0]):
+        frames = (df for _, df in group)
+        yield sheet, next(frames), frames
+
+def write_analytics_parquet(pieces, out):
+    """One typed Parquet file per sheet inside a zip; each piece is written as
+    row groups as soon as it arrives."""
+    import zipfile
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    with zipfile.ZipFile(out, "w", zipfile.ZIP_STORED) as zf:
+        for sheet, first, rest in _export_sheets(pieces):
+            schema = pa.Schema.from_pandas(first, preserve_index=False)
+            with zf.open(f"{sheet.lower()}.parquet", "w") as fh, pq.ParquetWriter(fh, schema) as writer:
+                for df in itertools.chain([first], rest):
+                    for chunk in _export_chunks(df):
+                        writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+    return out
+
+def write_analytics_excel(pieces, out):
+    """Multi-sheet workbook, sheet by sheet; rows are flushed as they are written (constant memory)."""
+    import xlsxwriter
+
+    wb   = xlsxwriter.Workbook(out, {"constant_memory": True})
+    bold = wb.add_format({"bold": True})
+    for sheet, first, rest in _export_sheets(pieces):
+        ws = wb.add_worksheet(sheet)
+        ws.write_row(0, 0, list(map(str, first.columns)), bold)
+        ws.freeze_panes(1, 1)
+        r = 1
+        for df in itertools.chain([first], rest):
+            for chunk in _export_chunks(df):
+                cells = chunk.astype(object).where(chunk.notna(), None)
+                for row in cells.itertuples(index=False, name=None):
+                    ws.write_row(r, 0, row)
+                    r += 1
+    wb.close()
+    return out
+
+# ─────────────────────────────────────────────────────────────────────────────
+# INGESTED DATA STORE (device exports picked up from the inbox folder)
+# ─────────────────────────────────────────────────────────────────────────────
+# inbox_daemon.py appends new rows here; the Reports tab falls back to these
+# frames for any source that has no browser upload.
+INGEST_DIR        = "ingested"
+INGEST_MANIFEST   = "processed_files.csv"
+ROW_DIGEST_COLUMN = "_row_digest"
+MANIFEST_COLUMNS  = ["digest", "file", "source", "rows", "new_rows", "status", "processed_at"]
+
+SOURCE_SIGNATURES = {
+    "blast":       set(BLAST_METRIC_KEYS),
+    "flightscope": {"exit_speed", "hit_poly_x", "hit_poly_y", "hit_poly_z", "batter"},
+    "throwing":    {"positional throw velocity", "pulldown velocity", "fb velocity",
+                    "sl velocity", "cb velocity", "ch velocity"},
+    "running":     {"athleteid", "30yd time", "60yd time", "5-5-10 shuttle time"},
+    "mobility":    {"ankle mobility", "thoracic mobility", "lumbar mobility"},
+    "dynamo":      {"movement", "type", *(c.lower() for c in DYNAMO_NUMERIC_COLUMNS)},
+}
+
+# identifiers that many sheets carry: they back up a metric column but never decide alone
+WEAK_SIGNATURE_COLUMNS = {"batter", "athleteid", "movement", "type"}
+SOURCE_LABELS = {"blast": "Blast", "flightscope": "Flightscope", "throwing": "Throwing Velocities",
+                 "running": "Running Speed", "mobility": "Mobility", "dynamo": "Dynamo"}
+SNIFF_BYTES = 16 * 1024  # header row plus a few data rows
+
+def detect_source(columns):
+    """Source whose signature best matches the header names, else ``None``.
+
+    A source scores its shared names when one of them is a metric column and
+    there are two of them, or one plus that source's player-name column (a
+    single-metric sheet). Ties stay unrecognized.
+    """
+    cols = {str(c).strip().lower() for c in columns}
+
+    def score(src):
+        hits  = cols & SOURCE_SIGNATURES[src]
+        named = any(c.lower() in cols for c in REPORT_NAME_COLUMNS[src])
+        return len(hits) if hits - WEAK_SIGNATURE_COLUMNS and (len(hits) >= 2 or named) else 0
+    scores = sorted(((score(src), src) for src in SOURCE_SIGNATURES), reverse=True)
+    (best, src), (runner_up, _) = scores[0], scores[1]
+    return src if best and best > runner_up else None
+
+def sniff_columns(head: bytes) -> list:
+    """Header names from the first bytes of a CSV; a name cut off by *head*'s end is dropped."""
+    import csv
+
+    line, newline, _ = head.partition(b"\n")
+    for enc in ("utf-8-sig", "cp1252", "latin-1"):  # latin-1 decodes anything
+        try:
+            text = line.decode(enc)
+            break
+        except UnicodeDecodeError:
+            continue
+    cols = next(csv.reader([text.rstrip("\r")]), [])
+    return cols if newline else cols[:-1]
+
+def sniff_source(file):
+    """Device source of a CSV (path or file object) judged from its first SNIFF_BYTES."""
+    if isinstance(file, (str, os.PathLike)):
+        with open(file, "rb") as fh:
+            head = fh.read(SNIFF_BYTES)
+    else:
+        pos = file.tell()
+        file.seek(0)
+        head = file.read(SNIFF_BYTES)
+        file.seek(pos)
+    return detect_source(sniff_columns(head))
+
+def route_uploads(files):
+    """Multi-file drop → ``({source: first file}, unrecognized files, [(source, later file)])``."""
+    routed, unknown, extra = {}, [], []
+    for f in files or []:
+        src = sniff_source(f)
+        if src is None:
+            unknown.append(f)
+        elif src in routed:
+            extra.append((src, f))
+        else:
+            routed[src] = f
+    return routed, unknown, extra
+
+def file_digest(path, chunk=1 << 20) -> str:
+    h = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(chunk), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def row_digests(df) -> pd.Series:
+    """Content hash per row: the sum of one hash per non-empty (column, value) cell.
+
+    Numbers are hashed in one canonical form, so "85" and "85.0" match, and
+    neither column order nor columns a file lacks (empty in the store) matter.
+    """
+    total = np.zeros(len(df), dtype=np.uint64)
+    for c in df.columns:
+        if c == ROW_DIGEST_COLUMN:
+            continue
+        col  = df[c]
+        num  = pd.to_numeric(col, errors="coerce").astype("float64")
+        text = col.astype(str).where(num.isna(), num.astype(str))
+        cell = pd.util.hash_array((f"{c}\x1f" + text).to_numpy(dtype=object))
+        total += np.where(col.notna().to_numpy(), cell, np.uint64(0))  # wraps mod 2**64
+    return pd.Series(total, index=df.index).astype(str)
+
+def _ingest_path(source, store_dir=INGEST_DIR):
+    return os.path.join(store_dir, f"{source}.csv")
+
+def load_ingested(source, store_dir=INGEST_DIR, *, with_digests=False):
+    try:
+        df = pd.read_csv(_ingest_path(source, store_dir), dtype={ROW_DIGEST_COLUMN: str}, low_memory=False)
+    except (FileNotFoundError, pd.errors.EmptyDataError):
+        return pd.DataFrame()
+    return df if with_digests else df.drop(columns=ROW_DIGEST_COLUMN, errors="ignore")
+
+ROW_DIGEST_VERSION = 2  # bump with row_digests: sidecar indexes are then rebuilt from the stores
+
+def _digest_path(source, store_dir=INGEST_DIR):
+    return os.path.join(store_dir, f"{source}.v{ROW_DIGEST_VERSION}.digests")
+
+_digest_index = {}  # sidecar path → (bytes read, digests); later calls read only what was appended
+
+def stored_digests(source, store_dir=INGEST_DIR) -> set:
+    """Row digests already stored for *source*, from the store's sidecar index
+    (one digest per line), which is built by hashing the stored rows the first
+    time (or after ROW_DIGEST_VERSION changes)."""
+    path = _digest_path(source, store_dir)
+    if not os.path.exists(path):
+        current = load_ingested(source, store_dir)
+        if not current.empty:
+            with open(path, "w", encoding="ascii") as fh:
+                fh.writelines(f"{d}\n" for d in row_digests(current))
+    read, seen = _digest_index.get(path, (0, set()))
+    try:
+        with open(path, "rb") as fh:
+            if os.fstat(fh.fileno()).st_size < read:  # index rebuilt since: start over
+                read, seen = 0, set()
+            fh.seek(read)
+            seen.update(fh.read().decode("ascii").split())
+            read = fh.tell()
+    except FileNotFoundError:
+        return set()
+    _digest_index[path] = (read, seen)
+    return seen
+
+def ingest_rows(source, df, store_dir=INGEST_DIR) -> int:
+    """Append the rows of *df* not already stored for *source*; returns how many were new.
+
+    New rows are appended to the store and their digests to its sidecar index,
+    so a file costs its own rows, not a pass over the store. Only a file that
+    brings columns the store has never had rewrites it with the union.
+    """
+    digests = row_digests(df)
+    seen    = stored_digests(source, store_dir)
+    fresh   = (~digests.isin(seen) & ~digests.duplicated()).to_numpy()
+    if not fresh.any():
+        return 0
+    new  = df[fresh].assign(**{ROW_DIGEST_COLUMN: digests[fresh].to_numpy()})
+    path = _ingest_path(source, store_dir)
+    try:
+        header = list(pd.read_csv(path, nrows=0).columns)
+    except (FileNotFoundError, pd.errors.EmptyDataError):
+        header = None
+    if header is not None and set(new.columns) <= set(header):
+        with open(path, "a", newline="", encoding="utf-8") as fh:
+            fh.write(new.reindex(columns=header).to_csv(header=False, index=False))  # one write: whole rows
+    else:
+        current = load_ingested(source, store_dir, with_digests=True) if header is not None else pd.DataFrame()
+        _atomic_csv(pd.concat([current, new], ignore_index=True), path)
+    with open(_digest_path(source, store_dir), "a", encoding="ascii") as fh:
+        fh.writelines(f"{d}\n" for d in new[ROW_DIGEST_COLUMN])
+    return int(fresh.sum())
+
+def load_manifest(store_dir=INGEST_DIR) -> pd.DataFrame:
+    try:
+        return pd.read_csv(os.path.join(store_dir, INGEST_MANIFEST))
+    except (FileNotFoundError, pd.errors.EmptyDataError):
+        return pd.DataFrame(columns=MANIFEST_COLUMNS)
+
+def processed_digests(store_dir=INGEST_DIR) -> set:
+    """Digests of files that need no further attempt: only transient errors
+    ("error: …") are retried; content that failed to parse ("failed: …") is not."""
+    manifest = load_manifest(store_dir)
+    failed   = manifest["status"].astype(str).str.startswith("error")
+    return set(manifest.loc[~failed, "digest"])
+
+def record_processed(entry: dict, store_dir=INGEST_DIR):
+    path  = os.path.join(store_dir, INGEST_MANIFEST)
+    first = not os.path.exists(path)
+    pd.DataFrame([entry], columns=MANIFEST_COLUMNS).to_csv(path, mode="a", header=first, index=False)
+
+def _atomic_csv(df, path):
+    import tempfile
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    with os.fdopen(fd, "w", newline="", encoding="utf-8") as fh:
+        df.to_csv(fh, index=False)
+    os.replace(tmp, path)  # readers never see a half-written store
+
+def ingest_file(path, store_dir=INGEST_DIR, known=None) -> dict:
+    """Hash, detect and ingest one export; every outcome is recorded in the manifest.
+
+    *known* is the set of digests already processed (processed_digests()
+    when omitted). Files whose content was seen before are skipped unread, and
+    files whose header matches no device are never parsed past it. A read
+    error (locked, vanished, still being written) is transient: it is recorded
+    as "error" but not added to *known*, so a later poll or restart tries again.
+    Content that does not parse is recorded as "failed" and added to *known*,
+    so it is skipped until the file changes (a new digest).
+    """
+    if known is None:
+        known = processed_digests(store_dir)
+    entry = dict.fromkeys(MANIFEST_COLUMNS)
+    entry.update(file=os.path.basename(path), processed_at=datetime.datetime.now().isoformat(timespec="seconds"))
+    try:
+        entry["digest"] = file_digest(path)
+        if entry["digest"] in known:
+            return {**entry, "status": "duplicate"}
+        with open(path, "rb") as fh:
+            entry["source"] = sniff_source(fh)
+            if entry["source"] is None:
+                entry["status"] = "unrecognized"
+            else:
+                df = smart_read_csv(fh)
+                entry["rows"]     = len(df)
+                entry["new_rows"] = ingest_rows(entry["source"], df, store_dir)
+                entry["status"]   = "ingested"
+    except OSError as exc:
+        entry["status"] = f"error: {exc}"
+    except ValueError as exc:  # decode / parser errors: the same bytes would fail again
+        entry["status"] = f"failed: {exc}"
+    record_processed(entry, store_dir)
+    if not entry["status"].startswith("error"):
+        known.add(entry["digest"])
+    return entry
+
+@st.cache_data(show_spinner=False)
+def cached_ingested(source, mtime):
+    """Stored rows for *source*; *mtime* keys the cache so new ingests show up."""
+    return load_ingested(source)
+
+def ingested_version(source):
+    """mtime of the source's ingested store (None when nothing was ingested)."""
+    try:
+        return os.path.getmtime(_ingest_path(source))
+    except OSError:
+        return None
+
+def ingested_frame(source):
+    mtime = ingested_version(source)
+    return pd.DataFrame() if mtime is None else cached_ingested(source, mtime)
+
 # ─────────────────────────────────────────────────────────────────────────────
 # PLAYER DB – LOAD/INIT
 # ─────────────────────────────────────────────────────────────────────────────
@@ -817,8 +2621,8 @@ expected_columns = [
     "Name", "DOB", "Age", "Class", "High School", "Height", "Weight",
     "Position", "BattingHandedness", "ThrowingHandedness"
 ]
+ROSTER_FACETS = ("Age Group", "Position", "High School")
 
-@st.cache_data
 def load_player_db(path):
     try:
         df = pd.read_csv(path)
@@ -826,8 +2630,772 @@ def load_player_db(path):
         df = pd.DataFrame(columns=expected_columns)
     return df
 
-if "player_db" not in st.session_state:
-    st.session_state.player_db = load_player_db(DATABASE_FILENAME)
+def load_notes(path):
+    if os.path.exists(path):
+        return pd.read_csv(path, parse_dates=["Date"])
+    return pd.DataFrame(columns=["Name", "Date", "Note"])
+
+def load_thresholds(path):
+    try:
+        return unflatten_thresholds(pd.read_csv(path))
+    except (FileNotFoundError, KeyError):
+        return broadcast_metrics_to_ages(metric_thresholds)
+
+# ─────────────────────────────────────────────────────────────────────────────
+# IMPORT UPSERT (key index: normalized name / note digest → row)
+# ─────────────────────────────────────────────────────────────────────────────
+# (key columns, content columns) per table. Age / Age Group are derived from
+# DOB on commit, so they never count as a change.
+UPSERT_KEYS = {
+    "player_db": (["Name"], [c for c in expected_columns if c != "Age"]),
+    "notes_df":  (["Name", "Date", "Note"], ["Name", "Date", "Note"]),
+}
+
+def _canonical(df, cols, key=False):
+    """String form of *cols* for hashing: dates parsed, numbers as floats, key names normalized."""
+    out = {}
+    for c in cols:
+        s = df[c] if c in df.columns else pd.Series(np.nan, index=df.index)
+        if c == "Date":
+            s = pd.to_datetime(s, errors="coerce").astype(str)
+        else:
+            num = pd.to_numeric(s, errors="coerce").astype("float64")  # 68 and 68.0 hash alike
+            s = num.astype(str) if num.notna().sum() == s.notna().sum() else s.astype(str)
+        if key and c == "Name":
+            s = s.str.lower().str.strip()
+        out[c] = s
+    return pd.DataFrame(out, index=df.index)
+
+def row_hashes(df, cols, key=False) -> np.ndarray:
+    return pd.util.hash_pandas_object(_canonical(df, cols, key), index=False).to_numpy()
+
+class KeyIndex:
+    """Key hash and content hash of every row of one stored table, by position.
+
+    Built once from the stored frame, then moved forward by each commit's
+    recorded delta (``apply``), so neither an import nor an add / edit / delete
+    re-hashes the archive. *version* is the store version the index matches; a
+    commit without a delta leaves it stale until the next upsert rebuilds it.
+    """
+
+    def __init__(self, df, key_cols, value_cols, version):
+        self.key_cols, self.value_cols, self.version = key_cols, value_cols, version
+        self.keys = row_hashes(df, key_cols, key=True)
+        self.vals = row_hashes(df, value_cols)
+        self._sort()
+
+    def _sort(self):
+        self.order = np.argsort(self.keys, kind="stable")
+        self.sorted_keys = self.keys[self.order]
+
+    def positions(self, keys) -> np.ndarray:
+        """Row position of each key (the last one for duplicates), -1 if absent."""
+        at  = np.searchsorted(self.sorted_keys, keys, side="right") - 1
+        pos = np.full(len(keys), -1)
+        hit = np.flatnonzero(at >= 0)
+        hit = hit[self.sorted_keys[at[hit]] == keys[hit]]
+        pos[hit] = self.order[at[hit]]
+        return pos
+
+    def upsert(self, current, incoming):
+        """Return ``(merged, summary, (added, removed))``; later duplicates in
+        *incoming* win, as before. *added* / *removed* are the rows that went in
+        and the stored rows they replaced, labelled by position. The index
+        itself is only moved once the store commits the result."""
+        keys = row_hashes(incoming, self.key_cols, key=True)
+        last = ~pd.Series(keys).duplicated(keep="last").to_numpy()
+        incoming, keys = incoming[last].reset_index(drop=True), keys[last]
+        vals = row_hashes(incoming, self.value_cols)
+
+        pos  = self.positions(keys)
+        hit  = pos >= 0
+        diff = np.zeros(len(keys), dtype=bool)
+        diff[hit] = self.vals[pos[hit]] != vals[hit]
+        ins, upd = np.flatnonzero(~hit), np.flatnonzero(diff)
+        summary = {"inserted": len(ins), "updated": len(upd), "unchanged": len(keys) - len(ins) - len(upd)}
+        if not len(ins) and not len(upd):
+            return current, summary, None
+
+        merged  = current.reset_index(drop=True)
+        at      = pos[upd]
+        removed = merged.iloc[np.sort(at)]
+        if len(upd):
+            merged = pd.concat([merged.drop(index=at), incoming.loc[upd].set_axis(at)]).sort_index()
+        if len(ins):
+            merged = pd.concat([merged, incoming.loc[ins]], ignore_index=True)
+        added = merged.iloc[np.r_[np.sort(at), len(current):len(merged)]]
+        return merged, summary, (added, removed)
+
+    def apply(self, value, added, removed) -> bool:
+        """Move the index onto the committed *value*: *removed* rows are labelled
+        by their old positions, *added* rows by their new ones. Returns False if
+        the delta does not account for *value* (the index must be rebuilt)."""
+        keys, vals = self.keys, self.vals
+        try:
+            if removed is not None and len(removed):
+                gone = removed.index.to_numpy()
+                keys, vals = np.delete(keys, gone), np.delete(vals, gone)
+            if added is not None and len(added):
+                added = added.sort_index()
+                at    = added.index.to_numpy() - np.arange(len(added))
+                keys  = np.insert(keys, at, row_hashes(added, self.key_cols, key=True))
+                vals  = np.insert(vals, at, row_hashes(added, self.value_cols))
+        except (IndexError, TypeError, ValueError):
+            return False
+        if len(keys) != len(value):
+            return False
+        self.keys, self.vals = keys, vals
+        self._sort()
+        return True
+
+# ─────────────────────────────────────────────────────────────────────────────
+# QUERY VIEWS (filter / sort / paginate server-side, ship only the page)
+# ─────────────────────────────────────────────────────────────────────────────
+PAGE_SIZES   = [25, 50, 100]
+PICKER_LIMIT = 50  # names offered by a search picker at once
+
+class QueryIndex:
+    """Row positions of one table organised for filtered, sorted, paged reads.
+
+    Every word of the name column is a search key (so "doe" finds "John Doe"),
+    kept sorted for prefix lookups by binary search; each facet column maps its
+    values to row positions; sort ranks are computed once per column on demand.
+    Built for one store version and never mutated afterwards.
+    """
+
+    def __init__(self, df, name_col="Name", facets=()):
+        self.df, self.name_col = df, name_col
+        names = df[name_col].astype(str).str.lower().str.strip()
+        words = names.str.split().explode().dropna()
+        later = words[words.groupby(level=0).cumcount() > 0]  # full name already covers the first word
+        keys  = pd.concat([names, later])
+        pos   = pd.Series(np.arange(len(df)), index=df.index).reindex(keys.index).to_numpy()
+        keys  = keys.to_numpy(dtype=str)
+        order = np.argsort(keys, kind="stable")
+        self.keys, self.key_pos = keys[order], pos[order]
+        self.facets = {c: {str(v): np.asarray(ix) for v, ix in df.groupby(c).indices.items()}
+                       for c in facets if c in df.columns}
+        self._ranks = {}
+
+    def facet_values(self, col):
+        return sorted(self.facets.get(col, {}))
+
+    def facet_rows(self, col, value):
+        return self.df.iloc[self.facets.get(col, {}).get(str(value), np.empty(0, np.int64))]
+
+    def _rank(self, col):
+        if col not in self._ranks:
+            vals = self.df[col]
+            if pd.api.types.is_numeric_dtype(vals) or pd.api.types.is_datetime64_any_dtype(vals):
+                key = pd.to_numeric(vals, errors="coerce").astype(float).where(vals.notna())
+                order = np.argsort(key.to_numpy(), kind="stable")  # NaN / NaT last
+            else:
+                codes, uniques = pd.factorize(vals.astype(str).str.lower().where(vals.notna()), sort=True)
+                order = np.argsort(np.where(codes < 0, len(uniques), codes), kind="stable")
+            rank  = np.empty(len(order), dtype=np.int64)
+            rank[order] = np.arange(len(order))
+            self._ranks[col] = rank
+        return self._ranks[col]
+
+    def prefix(self, text) -> np.ndarray:
+        """Positions of rows with a name word starting with *text*, in name order."""
+        text = str(text or "").lower().strip()
+        if text:
+            lo  = np.searchsorted(self.keys, text, side="left")
+            hi  = np.searchsorted(self.keys, text + "\uffff", side="left")
+            pos = np.unique(self.key_pos[lo:hi])
+        else:
+            pos = np.arange(len(self.df))
+        return pos[np.argsort(self._rank(self.name_col)[pos], kind="stable")]
+
+    def matches(self, *, prefix="", filters=None, sort_by=None, descending=False) -> np.ndarray:
+        pos = self.prefix(prefix)
+        for col, values in (filters or {}).items():
+            if values:
+                groups  = self.facets.get(col, {})
+                allowed = np.concatenate([groups.get(str(v), np.empty(0, np.int64)) for v in values])
+                pos = pos[np.isin(pos, allowed)]
+        col = sort_by if sort_by in self.df.columns else self.name_col
+        if col != self.name_col:
+            pos = pos[np.argsort(self._rank(col)[pos], kind="stable")]
+        if descending:  # blanks stay at the end
+            blank = self.df[col].isna().to_numpy()[pos]
+            pos = np.concatenate([pos[~blank][::-1], pos[blank]])
+        return pos
+
+    def page(self, pos, page=1, page_size=PAGE_SIZES[0]):
+        start = (max(page, 1) - 1) * page_size
+        return self.df.iloc[pos[start:start + page_size]]
+
+# ─────────────────────────────────────────────────────────────────────────────
+# NOTE SEARCH (inverted index over scout-note text, prefix matching)
+# ─────────────────────────────────────────────────────────────────────────────
+# One process-wide index (it lives in the SharedStore) maps every word to the
+# notes containing it; a sorted vocabulary turns each query word into a prefix
+# range ("hing" → hinge, hinging), quoted phrases must appear word after word.
+# Notes are identified by a hash of (Name, Date, Note). Saves, deletes and
+# merges record the rows they added / removed with the store version, so
+# catching up hashes and tokenizes only those; a commit without that record
+# (clear, replace-all import) falls back to diffing every note's hash.
+NOTE_SEARCH_LIMIT = 200  # rows shown per search
+NOTE_TOKEN = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+def note_terms(text) -> list:
+    return NOTE_TOKEN.findall(str(text).lower()) if pd.notna(text) else []
+
+def parse_note_query(query):
+    """``hip "late load"`` → (["hip"], [["late", "load"]]): loose words and quoted phrases."""
+    query = str(query or "")
+    phrases = [terms for terms in map(note_terms, re.findall(r'"([^"]*)"', query)) if terms]
+    return note_terms(re.sub(r'"[^"]*"?', " ", query)), phrases
+
+def _has_phrase(terms, phrase):
+    n = len(phrase)
+    return any(all(terms[i + k].startswith(w) for k, w in enumerate(phrase))
+               for i in range(len(terms) - n + 1))
+
+class NoteSearchIndex:
+    """Word → note ids over the notes table, kept in step with its store version."""
+
+    def __init__(self):
+        self.version  = -1
+        self.ids      = {}  # row hash → note id
+        self.copies   = {}  # row hash → rows carrying it (identical notes index once)
+        self.notes    = {}  # note id → (name, date, text, terms)
+        self.postings = {}  # word → {note id}
+        self.vocab    = []  # sorted words, for prefix ranges
+        self.next_id  = 0
+        self.lock     = threading.Lock()
+
+    def sync(self, notes, version, deltas=None):
+        """Catch up with *version* of the notes table.
+
+        *deltas* maps store versions to the ``(added, removed)`` rows of that
+        commit; when it covers every version since the last sync only those rows
+        are read, otherwise every note's hash is compared with the index.
+        """
+        with self.lock:
+            if version <= self.version:
+                return
+            steps = [(deltas or {}).get(v) for v in range(self.version + 1, version + 1)]
+            try:
+                if self.version < 0 or None in steps:
+                    raise KeyError(version)
+                for added, removed in steps:
+                    for h in self._hashes(removed):
+                        self.copies[h] -= 1
+                        if not self.copies[h]:
+                            del self.copies[h]
+                            self._remove(self.ids.pop(h))
+                    self._insert(added, self._hashes(added))
+            except KeyError:  # no record, or a removed row the index never saw
+                self._resync(notes)
+            self.version = version
+
+    @staticmethod
+    def _hashes(rows) -> list:
+        return row_hashes(rows, UPSERT_KEYS["notes_df"][1]).tolist() if rows is not None and len(rows) else []
+
+    def _resync(self, notes):
+        hashes = self._hashes(notes)
+        self.copies = dict(Counter(hashes))
+        for h in [h for h in self.ids if h not in self.copies]:
+            self._remove(self.ids.pop(h))
+        self._index_new(notes, hashes)
+
+    def _insert(self, rows, hashes):
+        for h in hashes:
+            self.copies[h] = self.copies.get(h, 0) + 1
+        self._index_new(rows, hashes)
+
+    def _index_new(self, rows, hashes):
+        if hashes:
+            for h, name, date, text in zip(hashes, rows["Name"], rows["Date"], rows["Note"]):
+                if h not in self.ids:
+                    self._add(h, name, date, text)
+
+    def _add(self, h, name, date, text):
+        nid, self.next_id = self.next_id, self.next_id + 1
+        terms = note_terms(text)
+        self.ids[h], self.notes[nid] = nid, (name, date, text, terms)
+        for term in set(terms):
+            if term not in self.postings:
+                self.postings[term] = set()
+                bisect.insort(self.vocab, term)
+            self.postings[term].add(nid)
+
+    def _remove(self, nid):
+        for term in set(self.notes.pop(nid)[3]):
+            ids = self.postings[term]
+            ids.discard(nid)
+            if not ids:
+                del self.postings[term]
+                del self.vocab[bisect.bisect_left(self.vocab, term)]
+
+    def _prefix(self, word) -> set:
+        lo = bisect.bisect_left(self.vocab, word)
+        hi = bisect.bisect_left(self.vocab, word + "\uffff")
+        return set().union(*(self.postings[t] for t in self.vocab[lo:hi]))
+
+    def search(self, query, *, names=None, age_groups=None, lookup=None, start=None, end=None) -> pd.DataFrame:
+        """Notes matching every word (as a prefix) and phrase of *query*, newest first.
+
+        *names* / *age_groups* (through the name → group *lookup*) and the
+        inclusive *start* / *end* dates narrow the result; an empty query
+        returns every note the filters allow.
+        """
+        words, phrases = parse_note_query(query)
+        with self.lock:
+            hits = None
+            for word in words + [w for phrase in phrases for w in phrase]:
+                hits = self._prefix(word) if hits is None else hits & self._prefix(word)
+                if not hits:
+                    break
+            rows = [self.notes[i] for i in (self.notes if hits is None else hits)
+                    if all(_has_phrase(self.notes[i][3], p) for p in phrases)]
+        out = pd.DataFrame([r[:3] for r in rows], columns=["Name", "Date", "Note"])
+        out["Date"] = pd.to_datetime(out["Date"], errors="coerce")
+        keys = name_key(out, ["Name"])
+        out.insert(1, "Age Group", keys.map(lookup) if lookup is not None else None)
+        keep = np.ones(len(out), dtype=bool)
+        if names:
+            keep &= keys.isin({str(n).lower().strip() for n in names}).to_numpy()
+        if age_groups:
+            keep &= out["Age Group"].isin(age_groups).to_numpy()
+        if start is not None:
+            keep &= (out["Date"] >= pd.Timestamp(start)).to_numpy()
+        if end is not None:
+            keep &= (out["Date"] < pd.Timestamp(end) + pd.Timedelta(days=1)).to_numpy()
+        return out[keep].sort_values("Date", ascending=False, ignore_index=True)
+
+# ─────────────────────────────────────────────────────────────────────────────
+# SESSION MEMORY (per-session byte accounting, LRU eviction of re-derivable objects)
+# ─────────────────────────────────────────────────────────────────────────────
+# Whatever a session can rebuild on demand – parsed uploads, the roster as of a
+# date, query / cohort indexes, streamed aggregates, finished PDFs – lives in
+# its DerivedCache rather than in loose session_state keys. Every insert keeps
+# that session under SESSION_BUDGET_BYTES and all sessions together under
+# GLOBAL_BUDGET_BYTES by dropping the least recently used entries anywhere, so
+# idle tablets lose their caches first; a dropped entry is rebuilt on next use.
+SESSION_BUDGET_BYTES = 384 * 1024 * 1024
+GLOBAL_BUDGET_BYTES  = 2 * 1024 * 1024 * 1024
+MEMORY_KINDS = ["frames", "indexes", "aggregates", "pdfs"]
+
+def object_bytes(obj, skip=frozenset(), _depth=0) -> int:
+    """Approximate deep size; objects whose ``id`` is in *skip* (shared tables) count 0."""
+    if id(obj) in skip:
+        return 0
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=True, deep=True).sum())
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return int(obj.memory_usage(deep=True))
+    if isinstance(obj, np.ndarray):
+        return int(obj.nbytes)
+    if isinstance(obj, (bytes, bytearray, str)) or _depth > 4:
+        return sys.getsizeof(obj)
+    if hasattr(obj, "getbuffer"):  # BytesIO / UploadedFile
+        return obj.getbuffer().nbytes
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(object_bytes(v, skip, _depth + 1) for v in obj.values())
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return sys.getsizeof(obj) + sum(object_bytes(v, skip, _depth + 1) for v in obj)
+    if hasattr(obj, "__dict__"):
+        return sys.getsizeof(obj) + object_bytes(vars(obj), skip, _depth + 1)
+    return sys.getsizeof(obj)
+
+class DerivedCache:
+    """One session's re-derivable objects: slot → [tag, value, kind, bytes], oldest use first."""
+
+    def __init__(self, session_id):
+        self.session_id = session_id
+        self.entries    = OrderedDict()
+        self.used       = OrderedDict()  # slot → last use (same order as entries)
+        self.state      = {}             # kind → bytes held outside the cache (uploads, widgets)
+        self.last_seen  = time.time()
+        self.evicted    = 0
+        self.lock       = threading.Lock()
+
+    def get(self, slot, tag, build, kind):
+        """The value cached under *slot* if it was built for *tag*, else ``build()``."""
+        with self.lock:
+            entry = self.entries.get(slot)
+            if entry is not None and entry[0] == tag:
+                self._touch(slot)
+                return entry[1]
+        return self.put(slot, tag, build(), kind)
+
+    def holds(self, slot, tag) -> bool:
+        with self.lock:
+            entry = self.entries.get(slot)
+            return entry is not None and entry[0] == tag
+
+    def put(self, slot, tag, value, kind):
+        """Store (or re-measure, for values that grew in place) and enforce the budgets."""
+        with self.lock:
+            self.entries[slot] = [tag, value, kind, object_bytes(value, shared_ids())]
+            self._touch(slot)
+        memory_accountant().enforce(self, keep=slot)
+        return value
+
+    def _touch(self, slot):
+        self.last_seen = self.used[slot] = time.time()
+        self.entries.move_to_end(slot)
+        self.used.move_to_end(slot)
+
+    def oldest(self, keep=None):
+        """``(last use, slot)`` of the least recently used entry other than *keep*."""
+        with self.lock:
+            return next(((t, s) for s, t in self.used.items() if s != keep), None)
+
+    def evict(self, slot) -> int:
+        with self.lock:
+            entry = self.entries.pop(slot, None)
+            self.used.pop(slot, None)
+            if entry is None:
+                return 0
+            self.evicted += 1
+            return entry[3]
+
+    def clear(self):
+        for slot in list(self.entries):
+            self.evict(slot)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(e[3] for e in list(self.entries.values()))
+
+    def by_kind(self) -> dict:
+        out = dict.fromkeys(MEMORY_KINDS, 0)
+        for e in list(self.entries.values()):
+            out[e[2]] = out.get(e[2], 0) + e[3]
+        return out
+
+class MemoryAccountant:
+    """Process-wide view of every live session's cache; enforces the two budgets.
+
+    Sessions are held weakly, so a closed session's cache disappears with its
+    session_state.
+    """
+
+    def __init__(self, session_budget=SESSION_BUDGET_BYTES, global_budget=GLOBAL_BUDGET_BYTES):
+        self.session_budget = session_budget
+        self.global_budget  = global_budget
+        self.sessions = weakref.WeakValueDictionary()
+        self.lock     = threading.Lock()
+
+    def register(self, cache):
+        with self.lock:
+            self.sessions[cache.session_id] = cache
+
+    def enforce(self, cache, keep=None):
+        with self.lock:
+            while cache.nbytes > self.session_budget:
+                victim = cache.oldest(keep)
+                if victim is None:
+                    break
+                cache.evict(victim[1])
+            caches = list(self.sessions.values())
+            total  = sum(c.nbytes for c in caches)
+            while total > self.global_budget:
+                candidates = [(c.oldest(keep if c is cache else None), c) for c in caches]
+                candidates = [(o, c) for o, c in candidates if o is not None]
+                if not candidates:
+                    break
+                (_, slot), victim = min(candidates, key=lambda oc: oc[0][0])
+                total -= victim.evict(slot)
+
+    def report(self, current=None) -> pd.DataFrame:
+        rows = []
+        now = time.time()
+        for sid, cache in list(self.sessions.items()):
+            held = {**cache.by_kind(), **cache.state}
+            rows.append({"Session": sid[:8] + (" (this)" if sid == current else ""),
+                         "Idle (min)": round((now - cache.last_seen) / 60, 1),
+                         **{k: v / 1e6 for k, v in held.items()},
+                         "Total (MB)": sum(held.values()) / 1e6, "Evicted": cache.evicted})
+        return pd.DataFrame(rows)
+
+@st.cache_resource
+def memory_accountant() -> MemoryAccountant:
+    return MemoryAccountant()
+
+def shared_ids() -> frozenset:
+    """ids of the shared store tables and cohort batches: referenced by every session, owned by none."""
+    store = shared_store()
+    batches, lock = cohort_batches()
+    with lock:
+        shared = list(batches.values())
+    return frozenset([id(store.get(name)[0]) for name in STORE_LABELS] + [id(b) for b in shared])
+
+def session_memory() -> DerivedCache:
+    """This session's DerivedCache (created and registered on first use)."""
+    cache = st.session_state.get("_derived")
+    if cache is None:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        ctx = get_script_run_ctx()
+        cache = st.session_state["_derived"] = DerivedCache(ctx.session_id if ctx else "local")
+        memory_accountant().register(cache)
+    cache.last_seen = time.time()
+    return cache
+
+def account_session_state():
+    """Record what this session holds outside its cache: uploads, widget copies, other state."""
+    cache, skip = session_memory(), shared_ids()
+    held = {"uploads": 0, "widgets": 0, "other": 0}
+    for key, value in list(st.session_state.items()):
+        if key == "_derived":
+            continue
+        kind = ("uploads" if hasattr(value, "getbuffer") or (isinstance(value, list) and value and hasattr(value[0], "getbuffer"))
+                else "widgets" if isinstance(value, (pd.DataFrame, dict)) and key not in STORE_LABELS
+                else "other")
+        held[kind] += object_bytes(value, skip)
+    cache.state = {**cache.state, **held}
+
+def memory_admin_view():
+    acc, cache = memory_accountant(), session_memory()
+    report = acc.report(current=cache.session_id)
+    shared = sum(object_bytes(shared_store().get(name)[0]) for name in STORE_LABELS)
+    total  = report["Total (MB)"].sum() if not report.empty else 0.0
+    c1, c2, c3 = st.columns(3)
+    c1.metric("Sessions", len(report))
+    c2.metric("Session caches + state", f"{total:.2f} MB", help=f"global budget {acc.global_budget/1e6:.0f} MB")
+    c3.metric("Shared store (once)", f"{shared/1e6:.2f} MB")
+    st.dataframe(report, use_container_width=True, hide_index=True,
+                 column_config={k: st.column_config.NumberColumn(f"{k} (MB)", format="%.2f")
+                                for k in [*MEMORY_KINDS, "uploads", "widgets", "other"]})
+    st.caption(f"Per-session budget {acc.session_budget/1e6:.0f} MB for re-derivable objects "
+               f"({', '.join(MEMORY_KINDS)}); the least recently used are evicted and rebuilt on demand.")
+    if st.button("Release this session's cache", key="release_session_cache"):
+        cache.clear()
+        st.rerun()
+
+# ─────────────────────────────────────────────────────────────────────────────
+# SHARED STORE (one roster / notes / thresholds for every browser session)
+# ─────────────────────────────────────────────────────────────────────────────
+STORE_DELTA_ITEMS = 64  # recorded commits per entry; an index further behind rebuilds
+
+class SharedStore:
+    """Process-wide, versioned copy-on-write store.
+
+    Stored values are never mutated: writers build a new object and commit it,
+    which bumps that entry's version and persists it. Sessions keep plain
+    references, so reading is free and a rerun picks up the current version.
+    Commits may record the rows they added / removed (``delta``, labelled by
+    old / new row position); the last STORE_DELTA_ITEMS of those per entry let
+    indexes catch up incrementally, and the import key index follows every one.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._values = {
+            "player_db":  derive_ages(load_player_db(DATABASE_FILENAME), datetime.date.today()),
+            "notes_df":   load_notes(NOTES_FILENAME),
+            "thresholds": load_thresholds(THRESHOLDS_FILENAME),
+        }
+        self._versions = dict.fromkeys(self._values, 0)
+        self._indexes  = {}
+        self._deltas   = {name: OrderedDict() for name in self._values}  # version → (added, removed)
+        self._note_search = NoteSearchIndex()
+
+    def get(self, name):
+        with self._lock:
+            return self._values[name], self._versions[name]
+
+    def commit(self, name, value, persist=True, delta=None):
+        with self._lock:
+            if name == "player_db":
+                value = derive_ages(value.reset_index(drop=True), datetime.date.today())
+            self._values[name] = value
+            self._versions[name] += 1
+            index = self._indexes.get(name)
+            if (index is not None and delta is not None and index.version == self._versions[name] - 1
+                    and index.apply(value, *delta)):
+                index.version = self._versions[name]
+            log = self._deltas[name]
+            if delta is None:
+                log.clear()  # nothing before this version can be replayed onto it
+            else:
+                log[self._versions[name]] = delta
+                if len(log) > STORE_DELTA_ITEMS:
+                    log.popitem(last=False)
+            if persist:
+                self._persist(name, value)
+            return self._versions[name]
+
+    def update(self, name, fn, persist=True):
+        """Apply *fn* to the latest version under the lock (no lost appends).
+
+        *fn* may return ``(value, (added, removed))`` to record the rows it changed.
+        """
+        with self._lock:
+            value = fn(self._values[name])
+            value, delta = value if isinstance(value, tuple) else (value, None)
+            return self.commit(name, value, persist=persist, delta=delta)
+
+    def upsert(self, name, incoming):
+        """Insert new and replace changed rows of *incoming* by key; returns the counts."""
+        with self._lock:
+            index = self._indexes.get(name)
+            if index is None or index.version != self._versions[name]:
+                index = self._indexes[name] = KeyIndex(self._values[name], *UPSERT_KEYS[name],
+                                                       self._versions[name])
+            merged, summary, delta = index.upsert(self._values[name], incoming)
+            if delta is not None:
+                self.commit(name, merged, delta=delta)  # moves the index along with the value
+            return summary
+
+    def note_search(self) -> NoteSearchIndex:
+        """The note text index, caught up with the current notes version."""
+        with self._lock:
+            notes, version = self.get("notes_df")
+            deltas = dict(self._deltas["notes_df"])
+        self._note_search.sync(notes, version, deltas)
+        return self._note_search
+
+    @staticmethod
+    def _persist(name, value):
+        if name == "player_db":
+            value.to_csv(DATABASE_FILENAME, index=False)
+        elif name == "notes_df":
+            value.to_csv(NOTES_FILENAME, index=False)
+        elif name == "thresholds":
+            flatten_thresholds(copy.deepcopy(value)).to_csv(THRESHOLDS_FILENAME, index=False)
+
+@st.cache_resource
+def shared_store() -> SharedStore:
+    return SharedStore()
+
+STORE_LABELS = {"player_db": "Player database", "notes_df": "Scout notes", "thresholds": "Thresholds"}
+
+def sync_session_from_store(notify=False):
+    seen = st.session_state.setdefault("store_versions", {})
+    for name, label in STORE_LABELS.items():
+        value, ver = shared_store().get(name)
+        if notify and name in seen and seen[name] != ver:
+            st.toast(f"{label} updated by another session")
+        if name == "thresholds" and "thresholds_draft" in st.session_state:
+            value = st.session_state["thresholds_draft"]
+        st.session_state[name] = value
+        seen[name] = ver
+
+def store_update(name, fn, persist=True):
+    shared_store().update(name, fn, persist=persist)
+    sync_session_from_store()
+
+def store_upsert(name, incoming) -> dict:
+    summary = shared_store().upsert(name, incoming)
+    sync_session_from_store()
+    return summary
+
+def upsert_message(summary) -> str:
+    return ", ".join(f"{n} {k}" for k, n in summary.items())
+
+def roster_as_of(as_of):
+    """Roster with ages/groups as of *as_of*, re-derived per roster version and date."""
+    tag = (st.session_state["store_versions"]["player_db"], as_of)
+    return session_memory().get("roster_as_of", tag,
+                                lambda: derive_ages(st.session_state.player_db, as_of), "frames")
+
+def query_index(name, facets=(), with_age_group=False):
+    """QueryIndex over a store table, rebuilt only when the table (or roster) version changes.
+
+    *with_age_group* adds the players' ``Age Group`` (from the roster) to tables
+    that only carry a name, such as the notes.
+    """
+    versions = st.session_state["store_versions"]
+    tag = (versions[name], versions["player_db"] if with_age_group else None, tuple(facets))
+
+    def build():
+        df = st.session_state[name]
+        if with_age_group:
+            lookup = age_group_lookup(st.session_state.player_db)
+            df = df.assign(**{"Age Group": name_key(df, ["Name"]).map(lookup)})
+        return QueryIndex(df, facets=facets)
+    return session_memory().get(f"query:{name}", tag, build, "indexes")
+
+def player_picker(label, key, help=None):
+    """Search-then-pick: a name-prefix box feeding a short selectbox of roster labels."""
+    index = query_index("player_db", ROSTER_FACETS)
+    query = st.text_input("Search players", key=f"{key}_search",
+                          placeholder="First or last name…", help=help)
+    pos = index.prefix(query)
+    if not len(pos):
+        st.caption("No players match.")
+        return None
+    if len(pos) > PICKER_LIMIT:
+        st.caption(f"Showing the first {PICKER_LIMIT} of {len(pos)} matches — keep typing to narrow.")
+    db = index.df
+    return st.selectbox(label, db.index[pos[:PICKER_LIMIT]], format_func=lambda i: db.at[i, "Name"], key=key)
+
+def paged_table(index, key, *, filters=None, prefix="", sort_options=("Name",), formatter=None):
+    """Sort / page controls plus a dataframe holding only the current page."""
+    c1, c2, c3 = st.columns([2, 1, 1])
+    sort_by    = c1.selectbox("Sort by", list(sort_options), key=f"{key}_sort")
+    descending = c2.toggle("Descending", key=f"{key}_desc")
+    page_size  = c3.selectbox("Rows per page", PAGE_SIZES, key=f"{key}_size")
+    pos   = index.matches(prefix=prefix, filters=filters, sort_by=sort_by, descending=descending)
+    pages = max(1, -(-len(pos) // page_size))
+    if st.session_state.get(f"{key}_page", 1) > pages:  # filters shrank the result
+        st.session_state[f"{key}_page"] = pages
+    page  = st.number_input("Page", 1, pages, 1, key=f"{key}_page") if pages > 1 else 1
+    view  = index.page(pos, page, page_size)
+    st.dataframe(formatter(view) if formatter else view, use_container_width=True, hide_index=True)
+    st.caption(f"{len(pos)} matching · page {page} of {pages}")
+
+# ─────────────────────────────────────────────────────────────────────────────
+# DOWNLOADS (export files built on first request, then once per data version)
+# ─────────────────────────────────────────────────────────────────────────────
+DOWNLOAD_ZIP_BYTES   = 8 * 1024 * 1024  # tables bigger than this in memory download as a zipped CSV
+DOWNLOAD_CACHE_ITEMS = 12
+
+def csv_download(df, file_name):
+    """(data, file name, mime) for *df*: the CSV itself, or for large tables a
+    zip whose CSV is written straight into the deflate stream."""
+    if df.memory_usage(index=False, deep=True).sum() <= DOWNLOAD_ZIP_BYTES:
+        return df.to_csv(index=False).encode("utf-8"), file_name, "text/csv"
+    import io
+    import zipfile
+    buf = BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
+        with zf.open(file_name, "w") as raw, io.TextIOWrapper(raw, encoding="utf-8", newline="") as fh:
+            df.to_csv(fh, index=False)
+    return buf.getvalue(), f"{os.path.splitext(file_name)[0]}.zip", "application/zip"
+
+@st.cache_resource
+def download_payloads():
+    """Process-wide (name, version) → (data, file name, mime), least recently used first."""
+    return OrderedDict(), threading.Lock()
+
+def lazy_download(label, name, version, build, key, keep_old=False):
+    """Download button whose payload is built by *build()* on the first
+    "Prepare" click and then served to every session until *version* changes.
+
+    Older versions of *name* are dropped when a new one is stored unless
+    *keep_old* (payloads that differ per session, such as threshold drafts).
+    """
+    payloads, lock = download_payloads()
+    with lock:
+        payload = payloads.get((name, version))
+        if payload is not None:
+            payloads.move_to_end((name, version))
+    slot = st.empty()
+    if payload is None:
+        if not slot.button(f"Prepare {label}", key=f"{key}_prepare"):
+            return
+        with st.spinner(f"Preparing {label}…"):
+            payload = build()
+        with lock:
+            for stale in [k for k in payloads if k[0] == name and not keep_old]:
+                del payloads[stale]
+            payloads[(name, version)] = payload
+            while len(payloads) > DOWNLOAD_CACHE_ITEMS:
+                payloads.popitem(last=False)
+    data, file_name, mime = payload
+    slot.download_button(f"⬇️ Download {label}", data, file_name=file_name, mime=mime, key=key)
+
+@functools.lru_cache(maxsize=None)
+def template_csv(cols):
+    return pd.DataFrame(columns=list(cols)).to_csv(index=False).encode("utf-8")
 
 # Always prepare a lowercase name key for merges
 def ensure_nm(df):
@@ -842,653 +3410,825 @@ def ensure_nm(df):
             df["nm"] = None
     return df
 
-st.title("TNXL MIAMI - Athlete Performance Data Uploader, Report Generator & CSV Utilities")
-
-tab1, tab2, tab3, tab4, tab5 = st.tabs([
-    "CSV Merge",
-    "Player Database",
-    "Scout Notes",
-    "Thresholds",
-    "Reports & Templates"
-])
-
-# ─────────────────────────────────────────────────────────────────────────────
-# TAB 1: CSV MERGE
-# ─────────────────────────────────────────────────────────────────────────────
-with tab1:
-    st.header("CSV Merger")
-    csv_categories = ["Blast", "Flightscope", "Throwing Velocities", "Running Speed", "Mobility", "Dynamo"]
-    csv_type = st.selectbox("Select CSV Type to Merge", csv_categories)
-    files = st.file_uploader(f"Upload {csv_type} CSV Files", type="csv", accept_multiple_files=True, key="merge_files")
-
-    if files:
-        merged_dfs = []
-        st.markdown("### Configure Each File")
-        for idx, uploaded in enumerate(files):
-            st.subheader(f"File {idx+1}: {uploaded.name}")
-            df = pd.read_csv(uploaded)
-            st.write("Columns detected:", df.columns.tolist())
-
-            if csv_type == "Blast":
-                if "Name" not in df.columns:
-                    df.insert(0, "Name", "")
-                st.markdown("**Edit Blast data (e.g. player names)**")
-                df = st.data_editor(df, use_container_width=True, num_rows="dynamic", key=f"blast_edit_{idx}")
-
-            default_label = os.path.splitext(uploaded.name)[0]
-            label = st.text_input(f"Label for {uploaded.name}", value=default_label, key=f"label_{idx}")
-
-            df["Type"]  = csv_type
-            df["Label"] = label
-            merged_dfs.append(df)
-
-        if st.button("Merge Selected Files"):
-            merged = pd.concat(merged_dfs, ignore_index=True)
-            st.success(f"Merged {len(merged_dfs)} files of type {csv_type}!")
-            st.dataframe(merged.head())
-            csv_bytes = merged.to_csv(index=False).encode("utf-8")
-            st.download_button("Download Merged CSV", data=csv_bytes,
-                               file_name=f"merged_{csv_type.lower().replace(' ','_')}.csv", mime="text/csv")
-    else:
-        st.info(f"Upload two or more {csv_type} CSVs above to merge them.")
-
-# ─────────────────────────────────────────────────────────────────────────────
-# TAB 2: PLAYER DATABASE (new layout)
-# ─────────────────────────────────────────────────────────────────────────────
-with tab2:
-    st.header("Player Database")
-    st.caption("Data stored on disk in **player_database.csv**")
-
-    add_tab, edit_tab = st.tabs(["➕ Add Player", "✏️ Edit / Delete"])
-
-    with add_tab:
-        with st.form("add_player_form", clear_on_submit=True):
-            c1, c2, c3, c4 = st.columns(4)
-            with c1:
-                add_name = st.text_input("Name", key="add_name")
-                add_dob  = st.date_input("Date of Birth",
-                                         min_value=datetime.date(1900,1,1),
-                                         max_value=datetime.date.today(),
-                                         key="add_dob")
-            with c2:
-                add_class = st.text_input("Class", key="add_class")
-                add_hs    = st.text_input("High School", key="add_hs")
-            with c3:
-                h_ft  = st.number_input("Height (ft)", 0, 8, key="add_h_ft")
-                h_in  = st.number_input("Height (in)", 0, 11, key="add_h_in")
-                add_height = h_ft*12 + h_in
-                add_weight = st.number_input("Weight (lbs)", 0, 500, key="add_weight")
-            with c4:
-                pos_opts = ["Pitcher","Catcher","1B","2B","3B","SS","LF","CF","RF","DH"]
-                bat_opts = ["Left","Right","Switch"]
-                thr_opts = ["Left","Right"]
-                add_pos   = st.selectbox("Position", pos_opts, key="add_pos")
-                add_bat   = st.selectbox("Batting Handedness", bat_opts, key="add_bat")
-                add_throw = st.selectbox("Throwing Handedness", thr_opts, key="add_throw")
-
-            add_submit = st.form_submit_button("Add Player", use_container_width=True)
-
-        if add_submit:
-            today     = datetime.date.today()
-            age       = (today.year - add_dob.year
-                         - ((today.month, today.day) < (add_dob.month, add_dob.day)))
-            age_group = get_group(age)
-            new_row   = {
-                "Name":               add_name,
-                "DOB":                add_dob.strftime("%m/%d/%Y"),
-                "Age":                int(age),
-                "Age Group":          age_group,
-                "Class":              add_class,
-                "High School":        add_hs,
-                "Height":             add_height,
-                "Weight":             add_weight,
-                "Position":           add_pos,
-                "BattingHandedness":  add_bat,
-                "ThrowingHandedness": add_throw,
-            }
-            st.session_state.player_db = pd.concat(
-                [st.session_state.player_db, pd.DataFrame([new_row])],
-                ignore_index=True
-            )
-            st.session_state.player_db.to_csv(DATABASE_FILENAME, index=False)
-            st.success(f"✅ Added {add_name}")
-
-    with edit_tab:
-        st.session_state.player_db.reset_index(drop=True, inplace=True)
-        db = st.session_state.player_db
-        if db.empty:
-            st.info("Database is empty—add a player first.")
+# ─────────────────────────────────────────────────────────────────────────────
+# APP
+# ─────────────────────────────────────────────────────────────────────────────
+def main():
+    st.set_page_config(page_title="TNXL MIAMI Report", layout="wide")
+    store = shared_store()
+    sync_session_from_store(notify=True)
+
+    st.title("TNXL MIAMI - Athlete Performance Data Uploader, Report Generator & CSV Utilities")
+    account_session_state()  # as left by the previous run (later stages may st.stop())
+    with st.expander("🧮 Session memory (admin)"):
+        memory_admin_view()
+
+    tab1, tab2, tab3, tab4, tab5 = st.tabs([
+        "CSV Merge",
+        "Player Database",
+        "Scout Notes",
+        "Thresholds",
+        "Reports & Templates"
+    ])
+
+    # ─────────────────────────────────────────────────────────────────────────────
+    # TAB 1: CSV MERGE
+    # ─────────────────────────────────────────────────────────────────────────────
+    with tab1:
+        st.header("CSV Merger")
+        csv_type = st.selectbox("Select CSV Type to Merge", list(SOURCE_LABELS.values()))
+        files = st.file_uploader(f"Upload {csv_type} CSV Files", type="csv", accept_multiple_files=True, key="merge_files")
+
+        if files:
+            merged_dfs = []
+            st.markdown("### Configure Each File")
+            for idx, uploaded in enumerate(files):
+                st.subheader(f"File {idx+1}: {uploaded.name}")
+                found = sniff_source(uploaded)
+                if found and SOURCE_LABELS[found] != csv_type:
+                    st.warning(f"This looks like a {SOURCE_LABELS[found]} export, not {csv_type}.")
+                df = session_memory().get(f"merge:{idx}", uploaded.file_id,
+                                          lambda: pd.read_csv(uploaded), "frames").copy(deep=False)
+                st.write("Columns detected:", df.columns.tolist())
+
+                if csv_type == "Blast":
+                    if "Name" not in df.columns:
+                        df.insert(0, "Name", "")
+                    group_opts = blast_group_options(df)
+                    modes = ["Per session / device", "Full grid"] if group_opts else ["Full grid"]
+                    mode  = st.radio("Assign player names", modes, horizontal=True, key=f"blast_mode_{idx}")
+                    if mode == "Full grid":
+                        st.markdown("**Edit Blast data (e.g. player names)**")
+                        df = st.data_editor(df, use_container_width=True, num_rows="dynamic", key=f"blast_edit_{idx}")
+                    else:
+                        # only the small group grid goes to the browser; names fan out to every swing
+                        by     = st.selectbox("Group swings by", group_opts, key=f"blast_group_by_{idx}")
+                        groups = blast_name_groups(df, by)
+                        names  = sorted(set(st.session_state.player_db["Name"].dropna().astype(str))
+                                        | set(groups["Name"][groups["Name"] != ""]))
+                        groups = st.data_editor(
+                            groups, use_container_width=True, hide_index=True,
+                            disabled=[by, "Swings"], key=f"blast_groups_{idx}_{by}",
+                            column_config={"Name": st.column_config.SelectboxColumn("Name", options=names)},
+                        )
+                        df = apply_group_names(df, by, groups)
+                        st.caption(f"{len(groups)} groups → {len(df)} swings, "
+                                   f"{df['Name'].astype(str).str.strip().replace('nan', '').ne('').sum()} named")
+
+                default_label = os.path.splitext(uploaded.name)[0]
+                label = st.text_input(f"Label for {uploaded.name}", value=default_label, key=f"label_{idx}")
+
+                df["Type"]  = csv_type
+                df["Label"] = label
+                merged_dfs.append(df)
+
+            if st.button("Merge Selected Files"):
+                merged = pd.concat(merged_dfs, ignore_index=True)
+                st.success(f"Merged {len(merged_dfs)} files of type {csv_type}!")
+                st.dataframe(merged.head())
+                data, file_name, mime = csv_download(merged, f"merged_{csv_type.lower().replace(' ','_')}.csv")
+                st.download_button("Download Merged CSV", data=data, file_name=file_name, mime=mime)
         else:
-            idx = st.selectbox("Select player to edit / delete", db.index,
-                               format_func=lambda i: db.at[i, "Name"], key="edit_selectbox")
-            sel = db.loc[idx]
-
-            with st.form("edit_player_form", clear_on_submit=True):
-                parsed_dob = pd.to_datetime(sel["DOB"], errors="coerce")
-                init_dob   = parsed_dob.date() if pd.notna(parsed_dob) else datetime.date.today()
-
-                e_name = st.text_input("Name", sel["Name"], key="e_name")
-                e_dob  = st.date_input("Date of Birth", init_dob, key="e_dob")
-
-                today   = datetime.date.today()
-                e_age   = (today.year - e_dob.year
-                           - ((today.month, today.day) < (e_dob.month, e_dob.day)))
-                e_group = get_group(e_age)
-
-                e_class = st.text_input("Class", sel["Class"], key="e_class")
-                e_hs    = st.text_input("High School", sel["High School"], key="e_hs")
-
-                raw_h   = int(sel.get("Height", 0) or 0)
-                ft0, in0 = divmod(raw_h, 12)
-                raw_w   = int(sel.get("Weight", 0) or 0)
-
-                ft   = st.number_input("Height (ft)", 0, 8, value=ft0, key="e_h_ft")
-                inch = st.number_input("Height (in)", 0,11, value=in0, key="e_h_in")
-                e_height = ft*12 + inch
-                e_weight = st.number_input("Weight (lbs)", 0, 500, value=raw_w, key="e_weight")
-
-                pos_opts = ["Pitcher","Catcher","1B","2B","3B","SS","LF","CF","RF","DH"]
-                bat_opts = ["Left","Right","Switch"]
-                thr_opts = ["Left","Right"]
-
-                e_pos   = st.selectbox("Position", pos_opts,
-                                       index=pos_opts.index(sel["Position"]), key="e_pos")
-                e_bat   = st.selectbox("Batting Handedness", bat_opts,
-                                       index=bat_opts.index(sel["BattingHandedness"]), key="e_bat")
-                e_throw = st.selectbox("Throwing Handedness", thr_opts,
-                                       index=thr_opts.index(sel["ThrowingHandedness"]), key="e_throw")
-
-                col1, col2 = st.columns(2)
-                with col1:
-                    update_submit = st.form_submit_button("Update Player", use_container_width=True)
-                with col2:
-                    delete_submit = st.form_submit_button("Delete Player", type="primary", use_container_width=True)
-
-            if update_submit:
-                updates = {
-                    "Name":               e_name,
-                    "DOB":                e_dob.strftime("%m/%d/%Y"),
-                    "Age":                int(e_age),
-                    "Age Group":          e_group,
-                    "Class":              e_class,
-                    "High School":        e_hs,
-                    "Height":             e_height,
-                    "Weight":             e_weight,
-                    "Position":           e_pos,
-                    "BattingHandedness":  e_bat,
-                    "ThrowingHandedness": e_throw,
+            st.info(f"Upload two or more {csv_type} CSVs above to merge them.")
+
+    # ─────────────────────────────────────────────────────────────────────────────
+    # TAB 2: PLAYER DATABASE (new layout)
+    # ─────────────────────────────────────────────────────────────────────────────
+    with tab2:
+        st.header("Player Database")
+        st.caption("Data stored on disk in **player_database.csv**")
+
+        add_tab, edit_tab = st.tabs(["➕ Add Player", "✏️ Edit / Delete"])
+
+        with add_tab:
+            with st.form("add_player_form", clear_on_submit=True):
+                c1, c2, c3, c4 = st.columns(4)
+                with c1:
+                    add_name = st.text_input("Name", key="add_name")
+                    add_dob  = st.date_input("Date of Birth",
+                                             min_value=datetime.date(1900,1,1),
+                                             max_value=datetime.date.today(),
+                                             key="add_dob")
+                with c2:
+                    add_class = st.text_input("Class", key="add_class")
+                    add_hs    = st.text_input("High School", key="add_hs")
+                with c3:
+                    h_ft  = st.number_input("Height (ft)", 0, 8, key="add_h_ft")
+                    h_in  = st.number_input("Height (in)", 0, 11, key="add_h_in")
+                    add_height = h_ft*12 + h_in
+                    add_weight = st.number_input("Weight (lbs)", 0, 500, key="add_weight")
+                with c4:
+                    pos_opts = ["Pitcher","Catcher","1B","2B","3B","SS","LF","CF","RF","DH"]
+                    bat_opts = ["Left","Right","Switch"]
+                    thr_opts = ["Left","Right"]
+                    add_pos   = st.selectbox("Position", pos_opts, key="add_pos")
+                    add_bat   = st.selectbox("Batting Handedness", bat_opts, key="add_bat")
+                    add_throw = st.selectbox("Throwing Handedness", thr_opts, key="add_throw")
+
+                add_submit = st.form_submit_button("Add Player", use_container_width=True)
+
+            if add_submit:
+                # Age / Age Group are derived from DOB when the store commits
+                new_row   = {
+                    "Name":               add_name,
+                    "DOB":                add_dob.strftime("%m/%d/%Y"),
+                    "Class":              add_class,
+                    "High School":        add_hs,
+                    "Height":             add_height,
+                    "Weight":             add_weight,
+                    "Position":           add_pos,
+                    "BattingHandedness":  add_bat,
+                    "ThrowingHandedness": add_throw,
                 }
-                for col, val in updates.items():
-                    st.session_state.player_db.at[idx, col] = val
-                st.session_state.player_db.to_csv(DATABASE_FILENAME, index=False)
-                st.success("✅ Player updated")
-
-            if delete_submit:
-                st.session_state.player_db = (
-                    st.session_state.player_db.drop(idx).reset_index(drop=True)
-                )
-                st.session_state.player_db.to_csv(DATABASE_FILENAME, index=False)
-                st.success("🗑️ Player deleted")
-
-    # live table
-    st.markdown("### Current Database")
-    db_view = st.session_state.player_db.copy()
-    if "Age" in db_view.columns:
-        db_view["Age"] = pd.to_numeric(db_view["Age"], errors="coerce").astype("Int64")
-    st.dataframe(db_view, use_container_width=True)
-
-    # import / export
-    st.divider()
-    st.subheader("⬇️⬆️  Import / Export")
-    csv_bytes = st.session_state.player_db.to_csv(index=False).encode("utf-8")
-    st.download_button("Download Current DB as CSV", data=csv_bytes,
-                       file_name="player_database.csv", mime="text/csv", key="dl_db")
-
-    uploaded_db = st.file_uploader("Upload Player Database CSV", type="csv",
-                                   key="upload_db",
-                                   help="CSV must include the same columns as the table above.")
-    if uploaded_db is not None:
-        try:
-            imported = pd.read_csv(uploaded_db)
-            missing  = [c for c in expected_columns if c not in imported.columns]
-            if missing:
-                st.error(f"CSV missing required columns: {', '.join(missing)}")
+                def _append_player(db):
+                    out = pd.concat([db, pd.DataFrame([new_row])], ignore_index=True)
+                    return out, (out.iloc[len(db):], None)
+                store_update("player_db", _append_player)
+                st.success(f"✅ Added {add_name}")
+
+        with edit_tab:
+            db  = st.session_state.player_db
+            idx = None
+            if db.empty:
+                st.info("Database is empty—add a player first.")
             else:
-                mode = st.radio("Import mode:",
-                                ["Replace existing DB", "Merge (append & deduplicate by Name)"],
-                                horizontal=True, key="import_mode")
-                if mode == "Replace existing DB":
-                    st.session_state.player_db = imported.copy()
-                    st.success("✅ Replaced database with uploaded CSV.")
-                else:
-                    combined = pd.concat([st.session_state.player_db, imported], ignore_index=True)
-                    st.session_state.player_db = combined.drop_duplicates(subset=["Name"], keep="last")
-                    st.success("✅ Merged uploaded CSV into current database.")
-                st.session_state.player_db.to_csv(DATABASE_FILENAME, index=False)
-        except Exception as exc:
-            st.error(f"Could not read CSV: {exc}")
-
-    st.divider()
-    if st.button("Clear Entire Player Database", type="primary", key="clear_db"):
-        st.session_state.player_db = pd.DataFrame(columns=expected_columns)
-        if os.path.exists(DATABASE_FILENAME):
-            os.remove(DATABASE_FILENAME)
-        st.success("🚮 Database cleared from disk and memory")
-
-# ─────────────────────────────────────────────────────────────────────────────
-# TAB 3: SCOUT NOTES (new layout)
-# ─────────────────────────────────────────────────────────────────────────────
-with tab3:
-    st.header("Scout Notes")
-    st.info("Add, preview, bulk-upload or delete notes per player.")
-
-    if st.button("Clear ALL Notes 🗑️", type="primary", key="clear_notes"):
-        st.session_state.notes_df = pd.DataFrame(columns=["Name", "Date", "Note"])
-        st.session_state.notes_df.to_csv(NOTES_FILENAME, index=False)
-        st.success("All notes removed from disk and memory.")
-
-    player = st.selectbox("Select Player", st.session_state.player_db["Name"].tolist(), key="notes_player")
-
-    player_notes = (
-        st.session_state.notes_df[st.session_state.notes_df["Name"] == player]
-        .sort_values("Date", ascending=False)
-    )
-
-    st.subheader("Existing Notes")
-    if player_notes.empty:
-        st.write("No notes yet for this player.")
-    else:
-        idx = st.radio("Select note to include in PDF:",
-                       options=player_notes.index.tolist(),
-                       format_func=lambda i: player_notes.loc[i, "Date"].strftime("%Y-%m-%d"),
-                       key="select_note")
-        st.markdown(f"**Preview ({player_notes.loc[idx,'Date'].strftime('%Y-%m-%d')}):**")
-        st.write(player_notes.loc[idx, "Note"])
-
-        if st.button("Delete this note", key="delete_note"):
-            st.session_state.notes_df = (
-                st.session_state.notes_df.drop(idx).reset_index(drop=True)
-            )
-            st.session_state.notes_df.to_csv(NOTES_FILENAME, index=False)
-            st.success("Note deleted.")
-            st.rerun()
-
-    st.divider()
-    st.subheader("⬇️⬆️  Bulk-upload / Download Notes")
-    csv_bytes = st.session_state.notes_df.to_csv(index=False).encode("utf-8")
-    st.download_button("Download Current Notes CSV", data=csv_bytes,
-                       file_name="scout_notes.csv", mime="text/csv", key="dl_notes")
+                idx = player_picker("Select player to edit / delete", key="edit_selectbox")
+            if idx is not None:
+                sel = db.loc[idx]
+
+                with st.form("edit_player_form", clear_on_submit=True):
+                    parsed_dob = pd.to_datetime(sel["DOB"], errors="coerce")
+                    init_dob   = parsed_dob.date() if pd.notna(parsed_dob) else datetime.date.today()
+
+                    e_name = st.text_input("Name", sel["Name"], key="e_name")
+                    e_dob  = st.date_input("Date of Birth", init_dob, key="e_dob")
+
+                    e_class = st.text_input("Class", sel["Class"], key="e_class")
+                    e_hs    = st.text_input("High School", sel["High School"], key="e_hs")
+
+                    raw_h   = int(sel.get("Height", 0) or 0)
+                    ft0, in0 = divmod(raw_h, 12)
+                    raw_w   = int(sel.get("Weight", 0) or 0)
+
+                    ft   = st.number_input("Height (ft)", 0, 8, value=ft0, key="e_h_ft")
+                    inch = st.number_input("Height (in)", 0,11, value=in0, key="e_h_in")
+                    e_height = ft*12 + inch
+                    e_weight = st.number_input("Weight (lbs)", 0, 500, value=raw_w, key="e_weight")
+
+                    pos_opts = ["Pitcher","Catcher","1B","2B","3B","SS","LF","CF","RF","DH"]
+                    bat_opts = ["Left","Right","Switch"]
+                    thr_opts = ["Left","Right"]
+
+                    e_pos   = st.selectbox("Position", pos_opts,
+                                           index=pos_opts.index(sel["Position"]), key="e_pos")
+                    e_bat   = st.selectbox("Batting Handedness", bat_opts,
+                                           index=bat_opts.index(sel["BattingHandedness"]), key="e_bat")
+                    e_throw = st.selectbox("Throwing Handedness", thr_opts,
+                                           index=thr_opts.index(sel["ThrowingHandedness"]), key="e_throw")
+
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        update_submit = st.form_submit_button("Update Player", use_container_width=True)
+                    with col2:
+                        delete_submit = st.form_submit_button("Delete Player", type="primary", use_container_width=True)
+
+                if update_submit:
+                    updates = {
+                        "Name":               e_name,
+                        "DOB":                e_dob.strftime("%m/%d/%Y"),
+                        "Class":              e_class,
+                        "High School":        e_hs,
+                        "Height":             e_height,
+                        "Weight":             e_weight,
+                        "Position":           e_pos,
+                        "BattingHandedness":  e_bat,
+                        "ThrowingHandedness": e_throw,
+                    }
+                    def _apply_updates(db, old_name=sel["Name"]):
+                        hit = db.index[db["Name"] == old_name][:1]
+                        out = db.copy()
+                        for col, val in updates.items():
+                            out.loc[hit, col] = val
+                        return out, (out.loc[hit], db.loc[hit])
+                    store_update("player_db", _apply_updates)
+                    st.success("✅ Player updated")
+
+                if delete_submit:
+                    def _drop_player(db, old_name=sel["Name"]):
+                        hit = db.index[db["Name"] == old_name][:1]
+                        return db.drop(hit).reset_index(drop=True), (None, db.loc[hit])
+                    store_update("player_db", _drop_player)
+                    st.success("🗑️ Player deleted")
+
+        # live table
+        st.markdown("### Current Database")
+        roster_idx = query_index("player_db", ROSTER_FACETS)
+        f1, f2, f3, f4 = st.columns(4)
+        db_prefix  = f1.text_input("Name starts with", key="db_prefix")
+        db_filters = {col: box.multiselect(col, roster_idx.facet_values(col), key=f"db_filter_{col}")
+                      for col, box in zip(ROSTER_FACETS, (f2, f3, f4))}
+        paged_table(
+            roster_idx, "db_view", prefix=db_prefix, filters=db_filters,
+            sort_options=["Name", "Age", "Age Group", "Position", "High School", "Class"],
+            formatter=lambda page: page.assign(Age=pd.to_numeric(page["Age"], errors="coerce").astype("Int64"))
+                                   if "Age" in page.columns else page,
+        )
 
-    bulk_file = st.file_uploader("Upload Notes CSV (columns: Name, Date, Note)",
-                                 type="csv", key="bulk_notes_csv")
-    if bulk_file is not None:
-        try:
-            incoming = smart_read_csv(bulk_file, parse_dates=["Date"])
-            required = {"Name", "Date", "Note"}
-            if not required.issubset(incoming.columns):
-                st.error(f"CSV must contain columns: {', '.join(required)}")
-            else:
-                mode = st.radio(
-                    "Import mode",
-                    ["Merge (append & deduplicate by Name+Date+Note)", "Replace ALL existing notes"],
-                    horizontal=True, key="bulk_note_mode"
-                )
-                if mode.startswith("Merge"):
-                    combined = pd.concat([st.session_state.notes_df, incoming], ignore_index=True)
-                    st.session_state.notes_df = combined.drop_duplicates(
-                        subset=["Name", "Date", "Note"], keep="last"
-                    )
-                    st.success(f"✅ Merged {len(incoming)} notes.")
+        # import / export
+        st.divider()
+        st.subheader("⬇️⬆️  Import / Export")
+        lazy_download("player database CSV", "player_db", st.session_state["store_versions"]["player_db"],
+                      lambda: csv_download(st.session_state.player_db, "player_database.csv"), key="dl_db")
+
+        uploaded_db = st.file_uploader("Upload Player Database CSV", type="csv",
+                                       key="upload_db",
+                                       help="CSV must include the same columns as the table above.")
+        if uploaded_db is not None:
+            try:
+                imported = pd.read_csv(uploaded_db)
+                missing  = [c for c in expected_columns if c not in imported.columns]
+                if missing:
+                    st.error(f"CSV missing required columns: {', '.join(missing)}")
                 else:
-                    st.session_state.notes_df = incoming.copy()
-                    st.success(f"✅ Replaced with {len(incoming)} notes.")
-                st.session_state.notes_df.to_csv(NOTES_FILENAME, index=False)
-        except Exception as exc:
-            st.error(f"Could not read CSV – {exc}")
-
-    st.divider()
-    st.subheader("✍️  Add a New Note")
-    note_date = st.date_input("Note Date", value=datetime.date.today(), key="new_note_date")
-    note_text = st.text_area("Note Text", key="new_note_text")
-    if st.button("Save Note", key="save_note"):
-        new_row = {"Name": player, "Date": pd.to_datetime(note_date), "Note": note_text}
-        st.session_state.notes_df = pd.concat(
-            [st.session_state.notes_df, pd.DataFrame([new_row])],
-            ignore_index=True
+                    mode = st.radio("Import mode:",
+                                    ["Replace existing DB", "Merge (upsert by Name)"],
+                                    horizontal=True, key="import_mode")
+                    if mode == "Replace existing DB":
+                        store_update("player_db", lambda db: imported)
+                        st.success("✅ Replaced database with uploaded CSV.")
+                    else:
+                        summary = store_upsert("player_db", imported)
+                        st.success(f"✅ Merged uploaded CSV: {upsert_message(summary)}.")
+            except Exception as exc:
+                st.error(f"Could not read CSV: {exc}")
+
+        st.divider()
+        if st.button("Clear Entire Player Database", type="primary", key="clear_db"):
+            store_update("player_db", lambda db: pd.DataFrame(columns=expected_columns), persist=False)
+            if os.path.exists(DATABASE_FILENAME):
+                os.remove(DATABASE_FILENAME)
+            st.success("🚮 Database cleared from disk and memory")
+
+    # ─────────────────────────────────────────────────────────────────────────────
+    # TAB 3: SCOUT NOTES (new layout)
+    # ─────────────────────────────────────────────────────────────────────────────
+    with tab3:
+        st.header("Scout Notes")
+        st.info("Add, preview, bulk-upload or delete notes per player.")
+
+        if st.button("Clear ALL Notes 🗑️", type="primary", key="clear_notes"):
+            store_update("notes_df", lambda df: pd.DataFrame(columns=["Name", "Date", "Note"]))
+            st.success("All notes removed from disk and memory.")
+
+        notes_idx = query_index("notes_df", ("Name", "Age Group"), with_age_group=True)
+        with st.expander("🔍 Search note text", expanded=True):
+            note_query = st.text_input("Search notes", key="notes_search",
+                                       placeholder='hip hinge, "late load"…',
+                                       help="Every word must appear (words match by prefix); "
+                                            "\"quoted words\" must appear in that order.")
+            q1, q2, q3 = st.columns(3)
+            search_names  = q1.multiselect("Player", notes_idx.facet_values("Name"), key="notes_search_players")
+            search_groups = q2.multiselect("Age Group", notes_idx.facet_values("Age Group"), key="notes_search_groups")
+            search_dates  = q3.date_input("Date range", value=(), key="notes_search_dates")
+            if note_query.strip() or search_names or search_groups or len(search_dates) == 2:
+                start, end = search_dates if len(search_dates) == 2 else (None, None)
+                found = shared_store().note_search().search(
+                    note_query, names=search_names, age_groups=search_groups,
+                    lookup=age_group_lookup(st.session_state.player_db), start=start, end=end)
+                st.dataframe(found.head(NOTE_SEARCH_LIMIT), use_container_width=True, hide_index=True,
+                             column_config={"Date": st.column_config.DateColumn(format="YYYY-MM-DD")})
+                st.caption(f"{len(found)} matching note{'s' * (len(found) != 1)}" + (f" · newest {NOTE_SEARCH_LIMIT} shown"
+                                                             if len(found) > NOTE_SEARCH_LIMIT else ""))
+
+        with st.expander("🔎 Browse all notes"):
+            n1, n2 = st.columns(2)
+            notes_prefix = n1.text_input("Player name starts with", key="notes_prefix")
+            notes_groups = n2.multiselect("Age Group", notes_idx.facet_values("Age Group"), key="notes_filter_group")
+            paged_table(notes_idx, "notes_view", prefix=notes_prefix, filters={"Age Group": notes_groups},
+                        sort_options=["Date", "Name", "Age Group"])
+
+        sel_player = player_picker("Select Player", key="notes_player")
+        player = st.session_state.player_db.at[sel_player, "Name"] if sel_player is not None else None
+
+        player_notes = (
+            notes_idx.facet_rows("Name", player)
+            .sort_values("Date", ascending=False)
         )
-        st.session_state.notes_df.to_csv(NOTES_FILENAME, index=False)
-        st.success("Note saved.")
-        st.rerun()
 
-# ─────────────────────────────────────────────────────────────────────────────
-# TAB 4: THRESHOLDS (new layout; number_inputs + CSV import/export)
-# ─────────────────────────────────────────────────────────────────────────────
-with tab4:
-    st.header("🔧 Metric Thresholds by Age-Group")
-
-    # One-time fix if a flat dict somehow exists
-    if not any(k in AGE_LABELS for k in st.session_state["thresholds"].keys()):
-        st.session_state["thresholds"] = broadcast_metrics_to_ages(st.session_state["thresholds"])
-    thresholds = st.session_state["thresholds"]
-
-    def order_for_ui(metric: str, lo: float, mid: float, hi: float) -> dict:
-        if metric in LOWER_IS_BETTER:
-            return {
-                "lbl_lo": "Above Avg (best/fastest)",
-                "lbl_mid": "Avg",
-                "lbl_hi": "Below Avg (worst/slowest)",
-                "lo": hi, "mid": mid, "hi": lo
-            }
-        return {"lbl_lo":"Below Avg", "lbl_mid":"Avg", "lbl_hi":"Above Avg", "lo":lo, "mid":mid, "hi":hi}
-
-    edit_mode = st.toggle("Edit mode", value=False)
-    st.caption("Browse in **View**; switch to **Edit** to change values, then press **Save thresholds**.")
-
-    age_groups_keys = list(thresholds.keys())
-    if not age_groups_keys:
-        st.error("⚠️ No age-group data found.")
-        st.stop()
-    tabs_age = st.tabs(age_groups_keys)
-
-    for grp, grp_tab in zip(age_groups_keys, tabs_age):
-        metrics = thresholds[grp]
-        with grp_tab:
-            sel_metric = st.selectbox("Choose metric", sorted(metrics.keys()), key=f"sel_{grp}")
-            cuts = metrics[sel_metric]
-            if isinstance(cuts, dict) and {"below_avg", "avg", "above_avg"}.issubset(cuts):
-                lo, mid, hi = cuts["below_avg"], cuts["avg"], cuts["above_avg"]
-            else:
-                mid = float(cuts) if cuts is not None else 0.0
-                lo, hi = round(mid * 0.9, 2), round(mid * 1.1, 2)
-
-            cfg = order_for_ui(sel_metric, float(lo), float(mid), float(hi))
-            rng_min = min(cfg["lo"], cfg["mid"], cfg["hi"]) * 0.50
-            rng_max = max(cfg["lo"], cfg["mid"], cfg["hi"]) * 1.50
-
-            col_lbl, col_lo, col_mid, col_hi = st.columns([2,1,1,1])
-            col_lbl.markdown(f"### {sel_metric}")
-
-            if edit_mode:
-                new_lo  = col_lo.number_input(cfg["lbl_lo"],  value=float(cfg["lo"]),
-                                              min_value=float(rng_min), max_value=float(cfg["mid"]),
-                                              step=0.01, key=f"{grp}_{sel_metric}_lo")
-                new_mid = col_mid.number_input(cfg["lbl_mid"], value=float(cfg["mid"]),
-                                              min_value=min(new_lo, cfg["mid"]),
-                                              max_value=max(new_lo, cfg["hi"]),
-                                              step=0.01, key=f"{grp}_{sel_metric}_mid")
-                new_hi  = col_hi.number_input(cfg["lbl_hi"],  value=float(cfg["hi"]),
-                                              min_value=new_mid, max_value=float(rng_max),
-                                              step=0.01, key=f"{grp}_{sel_metric}_hi")
-
-                if sel_metric in LOWER_IS_BETTER:
-                    thresholds[grp][sel_metric] = {
-                        "below_avg": new_hi, "avg": new_mid, "above_avg": new_lo
-                    }
+        st.subheader("Existing Notes")
+        if player_notes.empty:
+            st.write("No notes yet for this player.")
+        else:
+            idx = st.radio("Select note to include in PDF:",
+                           options=player_notes.index.tolist(),
+                           format_func=lambda i: player_notes.loc[i, "Date"].strftime("%Y-%m-%d"),
+                           key="select_note")
+            st.markdown(f"**Preview ({player_notes.loc[idx,'Date'].strftime('%Y-%m-%d')}):**")
+            st.write(player_notes.loc[idx, "Note"])
+
+            if st.button("Delete this note", key="delete_note"):
+                target = player_notes.loc[idx]
+                def drop_note(df):
+                    hit = df.index[(df["Name"] == target["Name"]) & (df["Date"] == target["Date"])
+                                   & (df["Note"] == target["Note"])][:1]
+                    return df.drop(hit).reset_index(drop=True), (None, df.loc[hit])
+                store_update("notes_df", drop_note)
+                st.success("Note deleted.")
+                st.rerun()
+
+        st.divider()
+        st.subheader("⬇️⬆️  Bulk-upload / Download Notes")
+        lazy_download("notes CSV", "notes_df", st.session_state["store_versions"]["notes_df"],
+                      lambda: csv_download(st.session_state.notes_df, "scout_notes.csv"), key="dl_notes")
+
+        bulk_file = st.file_uploader("Upload Notes CSV (columns: Name, Date, Note)",
+                                     type="csv", key="bulk_notes_csv")
+        if bulk_file is not None:
+            try:
+                incoming = smart_read_csv(bulk_file, parse_dates=["Date"])
+                required = {"Name", "Date", "Note"}
+                if not required.issubset(incoming.columns):
+                    st.error(f"CSV must contain columns: {', '.join(required)}")
                 else:
-                    thresholds[grp][sel_metric] = {
-                        "below_avg": new_lo, "avg": new_mid, "above_avg": new_hi
-                    }
-            else:
-                col_lo.metric(cfg["lbl_lo"],  f"{cfg['lo']}")
-                col_mid.metric(cfg["lbl_mid"], f"{cfg['mid']}")
-                col_hi.metric(cfg["lbl_hi"],  f"{cfg['hi']}")
-
-    if edit_mode:
-        col_save, col_dl, col_up = st.columns(3)
-        with col_save:
-            if st.button("💾 Save thresholds"):
-                flatten_thresholds(thresholds).to_csv("thresholds.csv", index=False)
-                st.success("Saved → thresholds.csv")
-        with col_dl:
-            dl_bytes = flatten_thresholds(thresholds).to_csv(index=False).encode("utf-8")
-            st.download_button("⬇️ Download CSV", dl_bytes, file_name="thresholds.csv", mime="text/csv", key="dl_thresh")
-        with col_up:
-            up_file = st.file_uploader("⬆️ Upload CSV", type="csv",
-                                       help="Columns: Age Group, Metric, below_avg, avg, above_avg")
-            if up_file:
-                try:
-                    df_up = pd.read_csv(up_file)
-                    req = {"Age Group", "Metric", "below_avg", "avg", "above_avg"}
-                    if not req.issubset(df_up.columns):
-                        st.error("CSV missing required columns.")
+                    mode = st.radio(
+                        "Import mode",
+                        ["Merge (upsert by Name+Date+Note)", "Replace ALL existing notes"],
+                        horizontal=True, key="bulk_note_mode"
+                    )
+                    if mode.startswith("Merge"):
+                        summary = store_upsert("notes_df", incoming)
+                        st.success(f"✅ Merged notes: {upsert_message(summary)}.")
                     else:
-                        new = {}
-                        for _, r in df_up.iterrows():
-                            g, m = r["Age Group"], r["Metric"]
-                            new.setdefault(g, {})[m] = {
-                                "below_avg": float(r["below_avg"]),
-                                "avg":       float(r["avg"]),
-                                "above_avg": float(r["above_avg"]),
-                            }
-                        st.session_state["thresholds"] = new
-                        st.success("Imported thresholds.")
-                        st.rerun()
-                except Exception as exc:
-                    st.error(f"Failed to read CSV: {exc}")
-
-# ─────────────────────────────────────────────────────────────────────────────
-# TAB 5: REPORTS & TEMPLATES (uploads inside tab, two sub-tabs)
-# ─────────────────────────────────────────────────────────────────────────────
-with tab5:
-    st.header("📄 Reports & Templates")
-
-    rep_tab, tmpl_tab = st.tabs(["Generate Report", "Template's"])
-
-    # A) Generate Report
-    with rep_tab:
-        import difflib
-        from pandas.errors import EmptyDataError
-
-        def safe_read_csv(file_obj):
-            if file_obj is None:
-                return pd.DataFrame()
-            for enc in (None, "cp1252", "latin-1"):
-                try:
-                    file_obj.seek(0)
-                    return pd.read_csv(file_obj, encoding=enc) if enc else pd.read_csv(file_obj)
-                except (UnicodeDecodeError, EmptyDataError):
-                    continue
-            return pd.DataFrame()
-
-        def normalize_dashes(s):
-            s = "" if s is None else str(s)
-            return s.replace("\u0096", "-").replace("–", "-").replace("—", "-")
-
-        with st.expander("1️⃣  Upload CSVs & Map Names", expanded=True):
-            up_cols = st.columns(3)
-            with up_cols[0]:
-                fs_file    = st.file_uploader("Flightscope CSV",         type="csv")
-                throw_file = st.file_uploader("Throwing Velocities CSV", type="csv")
-            with up_cols[1]:
-                blast_file = st.file_uploader("Blast CSV",               type="csv")
-                run_file   = st.file_uploader("Running Speed CSV",       type="csv")
-            with up_cols[2]:
-                mob_file   = st.file_uploader("Mobility CSV",            type="csv")
-                dyn_file   = st.file_uploader("Dynamo CSV",              type="csv")
-
-            flightscope_data = safe_read_csv(fs_file)
-            blast_data       = safe_read_csv(blast_file)
-            throwing_data    = safe_read_csv(throw_file)
-            running_data     = safe_read_csv(run_file)
-            mobility_data    = safe_read_csv(mob_file)
-            dynamo_data      = safe_read_csv(dyn_file)
-
-            for df, col in [
-                (running_data,  "AthleteID"),
-                (mobility_data, "Player Name"),
-                (throwing_data, "Player Name"),
-            ]:
-                if df is not None and not df.empty and col in df.columns:
-                    df[col] = df[col].astype(str).apply(normalize_dashes)
-
-            player_db  = st.session_state.player_db.copy()
-            player_db["nm"] = player_db["Name"].astype(str).str.lower().str.strip()
-            canonical  = player_db["Name"].tolist()
-
-            def mapper_ui(df, raw_col, label):
-                if df is None or df.empty or raw_col not in df.columns:
-                    return {}
-                m = {}
-                st.subheader(f"{label} name mapping")
-                for raw in df[raw_col].dropna().unique():
-                    best = difflib.get_close_matches(raw, canonical, n=3, cutoff=0.6)
-                    default = best[0] if best else "<leave as is>"
-                    choice = st.selectbox(f" {raw}",
-                                          ["<leave as is>"] + canonical,
-                                          index=(["<leave as is>"] + canonical).index(default),
-                                          key=f"map_{label}_{raw}")
-                    m[raw] = raw if choice == "<leave as is>" else choice
-                return m
-
-            run_map   = mapper_ui(running_data,  "AthleteID",   "Running")
-            mob_map   = mapper_ui(mobility_data, "Player Name", "Mobility")
-            throw_map = mapper_ui(throwing_data, "Player Name", "Throwing")
-
-            if running_data is not None and not running_data.empty and "AthleteID" in running_data.columns:
-                running_data["AthleteID"] = running_data["AthleteID"].map(lambda x: run_map.get(x, x))
-            if mobility_data is not None and not mobility_data.empty and "Player Name" in mobility_data.columns:
-                mobility_data["Player Name"] = mobility_data["Player Name"].map(lambda x: mob_map.get(x, x))
-            if throwing_data is not None and not throwing_data.empty and "Player Name" in throwing_data.columns:
-                throwing_data["Player Name"] = throwing_data["Player Name"].map(lambda x: throw_map.get(x, x))
-
-        st.markdown("### 2️⃣  Select Player & Date")
-        if "Age Group" not in st.session_state.player_db.columns:
-            st.session_state.player_db["Age Group"] = st.session_state.player_db["Age"].apply(get_group)
-
-        if st.session_state.player_db.empty:
-            st.warning("Add players first on the **Player Database** tab.")
-            st.stop()
-
-        sel_idx = st.selectbox("Player", st.session_state.player_db.index,
-                               format_func=lambda i: st.session_state.player_db.at[i, "Name"])
-        prow = st.session_state.player_db.loc[sel_idx]
-        assess_date = st.date_input("Assessment Date", datetime.date.today())
-
-        player_info = {
-            "Name": prow["Name"],
-            "Age": int(prow["Age"]),
-            "Age Group": prow["Age Group"],
-            "Position": prow["Position"],
-            "Class": prow["Class"],
-            "High School": prow["High School"],
-            "Height": prow["Height"],
-            "Weight": prow["Weight"],
-            "B/T": f"{prow.get('BattingHandedness','')}/{prow.get('ThrowingHandedness','')}".rstrip("/"),
-            "DOB": prow["DOB"],
-            "AssessmentDate": assess_date.strftime("%m/%d/%Y"),
-        }
-
-        ndf = st.session_state.get("notes_df", pd.DataFrame())
-        last_note = (
-            ndf.query("Name == @player_info['Name']")
-               .sort_values("Date", ascending=False)
-               .Note.head(1)
-        )
-        player_info["LatestNoteText"] = last_note.iat[0] if not last_note.empty else ""
-
-        grp = player_info["Age Group"]
-
-        def safe_merge_all(df, name_cols):
-            if df is None or df.empty:
-                return df
-            tmp = df.copy()
-            # choose first present column to derive "nm"
-            for c in name_cols:
-                if c in tmp.columns:
-                    tmp["nm"] = tmp[c].astype(str).str.lower().str.strip()
-                    break
+                        store_update("notes_df", lambda df: incoming)
+                        st.success(f"✅ Replaced with {len(incoming)} notes.")
+            except Exception as exc:
+                st.error(f"Could not read CSV – {exc}")
+
+        st.divider()
+        st.subheader("✍️  Add a New Note")
+        note_date = st.date_input("Note Date", value=datetime.date.today(), key="new_note_date")
+        note_text = st.text_area("Note Text", key="new_note_text")
+        if st.button("Save Note", key="save_note"):
+            if player is None:
+                st.warning("Select a player above before saving a note.")
             else:
-                tmp["nm"] = None
-            return tmp.merge(
-                st.session_state.player_db.assign(nm=st.session_state.player_db["Name"].astype(str).str.lower().str.strip())[
-                    ["nm", "DOB", "Age", "Age Group"]
-                ],
-                on="nm", how="left"
-            )
+                new_row = pd.DataFrame([{"Name": player, "Date": pd.to_datetime(note_date), "Note": note_text}])
+                def append_note(df):
+                    out = pd.concat([df, new_row], ignore_index=True)
+                    return out, (out.iloc[len(df):], None)
+                store_update("notes_df", append_note)
+                st.success("Note saved.")
+                st.rerun()
+
+    # ─────────────────────────────────────────────────────────────────────────────
+    # TAB 4: THRESHOLDS (new layout; number_inputs + CSV import/export)
+    # ─────────────────────────────────────────────────────────────────────────────
+    with tab4:
+        st.header("🔧 Metric Thresholds by Age-Group")
+
+        # Edits go to a private draft; the shared thresholds only change on save.
+        edit_mode = st.toggle("Edit mode", value=False, key="thr_edit_mode")
+        st.caption("Browse in **View**; switch to **Edit** to change values, then press **Save thresholds**. "
+                   "Unsaved edits are dropped when you leave Edit mode.")
+        if edit_mode and "thresholds_draft" not in st.session_state:
+            st.session_state["thresholds_draft"] = copy.deepcopy(store.get("thresholds")[0])
+        elif not edit_mode:
+            st.session_state.pop("thresholds_draft", None)
+        sync_session_from_store()
+
+        # One-time fix if a flat dict somehow exists
+        if not any(k in AGE_LABELS for k in st.session_state["thresholds"].keys()):
+            st.session_state["thresholds"] = broadcast_metrics_to_ages(st.session_state["thresholds"])
+        thresholds = st.session_state["thresholds"]
+
+        def order_for_ui(metric: str, lo: float, mid: float, hi: float) -> dict:
+            if metric in LOWER_IS_BETTER:
+                return {
+                    "lbl_lo": "Above Avg (best/fastest)",
+                    "lbl_mid": "Avg",
+                    "lbl_hi": "Below Avg (worst/slowest)",
+                    "lo": hi, "mid": mid, "hi": lo
+                }
+            return {"lbl_lo":"Below Avg", "lbl_mid":"Avg", "lbl_hi":"Above Avg", "lo":lo, "mid":mid, "hi":hi}
+
 
-        blast_data       = safe_merge_all(blast_data,       ["Name"])
-        flightscope_data = safe_merge_all(flightscope_data, ["Name","Player Name","Batter"])
-        throwing_data    = safe_merge_all(throwing_data,    ["Name","Player Name"])
-        running_data     = safe_merge_all(running_data,     ["Name","Player Name","AthleteID"])
-        mobility_data    = safe_merge_all(mobility_data,    ["Name","Batter","Player Name"])
-        dynamo_data      = safe_merge_all(dynamo_data,      ["Name"])
-
-        key = str(player_info["Name"]).lower().strip()
-        def by_age(df):
-            if df is None or df.empty or "Age Group" not in df.columns:
-                return df
-            return df[df["Age Group"] == grp]
-
-        def by_name(df):
-            if df is None or df.empty or "nm" not in df.columns:
-                return df
-            return df[df["nm"] == key]
-
-        grp_blast = by_age(blast_data)
-        grp_fs    = by_age(flightscope_data)
-        grp_dyn   = by_age(dynamo_data)
-
-        grp_throw = by_name(throwing_data)
-        grp_run   = by_name(running_data)
-        grp_mob   = by_name(mobility_data)
-
-        max_ev, p90_ev        = calculate_flightscope_metrics(grp_fs) if (grp_fs is not None and not grp_fs.empty) else (None, None)
-        averages, ranges      = calculate_blast_metrics(grp_blast)    if (grp_blast is not None and not grp_blast.empty) else ({}, {})
-        velocities            = calculate_throwing_velocities(grp_throw)
-        speeds, speed_ranges  = calculate_running_speeds(grp_run)
-
-        mobility_dict = {}
-        if grp_mob is not None and not grp_mob.empty:
-            r = grp_mob.iloc[0]
-            mobility_dict = {
-                "Ankle":    r.get("Ankle Mobility"),
-                "Thoracic": r.get("Thoracic Mobility"),
-                "Lumbar":   r.get("Lumbar Mobility"),
-            }
-
-        if st.checkbox("Show debug preview"):
-            for lbl, df in [("Blast", grp_blast), ("Flightscope", grp_fs),
-                            ("Throwing", grp_throw), ("Running", grp_run),
-                            ("Mobility", grp_mob), ("Dynamo", grp_dyn)]:
-                st.markdown(f"**{lbl}** *(first 3 rows)*")
-                if df is None:
-                    st.write("None")
-                elif df.empty:
-                    st.write("Empty")
+        age_groups_keys = list(thresholds.keys())
+        if not age_groups_keys:
+            st.error("⚠️ No age-group data found.")
+            st.stop()
+        tabs_age = st.tabs(age_groups_keys)
+
+        for grp, grp_tab in zip(age_groups_keys, tabs_age):
+            metrics = thresholds[grp]
+            with grp_tab:
+                sel_metric = st.selectbox("Choose metric", sorted(metrics.keys()), key=f"sel_{grp}")
+                cuts = metrics[sel_metric]
+                if isinstance(cuts, dict) and {"below_avg", "avg", "above_avg"}.issubset(cuts):
+                    lo, mid, hi = cuts["below_avg"], cuts["avg"], cuts["above_avg"]
                 else:
-                    st.dataframe(df.head(3))
-
-        st.markdown("---")
-        if st.button("Generate Combined PDF", use_container_width=True):
-            with st.spinner("Building PDF…"):
-                pdf_buf = create_combined_pdf(
-                    max_ev, p90_ev, averages, ranges,
-                    velocities, speeds, speed_ranges,
-                    player_info, grp_fs,
-                    mobility=mobility_dict, dynamo_data=grp_dyn
-                )
-            st.success("PDF ready!")
-            st.download_button("⬇️  Download",
-                               data=pdf_buf,
-                               file_name=f"{player_info['Name'].replace(' ','')}.pdf",
-                               mime="application/pdf")
-
-    # B) Template's
-    with tmpl_tab:
-        st.subheader("📥  Blank CSV Templates")
-        def template_btn(fname, cols):
-            csv = pd.DataFrame(columns=cols).to_csv(index=False).encode("utf-8")
-            st.download_button(fname, csv, file_name=fname, mime="text/csv")
-
-        colA, colB = st.columns(2)
-        with colA:
-            template_btn("running_speed_template.csv",
-                         ["Player Name", "30yd Time", "60yd Time", "5-5-10 Shuttle Time"])
-            template_btn("core_strength_template.csv",
-                         ["Player Name", "Core Strength Measurement"])
-        with colB:
-            template_btn("throwing_velocities_template.csv",
-                         ["Player Name", "Positional Throw Velocity", "Pulldown Velocity",
-                          "FB Velocity", "SL Velocity", "CB Velocity", "CH Velocity"])
-            template_btn("mobility_template.csv",
-                         ["Player Name", "Ankle Mobility", "Thoracic Mobility", "Lumbar Mobility"])
+                    mid = float(cuts) if cuts is not None else 0.0
+                    lo, hi = round(mid * 0.9, 2), round(mid * 1.1, 2)
+
+                cfg = order_for_ui(sel_metric, float(lo), float(mid), float(hi))
+                rng_min = min(cfg["lo"], cfg["mid"], cfg["hi"]) * 0.50
+                rng_max = max(cfg["lo"], cfg["mid"], cfg["hi"]) * 1.50
+
+                col_lbl, col_lo, col_mid, col_hi = st.columns([2,1,1,1])
+                col_lbl.markdown(f"### {sel_metric}")
+
+                if edit_mode:
+                    new_lo  = col_lo.number_input(cfg["lbl_lo"],  value=float(cfg["lo"]),
+                                                  min_value=float(rng_min), max_value=float(cfg["mid"]),
+                                                  step=0.01, key=f"{grp}_{sel_metric}_lo")
+                    new_mid = col_mid.number_input(cfg["lbl_mid"], value=float(cfg["mid"]),
+                                                  min_value=min(new_lo, cfg["mid"]),
+                                                  max_value=max(new_lo, cfg["hi"]),
+                                                  step=0.01, key=f"{grp}_{sel_metric}_mid")
+                    new_hi  = col_hi.number_input(cfg["lbl_hi"],  value=float(cfg["hi"]),
+                                                  min_value=new_mid, max_value=float(rng_max),
+                                                  step=0.01, key=f"{grp}_{sel_metric}_hi")
+
+                    if sel_metric in LOWER_IS_BETTER:
+                        thresholds[grp][sel_metric] = {
+                            "below_avg": new_hi, "avg": new_mid, "above_avg": new_lo
+                        }
+                    else:
+                        thresholds[grp][sel_metric] = {
+                            "below_avg": new_lo, "avg": new_mid, "above_avg": new_hi
+                        }
+                else:
+                    col_lo.metric(cfg["lbl_lo"],  f"{cfg['lo']}")
+                    col_mid.metric(cfg["lbl_mid"], f"{cfg['mid']}")
+                    col_hi.metric(cfg["lbl_hi"],  f"{cfg['hi']}")
+
+        if edit_mode:
+            col_save, col_dl, col_up = st.columns(3)
+            with col_save:
+                if st.button("💾 Save thresholds"):
+                    store_update("thresholds", lambda thr: copy.deepcopy(thresholds))
+                    st.success(f"Saved → {THRESHOLDS_FILENAME}")
+            with col_dl:
+                # the draft changes with every edit, so its content is the version
+                draft = hashlib.blake2b(repr(thresholds).encode(), digest_size=16).hexdigest()
+                lazy_download("thresholds CSV", "thresholds", draft,
+                              lambda: csv_download(flatten_thresholds(thresholds), "thresholds.csv"),
+                              key="dl_thresh", keep_old=True)
+            with col_up:
+                up_file = st.file_uploader("⬆️ Upload CSV", type="csv",
+                                           help="Columns: Age Group, Metric, below_avg, avg, above_avg")
+                if up_file:
+                    try:
+                        df_up = pd.read_csv(up_file)
+                        req = {"Age Group", "Metric", "below_avg", "avg", "above_avg"}
+                        if not req.issubset(df_up.columns):
+                            st.error("CSV missing required columns.")
+                        else:
+                            st.session_state.pop("thresholds_draft", None)
+                            store_update("thresholds", lambda thr: unflatten_thresholds(df_up))
+                            st.success("Imported thresholds.")
+                            st.rerun()
+                    except Exception as exc:
+                        st.error(f"Failed to read CSV: {exc}")
+
+    # ─────────────────────────────────────────────────────────────────────────────
+    # TAB 5: REPORTS & TEMPLATES (uploads inside tab, two sub-tabs)
+    # ─────────────────────────────────────────────────────────────────────────────
+    with tab5:
+        st.header("📄 Reports & Templates")
+
+        rep_tab, tmpl_tab = st.tabs(["Generate Report", "Template's"])
+
+        # A) Generate Report
+        with rep_tab:
+            def normalize_dashes(s):
+                s = "" if s is None else str(s)
+                return s.replace("\u0096", "-").replace("–", "-").replace("—", "-")
+
+            with st.expander("1️⃣  Upload CSVs & Map Names", expanded=True):
+                up_cols = st.columns(3)
+                with up_cols[0]:
+                    fs_file    = st.file_uploader("Flightscope CSV",         type="csv")
+                    throw_file = st.file_uploader("Throwing Velocities CSV", type="csv")
+                with up_cols[1]:
+                    blast_file = st.file_uploader("Blast CSV",               type="csv")
+                    run_file   = st.file_uploader("Running Speed CSV",       type="csv")
+                with up_cols[2]:
+                    mob_file   = st.file_uploader("Mobility CSV",            type="csv")
+                    dyn_file   = st.file_uploader("Dynamo CSV",              type="csv")
+
+                dropped = st.file_uploader("…or drop any mix of device CSVs", type="csv",
+                                           accept_multiple_files=True, key="device_drop",
+                                           help=f"Each file is routed by its header (first {SNIFF_BYTES // 1024} KB); "
+                                                "a file in a device uploader above takes precedence.")
+
+                uploads = {"flightscope": fs_file, "blast": blast_file, "throwing": throw_file,
+                           "running": run_file, "mobility": mob_file, "dynamo": dyn_file}
+                # a file in the wrong uploader would otherwise fail silently deep in the metric code
+                for src, f in uploads.items():
+                    found = sniff_source(f) if f is not None else None
+                    if found and found != src:
+                        st.warning(f"{f.name} looks like a {SOURCE_LABELS[found]} export, "
+                                   f"not {SOURCE_LABELS[src]}.")
+                routed, unknown, extra = route_uploads(dropped)
+                for src, f in list(routed.items()):
+                    if uploads[src] is None:
+                        uploads[src] = f
+                    else:
+                        extra.append((src, routed.pop(src)))
+                if routed:
+                    st.caption("Routed: " + ", ".join(f"{f.name} → {SOURCE_LABELS[src]}" for src, f in routed.items()))
+                for f in unknown:
+                    st.warning(f"{f.name}: the header matches no device export; use the matching uploader above.")
+                for src, f in extra:
+                    st.warning(f"{f.name}: only one {SOURCE_LABELS[src]} file is used per report "
+                               "(combine several on the CSV Merge tab).")
+                fs_file = uploads["flightscope"]
+                use_inbox = st.checkbox("Use inbox data when no file is uploaded", value=True, key="use_ingested")
+                stream_fs = st.toggle("Stream Flightscope (bounded memory)", key="stream_flightscope",
+                                      help=f"Read Flightscope in {FS_CHUNK_ROWS:,}-row chunks into per-player "
+                                           "aggregates instead of loading the whole file; 90th % EV is "
+                                           f"exact to {EV_SKETCH_STEP} mph.")
+                progressive = st.toggle("Progressive preview for large files", value=True, key="progressive_preview",
+                                        help=f"Uploads over {PROGRESSIVE_BYTES // 2**20} MB are parsed in the "
+                                             "background; approximate numbers from a row sample show meanwhile.")
+                fs_agg = None
+                if stream_fs:
+                    fs_src = fs_file
+                    if fs_src is None and use_inbox and os.path.exists(_ingest_path("flightscope")):
+                        fs_src = _ingest_path("flightscope")
+                    if fs_src is not None:
+                        ident = ((fs_src.name, fs_src.size) if fs_file is not None
+                                 else (fs_src, os.path.getmtime(fs_src)))
+                        def aggregate():
+                            with st.spinner("Aggregating Flightscope…"):
+                                return stream_flightscope(fs_src)
+                        fs_agg = session_memory().get("flightscope_stream", ident, aggregate, "aggregates")
+                        st.caption(f"Flightscope streamed: {fs_agg.rows:,} rows, {len(fs_agg.names)} players")
+                    uploads = {**uploads, "flightscope": None}
+                # each uploaded file is parsed once; new ones are parsed side by side
+                memo  = session_memory()
+                fresh = {src: f for src, f in uploads.items()
+                         if f is not None and not memo.holds(f"upload:{src}", f.file_id)}
+                # large ones (progressive mode) parse in the background behind a sampled preview
+                jobs = st.session_state.setdefault("_progressive_parses", {})
+                for src in [s for s, job in jobs.items() if s not in fresh or fresh[s].file_id != job.tag]:
+                    del jobs[src]
+                if progressive:
+                    for src, f in fresh.items():
+                        if src not in jobs and f.size > PROGRESSIVE_BYTES:
+                            jobs[src] = ProgressiveParse(f.file_id, f.getvalue())
+                waiting = {src: job for src, job in jobs.items() if not job.done()}
+                parsed, failed = read_uploads({src: f.getvalue() for src, f in fresh.items() if src not in jobs})
+                for src in [s for s in jobs if s not in waiting]:
+                    try:
+                        parsed[src] = jobs.pop(src).future.result()
+                    except Exception as e:
+                        failed[src] = str(e) or type(e).__name__
+                for src, df in parsed.items():
+                    memo.put(f"upload:{src}", fresh[src].file_id, df, "frames")
+                for src, msg in failed.items():
+                    st.error(f"{src.title()} upload {fresh[src].name!r} could not be read: {msg}")
+                # shallow copies so the renames below stay local
+                frames  = {src: pd.DataFrame() if f is None or src in failed or src in waiting else
+                                memo.get(f"upload:{src}", f.file_id, lambda f=f: read_upload_csv(f.getvalue()),
+                                         "frames").copy(deep=False)
+                           for src, f in uploads.items()}
+                # sources without a browser upload fall back to what inbox_daemon.py ingested
+                if use_inbox:
+                    inbox = [src for src, f in uploads.items() if f is None and not (stream_fs and src == "flightscope")]
+                    frames.update({src: ingested_frame(src) for src in inbox})
+                    inbox = [f"{src} ({len(frames[src])} rows)" for src in inbox if not frames[src].empty]
+                    if inbox:
+                        st.caption("From inbox: " + ", ".join(inbox))
+
+                # what each frame was read from, so derived indexes know when to rebuild
+                frame_tags = {src: ("upload", f.file_id) if f is not None else ("inbox", ingested_version(src))
+                              for src, f in uploads.items()}
+
+                flightscope_data = frames["flightscope"]
+                blast_data       = frames["blast"]
+                throwing_data    = frames["throwing"]
+                running_data     = frames["running"]
+                mobility_data    = frames["mobility"]
+                dynamo_data      = frames["dynamo"]
+
+                for df, col in [
+                    (running_data,  "AthleteID"),
+                    (mobility_data, "Player Name"),
+                    (throwing_data, "Player Name"),
+                ]:
+                    if df is not None and not df.empty and col in df.columns:
+                        df[col] = df[col].astype(str).apply(normalize_dashes)
+
+                canonical  = st.session_state.player_db["Name"].tolist()
+
+                def mapper_ui(df, raw_col, label):
+                    if df is None or df.empty or raw_col not in df.columns:
+                        return {}
+                    import difflib  # only once there are raw names to match
+
+                    m = {}
+                    st.subheader(f"{label} name mapping")
+                    for raw in df[raw_col].dropna().unique():
+                        best = difflib.get_close_matches(raw, canonical, n=3, cutoff=0.6)
+                        default = best[0] if best else "<leave as is>"
+                        choice = st.selectbox(f" {raw}",
+                                              ["<leave as is>"] + canonical,
+                                              index=(["<leave as is>"] + canonical).index(default),
+                                              key=f"map_{label}_{raw}")
+                        m[raw] = raw if choice == "<leave as is>" else choice
+                    return m
+
+                run_map   = mapper_ui(running_data,  "AthleteID",   "Running")
+                mob_map   = mapper_ui(mobility_data, "Player Name", "Mobility")
+                throw_map = mapper_ui(throwing_data, "Player Name", "Throwing")
+
+                if running_data is not None and not running_data.empty and "AthleteID" in running_data.columns:
+                    running_data["AthleteID"] = running_data["AthleteID"].map(lambda x: run_map.get(x, x))
+                if mobility_data is not None and not mobility_data.empty and "Player Name" in mobility_data.columns:
+                    mobility_data["Player Name"] = mobility_data["Player Name"].map(lambda x: mob_map.get(x, x))
+                if throwing_data is not None and not throwing_data.empty and "Player Name" in throwing_data.columns:
+                    throwing_data["Player Name"] = throwing_data["Player Name"].map(lambda x: throw_map.get(x, x))
+                name_maps = {"running": run_map, "mobility": mob_map, "throwing": throw_map}
+
+            st.markdown("### 2️⃣  Select Player & Date")
+            if st.session_state.player_db.empty:
+                st.warning("Add players first on the **Player Database** tab.")
+                st.stop()
+
+            sel_idx = player_picker("Player", key="report_player")
+            if sel_idx is None:
+                st.stop()
+            assess_date = st.date_input("Assessment Date", datetime.date.today())
+            win_c1, win_c2, win_c3 = st.columns(3)
+            windowed = win_c1.toggle("Only sessions around this date", key="use_window",
+                                     help="Rows are picked by their session date column; sources "
+                                          "without one always contribute every row.")
+            window = baseline = None
+            if windowed:
+                window_days = win_c2.number_input("Window (± days)", 0, 366, ASSESSMENT_WINDOW_DAYS, key="window_days")
+                window = assessment_window(assess_date, window_days)
+                if win_c3.checkbox("Compare with a baseline window", key="compare_windows"):
+                    base_date = win_c3.date_input("Baseline date", assess_date - datetime.timedelta(days=90),
+                                                  key="baseline_date")
+                    baseline = assessment_window(base_date, window_days)
+            roster = roster_as_of(assess_date)
+            prow = roster.loc[sel_idx]
+
+            player_info = report_player_info(prow, assess_date, st.session_state.get("notes_df"))
+            grp = player_info["Age Group"]
+
+            lookup  = age_group_lookup(roster)
+            if waiting:
+                progressive_preview(waiting, player_info, lookup)
+                st.stop()
+            sources = {"blast": blast_data, "flightscope": fs_agg if stream_fs else flightscope_data,
+                       "throwing": throwing_data, "running": running_data,
+                       "mobility": mobility_data, "dynamo": dynamo_data}
+            indexes = {}
+            if window is not None:
+                for src, df in sources.items():
+                    if not isinstance(df, pd.DataFrame) or df.empty:
+                        continue
+                    tag = (frame_tags[src], tuple(sorted(name_maps.get(src, {}).items())))
+                    indexes[src] = session_memory().get(
+                        f"session_index:{src}", tag,
+                        lambda df=df, src=src: SessionIndex(df, REPORT_NAME_COLUMNS[src]), "indexes")
+                undated = [src for src, ix in indexes.items() if not ix.dated]
+                if stream_fs and fs_agg is not None:
+                    undated.append("flightscope (streamed)")
+                st.caption(f"Sessions {window[0]:%m/%d/%Y} – {window[1] - pd.Timedelta(days=1):%m/%d/%Y}"
+                           + (f"; every row used for {', '.join(undated)}" if undated else ""))
+            metrics = report_metrics(player_info, sources, lookup, window, indexes)
+            slices  = metrics["rows"]
+            max_ev, p90_ev = metrics["max_ev"], metrics["p90_ev"]
+
+            # cohort percentiles: each source's per-player values feed the sorted arrays
+            roster_tag = (st.session_state["store_versions"]["player_db"], assess_date)
+            cohorts = session_memory().get("cohort_index", roster_tag, lambda: CohortIndex(roster_tag), "indexes")
+            members = cohort_members(roster)
+            if any([cohorts.ingest(source, df, members) for source, df in sources.items()]):
+                session_memory().put("cohort_index", roster_tag, cohorts, "indexes")  # re-measure
+
+            rank_by_pos = st.checkbox("Rank within position", key="rank_by_position")
+            cohort_pos  = player_info["Position"] if rank_by_pos else None
+            percentiles = report_percentiles(cohorts, metrics, player_info, cohort_pos)
+
+            if baseline is not None:
+                with st.expander("📈 Baseline vs. assessment window", expanded=True):
+                    before = report_metrics(player_info, sources, lookup, baseline, indexes)
+                    st.caption(f"Baseline {baseline[0]:%m/%d/%Y} – {baseline[1] - pd.Timedelta(days=1):%m/%d/%Y}")
+                    st.dataframe(window_comparison(shown_metrics(before), shown_metrics(metrics)),
+                                 use_container_width=True, hide_index=True)
+
+            with st.expander("🏆 Cohort leaderboard"):
+                lb_metrics = cohorts.metrics_for(grp, cohort_pos)
+                if not lb_metrics:
+                    st.info("Upload data above to rank this cohort.")
+                else:
+                    lb_metric = st.selectbox("Metric", lb_metrics, key="lb_metric")
+                    st.dataframe(cohorts.leaderboard(grp, lb_metric, cohort_pos),
+                                 use_container_width=True, hide_index=True)
+
+            with st.expander("📦 Roster analytics export"):
+                st.caption("Every roster player's computed metrics, Dynamo asymmetries and threshold "
+                           f"bands as of {assess_date:%m/%d/%Y}.")
+                # built only when asked for, then reused until an upload, the roster or thresholds change
+                thresholds = st.session_state["thresholds"]
+                version = (roster_tag, tuple(sorted(cohorts.digests.items())),
+                           hashlib.blake2b(repr(thresholds).encode(), digest_size=16).hexdigest())
+                pieces  = lambda: roster_analytics(sources, roster, thresholds)
+                stamp   = assess_date.strftime("%Y%m%d")
+                c1, c2  = st.columns(2)
+                with c1:
+                    lazy_download("Parquet (zip)", "analytics_parquet", version,
+                                  lambda: (write_analytics_parquet(pieces(), BytesIO()).getvalue(),
+                                           f"roster_analytics_{stamp}.zip", "application/zip"),
+                                  key="dl_analytics_parquet", keep_old=True)
+                with c2:
+                    lazy_download("Excel", "analytics_excel", version,
+                                  lambda: (write_analytics_excel(pieces(), BytesIO()).getvalue(),
+                                           f"roster_analytics_{stamp}.xlsx",
+                                           "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+                                  key="dl_analytics_excel", keep_old=True)
+
+            if st.checkbox("Show debug preview"):
+                for src, df in slices.items():
+                    st.markdown(f"**{src.title()}** *(first 3 rows)*")
+                    if df is None:
+                        st.write("None")
+                    elif df.empty:
+                        st.write("Empty")
+                    else:
+                        st.dataframe(df.head(3))
+                used = sum(int(df.memory_usage(index=False, deep=True).sum())
+                           for df in slices.values() if isinstance(df, pd.DataFrame))
+                st.caption(f"Report slices hold {used/1e6:.2f} MB of {report_projected_bytes(sources)/1e6:.2f} MB "
+                           f"projected source columns (peak bound {report_peak_bound(sources)/1e6:.0f} MB)")
+
+            st.markdown("---")
+            if st.toggle("Live preview", value=True, key="live_preview",
+                         help="HTML rendering of the report; the PDF is only built on Generate."):
+                st.html(render_report_html(
+                    player_info, metrics["averages"], metrics["ranges"], max_ev, p90_ev,
+                    metrics["velocities"], metrics["speeds"], metrics["speed_ranges"],
+                    st.session_state["thresholds"], mobility=metrics["mobility"],
+                    dynamo_data=slices["dynamo"], percentiles=percentiles,
+                ))
+
+            st.markdown("---")
+            profile = st.radio("PDF profile", list(PDF_PROFILES), horizontal=True, key="pdf_profile",
+                               help="compact: print-density JPEG charts, downsampled logo, binary streams "
+                                    "— for archiving and bulk sends.")
+
+            # unchanged inputs → same digest → serve the stored PDF without rebuilding
+            report_key = report_digest(
+                {**player_info, "Percentiles": percentiles},
+                {**slices, "flightscope": slices["flightscope"] if fs_agg is None else metrics["flightscope_agg"]},
+                st.session_state["thresholds"].get(grp, {}),
+                profile,
+            )
+            pdf_bytes = session_memory().get("pdf", report_key, lambda: report_cache_get(report_key), "pdfs")
+
+            if st.button("Generate Combined PDF", use_container_width=True):
+                if pdf_bytes is None:
+                    with st.spinner("Building PDF…"):
+                        pdf_bytes = report_pdf(player_info, metrics, percentiles, profile=profile)
+                    report_cache_put(report_key, pdf_bytes)
+                    session_memory().put("pdf", report_key, pdf_bytes, "pdfs")
+                st.success("PDF ready!")
+            if st.checkbox("Show PDF size by section"):
+                with st.spinner("Measuring sections…"):
+                    sizes = pdf_section_bytes(player_info, metrics, percentiles, profile=profile)
+                total = sizes.pop("total")
+                st.dataframe(pd.DataFrame({"Section": list(sizes), "KB": [v / 1024 for v in sizes.values()],
+                                           "Share": [f"{v / total:.0%}" for v in sizes.values()]}),
+                             hide_index=True)
+                st.caption(f"{profile}: {total / 1024:.0f} KB in total")
+            if pdf_bytes is not None:
+                st.download_button("⬇️  Download",
+                                   data=pdf_bytes,
+                                   file_name=f"{player_info['Name'].replace(' ','')}.pdf",
+                                   mime="application/pdf")
+
+        # B) Template's
+        with tmpl_tab:
+            st.subheader("📥  Blank CSV Templates")
+            def template_btn(fname, cols):
+                st.download_button(fname, template_csv(tuple(cols)), file_name=fname, mime="text/csv")
+
+            colA, colB = st.columns(2)
+            with colA:
+                template_btn("running_speed_template.csv",
+                             ["Player Name", "30yd Time", "60yd Time", "5-5-10 Shuttle Time"])
+                template_btn("core_strength_template.csv",
+                             ["Player Name", "Core Strength Measurement"])
+            with colB:
+                template_btn("throwing_velocities_template.csv",
+                             ["Player Name", "Positional Throw Velocity", "Pulldown Velocity",
+                              "FB Velocity", "SL Velocity", "CB Velocity", "CH Velocity"])
+                template_btn("mobility_template.csv",
+                             ["Player Name", "Ankle Mobility", "Thoracic Mobility", "Lumbar Mobility"])
+
+if __name__ == "__main__":  # `streamlit run` executes the script as __main__
+    main()
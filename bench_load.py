@@ -0,0 +1,267 @@
+"""Concurrent-session load test for the app (how many staff can work at once).
+
+    python bench_load.py [--sessions 1,2,4,8] [--rounds 3] [--players 60] [--balls 3000] [--budget-ms 2000]
+
+Builds a synthetic facility in a temporary folder (roster, notes, thresholds and
+one export per device, ingested through the inbox store as inbox_daemon.py
+does), then for each session count starts that many AppTest sessions side by
+side in one process, as the Streamlit server would. Every session repeats a
+testing-day flow: load the device files, map a raw name, switch to its own
+player, generate the PDF, edit a threshold and download the thresholds.
+Each session count starts from a cold server (caches and stored PDFs cleared).
+
+Prints rerun latency percentiles, throughput and resident memory growth per
+session count, then the p90 of each step. Exits non-zero when a session
+fails or a session count's p90 rerun exceeds --budget-ms.
+
+AppTest cannot drive st.file_uploader, so the device files reach the sessions
+through the ingested store ("Use inbox data") instead of browser uploads.
+"""
+import argparse
+import contextlib
+import datetime
+import gc
+import logging
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+import TNXLMIAMIREport as app
+
+APP_PATH = os.path.abspath(app.__file__)
+LOGO_PATH = os.path.join(os.path.dirname(APP_PATH), "assets", "tnxl_logo.png")
+RERUN_BUDGET_MS = 2000
+SESSION_TIMEOUT = 300  # s per rerun; a stuck session fails the run instead of hanging it
+STEPS = ["open", "map names", "switch player", "generate pdf", "edit threshold", "download thresholds"]
+
+# ─────────────────────────────────────────────────────────────────────────────
+# SYNTHETIC FACILITY
+# ─────────────────────────────────────────────────────────────────────────────
+def player_name(i):
+    return f"Player {i:03d}"
+
+def raw_name(i):
+    """How timing gates / mobility sheets spell the player (mapped back in the app)."""
+    return f"Player {i}"
+
+def write_facility(root, players, balls, seed=11):
+    rng   = np.random.default_rng(seed)
+    today = datetime.date.today()
+    ids   = np.arange(1, players + 1)
+    names = [player_name(i) for i in ids]
+    pd.DataFrame({
+        "Name": names,
+        "DOB": [(today - datetime.timedelta(days=int(d))).strftime("%m/%d/%Y")
+                for d in rng.integers(12 * 365, 18 * 365, players)],
+        "Age": "", "Class": rng.integers(2026, 2031, players), "High School": rng.choice(["North", "South", "Central"], players),
+        "Height": rng.integers(62, 76, players), "Weight": rng.integers(120, 200, players),
+        "Position": rng.choice(["Pitcher", "Catcher", "1B", "SS", "CF"], players),
+        "BattingHandedness": "Right", "ThrowingHandedness": "Right",
+    }).to_csv(os.path.join(root, app.DATABASE_FILENAME), index=False)
+    pd.DataFrame({"Name": names, "Date": today.isoformat(), "Note": "Balanced, quiet load, works the middle."}
+                 ).to_csv(os.path.join(root, app.NOTES_FILENAME), index=False)
+
+    def dates(n):
+        return [(today - datetime.timedelta(days=int(d))).isoformat() for d in rng.integers(0, 30, n)]
+
+    swings = players * 10
+    who    = rng.choice(names, swings)
+    ev     = rng.normal(80, 9, balls).clip(40, 115)
+    launch, spray = np.radians(rng.normal(14, 12, balls)), np.radians(rng.normal(0, 20, balls))
+    v      = ev * 1.4667  # mph → ft/s
+    zero   = np.zeros(balls)
+    poly   = lambda *c: [";".join(f"{x:.3f}" for x in row) for row in np.column_stack(c)]
+    exports = {
+        "blast": pd.DataFrame({"Name": who, "Date": dates(swings),
+                               "Bat Speed (mph)": rng.normal(66, 5, swings).round(1),
+                               "Attack Angle (deg)": rng.normal(10, 4, swings).round(1),
+                               "Power (kW)": rng.normal(3.2, 0.6, swings).round(2),
+                               "Time to Contact (sec)": rng.normal(0.15, 0.01, swings).round(3)}),
+        "flightscope": pd.DataFrame({"Batter": rng.choice(names, balls), "Date": dates(balls),
+                                     "Exit_Speed": ev.round(1),
+                                     "Hit_Poly_X": poly(rng.normal(0, 0.6, balls), v * np.cos(launch) * np.sin(spray), zero, zero, zero),
+                                     "Hit_Poly_Y": poly(zero, v * np.cos(launch) * np.cos(spray), zero, zero, zero),
+                                     "Hit_Poly_Z": poly(rng.normal(2.6, 0.5, balls), v * np.sin(launch),
+                                                        np.full(balls, -16.1), zero, zero)}),
+        "throwing": pd.DataFrame({"Player Name": names, "Positional Throw Velocity": rng.normal(72, 6, players).round(1),
+                                  "Pulldown Velocity": rng.normal(78, 6, players).round(1),
+                                  "FB Velocity": rng.normal(76, 6, players).round(1)}),
+        "running": pd.DataFrame({"AthleteID": [raw_name(i) for i in ids], "30yd Time": rng.normal(4.0, 0.2, players).round(2),
+                                 "60yd Time": rng.normal(7.3, 0.3, players).round(2),
+                                 "5-5-10 Shuttle Time": rng.normal(4.6, 0.2, players).round(2)}),
+        "mobility": pd.DataFrame({"Player Name": [raw_name(i) for i in ids],
+                                  "Ankle Mobility": rng.integers(1, 4, players), "Thoracic Mobility": rng.integers(1, 4, players),
+                                  "Lumbar Mobility": rng.integers(1, 4, players)}),
+        "dynamo": pd.DataFrame({"Name": np.repeat(names, 2), "Movement": "Hip", "Type": ["IR", "ER"] * players,
+                                "ROM Asymmetry (%)": rng.integers(0, 15, 2 * players),
+                                "Force Asymmetry (%)": rng.integers(0, 15, 2 * players)}),
+    }
+    inbox = os.path.join(root, "inbox")
+    os.makedirs(inbox)
+    store = os.path.join(root, app.INGEST_DIR)
+    for source, df in exports.items():
+        path = os.path.join(inbox, f"{source}.csv")
+        df.to_csv(path, index=False)
+        result = app.ingest_file(path, store)
+        if result["source"] != source:
+            raise SystemExit(f"{source} export was ingested as {result['source']!r} ({result['status']})")
+    if os.path.exists(LOGO_PATH):
+        shutil.copy(LOGO_PATH, os.path.join(root, app.LOGO_FILENAME))
+    return len(names)
+
+# ─────────────────────────────────────────────────────────────────────────────
+# SESSIONS
+# ─────────────────────────────────────────────────────────────────────────────
+def share_test_runtime():
+    """AppTest installs a mock Runtime (and the appTest config flag) for the
+    length of each run and removes them afterwards, so overlapping runs would
+    pull them from under each other: install one for the whole load test.
+    Like the server, every session also shares one compiled script."""
+    from unittest.mock import MagicMock
+
+    from streamlit import config
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+    from streamlit.runtime.media_file_manager import MediaFileManager
+    from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+    from streamlit.testing.v1 import app_test, local_script_runner
+
+    runtime = MagicMock(spec=Runtime)
+    runtime.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    runtime.cache_storage_manager = MemoryCacheStorageManager()
+    Runtime._instance = runtime
+    app_test.Runtime = type("SessionRuntime", (Runtime,), {})  # per-run (re)assignments land here
+    config.set_option("global.appTest", True)
+    app_test.patch_config_options = lambda overrides: contextlib.nullcontext()
+    script_cache = ScriptCache()
+    app_test.ScriptCache = local_script_runner.ScriptCache = lambda: script_cache
+
+def cold_server():
+    import streamlit as st
+
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    shutil.rmtree(app.REPORT_CACHE_DIR, ignore_errors=True)
+    gc.collect()
+
+def rss_mb():
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:  # no procfs: peak instead of current
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+def session_flow(at, player, rounds, record):
+    """One staff member's scripted testing-day flow; each step is one timed rerun."""
+    def step(name, action):
+        t0 = time.perf_counter()
+        action().run(timeout=SESSION_TIMEOUT)
+        record(name, time.perf_counter() - t0)
+        if at.exception:
+            raise RuntimeError(f"{name}: {at.exception[0].value}")
+
+    step("open", lambda: at)
+    for r in range(rounds):
+        i = (player + r - 1) % record.players + 1
+        step("map names", lambda: at.selectbox(key=f"map_Running_{raw_name(i)}").set_value(player_name(i)))
+        step("switch player", lambda: at.text_input(key="report_player_search").input(player_name(i)))
+        step("generate pdf", lambda: next(b for b in at.button if b.label == "Generate Combined PDF").click())
+        if r == 0:
+            at.toggle(key="thr_edit_mode").set_value(True).run(timeout=SESSION_TIMEOUT)
+        mid = next(n for n in at.number_input if str(n.key).endswith("_mid"))
+        step("edit threshold", lambda: mid.set_value(round(min(mid.value + 0.01, mid.max), 2)))
+        step("download thresholds", lambda: at.button(key="dl_thresh_prepare").click())
+
+def run_level(sessions, rounds, players):
+    from streamlit.testing.v1 import AppTest
+
+    cold_server()
+    before = rss_mb()
+    samples, errors, lock = [], [], threading.Lock()
+    start = threading.Barrier(sessions)
+
+    def record(name, seconds):
+        with lock:
+            samples.append((name, seconds))
+    record.players = players
+
+    apps = [AppTest.from_file(APP_PATH, default_timeout=SESSION_TIMEOUT) for _ in range(sessions)]
+
+    def worker(s):
+        try:
+            start.wait()
+            session_flow(apps[s], s * rounds, rounds, record)
+        except Exception as e:  # reported after the level, the other sessions keep going
+            with lock:
+                errors.append(f"session {s}: {type(e).__name__}: {e}")
+
+    t0 = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(s,)) for s in range(sessions)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - t0
+    growth = rss_mb() - before  # sessions (and their state) are still alive here
+    return samples, errors, wall, growth
+
+# ─────────────────────────────────────────────────────────────────────────────
+# REPORT
+# ─────────────────────────────────────────────────────────────────────────────
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", default="1,2,4,8", help="comma-separated concurrent session counts")
+    parser.add_argument("--rounds", type=int, default=3, help="flow repetitions per session")
+    parser.add_argument("--players", type=int, default=60, help="synthetic roster size")
+    parser.add_argument("--balls", type=int, default=3000, help="synthetic Flightscope rows")
+    parser.add_argument("--budget-ms", type=float, default=RERUN_BUDGET_MS, help="p90 rerun budget")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)  # Streamlit's bare-mode (no `streamlit run`) warnings
+    levels = sorted({int(n) for n in args.sessions.split(",")})
+
+    here = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="tnxl_load_") as root:
+        os.chdir(root)  # the app reads its tables, store and report cache relative to the working dir
+        try:
+            players = write_facility(root, args.players, args.balls)
+            share_test_runtime()
+            run_level(1, 1, players)  # lazy imports (matplotlib, ReportLab) happen here, not in the first level
+            results = {n: run_level(n, args.rounds, players) for n in levels}
+        finally:
+            os.chdir(here)
+
+    print(f"{players} players, {args.balls} batted balls, {args.rounds} rounds per session")
+    print(f"{'sessions':>8} {'reruns':>7} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8} "
+          f"{'reruns/s':>9} {'RSS +MB':>8} {'MB/sess':>8}")
+    failed = False
+    for n, (samples, errors, wall, growth) in results.items():
+        ms = np.array([s for _, s in samples]) * 1000
+        p50, p90, p99 = np.percentile(ms, [50, 90, 99]) if len(ms) else (np.nan,) * 3
+        print(f"{n:>8} {len(ms):>7} {p50:>8.0f} {p90:>8.0f} {p99:>8.0f} {ms.max(initial=0):>8.0f} "
+              f"{len(ms) / wall:>9.2f} {growth:>8.1f} {growth / n:>8.1f}")
+        for e in errors:
+            print(f"  {e}")
+        failed |= bool(errors) or p90 > args.budget_ms
+
+    print("\np90 ms by step")
+    print(f"{'step':<20}" + "".join(f"{n:>8}" for n in results))
+    for name in STEPS:
+        row = [np.percentile([s * 1000 for k, s in samples if k == name] or [np.nan], 90)
+               for samples, *_ in results.values()]
+        print(f"{name:<20}" + "".join(f"{v:>8.0f}" for v in row))
+    within = [n for n, (samples, errors, *_) in results.items()
+              if not errors and np.percentile([s for _, s in samples] or [np.inf], 90) * 1000 <= args.budget_ms]
+    print(f"\nlargest session count within the {args.budget_ms:.0f} ms p90 budget: {max(within) if within else 'none'}")
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""PDF size check for the output profiles (compact must stay well below standard).
+
+    python bench_pdf_size.py [--balls 3000] [--logo assets/tnxl_logo.png] [--max-ratio 0.5]
+
+Builds the same synthetic report (full Flightscope heatmap + spray chart, every
+table, the real logo) once per profile in PDF_PROFILES, prints each section's
+byte contribution and exits non-zero when the compact PDF is larger than
+--max-ratio times the standard one.
+"""
+import argparse
+import logging
+import sys
+
+import numpy as np
+import pandas as pd
+
+import TNXLMIAMIREport as app
+
+MAX_COMPACT_RATIO = 0.5
+
+def synthetic_report(balls, seed=7):
+    rng = np.random.default_rng(seed)
+    ev = rng.normal(82, 9, balls).clip(40, 115)
+    launch, spray = np.radians(rng.normal(14, 12, balls)), np.radians(rng.normal(0, 20, balls))
+    v = ev * 1.4667  # mph → ft/s
+    vx, vy, vz = v * np.cos(launch) * np.sin(spray), v * np.cos(launch) * np.cos(spray), v * np.sin(launch)
+    x0, z0 = rng.normal(0, 0.6, balls), rng.normal(2.6, 0.5, balls)
+    poly = lambda *c: [";".join(f"{v:.4f}" for v in row) for row in np.column_stack(c)]
+    zero = np.zeros(balls)
+    flightscope = pd.DataFrame({
+        "Batter": "Synthetic Player", "Exit_Speed": ev.round(1),
+        "Hit_Poly_X": poly(x0, vx, zero, zero, zero),
+        "Hit_Poly_Y": poly(zero, vy, zero, zero, zero),
+        "Hit_Poly_Z": poly(z0, vz, np.full(balls, -16.1), zero, zero),
+    })
+    dynamo = pd.DataFrame({"Name": "Synthetic Player", "Movement": ["Hip", "Hip", "Shoulder"],
+                           "Type": ["IR", "ER", "IR"], "ROM Asymmetry (%)": [5, 7, 4]})
+    info = {"Name": "Synthetic Player", "Age Group": app.AGE_LABELS[1], "Position": "SS", "Class": 2028,
+            "High School": "Miami HS", "Height": 70, "Weight": 165, "B/T": "R/R", "DOB": "2010-04-01",
+            "AssessmentDate": "05/01/2026", "LatestNoteText": "Quick hands, repeatable swing."}
+    metrics = {
+        "rows": {"flightscope": flightscope, "dynamo": dynamo}, "flightscope_agg": None,
+        "max_ev": float(ev.max()), "p90_ev": float(np.percentile(ev, 90)),
+        "averages": {"Bat Speed (mph)": 68.2, "Attack Angle (°)": 9.5},
+        "ranges": {"Bat Speed (mph)": (64.0, 72.5), "Attack Angle (°)": (6.0, 13.0)},
+        "velocities": {"Pulldown Velocity": 78.0}, "speeds": {"30yd Time": 3.9},
+        "speed_ranges": {"30yd Time": (3.8, 4.0)}, "mobility": {},
+    }
+    return info, metrics
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--balls", type=int, default=3000, help="synthetic batted balls")
+    parser.add_argument("--logo", default="assets/tnxl_logo.png")
+    parser.add_argument("--max-ratio", type=float, default=MAX_COMPACT_RATIO)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)  # Streamlit's bare-mode (no `streamlit run`) warnings
+
+    app.LOGO_FILENAME = args.logo
+    info, metrics = synthetic_report(args.balls)
+    thresholds = app.broadcast_metrics_to_ages(app.metric_thresholds)
+    sizes = {p: app.pdf_section_bytes(info, metrics, thresholds=thresholds, profile=p) for p in app.PDF_PROFILES}
+
+    print(f"{'section':<10}" + "".join(f"{p:>12}" for p in sizes))
+    for sec in [*app.PDF_SECTIONS, "page", "total"]:
+        print(f"{sec:<10}" + "".join(f"{s[sec] / 1024:>10.1f}KB" for s in sizes.values()))
+    ratio = sizes["compact"]["total"] / sizes["standard"]["total"]
+    print(f"compact / standard: {ratio:.2f} (limit {args.max_ratio:.2f})")
+    sys.exit(0 if ratio <= args.max_ratio else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Import-time benchmark for the app module (startup budget guard).
+
+    python bench_startup.py [--runs 5] [--budget-ms 1500]
+
+Each run imports TNXLMIAMIREport in a fresh interpreter, the same cold start a
+new Streamlit worker pays before the first page paints. Exits non-zero when the
+median import time exceeds the budget or when a library that should load
+lazily (matplotlib, the ReportLab layout engine, difflib) is imported eagerly.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+APP_MODULE = "TNXLMIAMIREport"
+STARTUP_BUDGET_MS = 1500
+LAZY_MODULES = ["matplotlib", "matplotlib.pyplot", "reportlab.platypus", "reportlab.lib.styles", "difflib"]
+
+PROBE = f"""
+import json, sys, time
+t0 = time.perf_counter()
+import {APP_MODULE}
+ms = (time.perf_counter() - t0) * 1000
+print(json.dumps({{"ms": ms, "eager": [m for m in {LAZY_MODULES!r} if m in sys.modules]}}))
+"""
+
+def measure(runs):
+    here = os.path.dirname(os.path.abspath(__file__))
+    samples, eager = [], set()
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", PROBE], cwd=here, check=True,
+                             capture_output=True, text=True).stdout
+        result = json.loads(out.strip().splitlines()[-1])
+        samples.append(result["ms"])
+        eager.update(result["eager"])
+    return samples, sorted(eager)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=STARTUP_BUDGET_MS)
+    args = parser.parse_args()
+
+    samples, eager = measure(args.runs)
+    median = statistics.median(samples)
+    print(f"import {APP_MODULE}: median {median:.0f} ms "
+          f"(min {min(samples):.0f}, max {max(samples):.0f}, {args.runs} runs, budget {args.budget_ms:.0f} ms)")
+    failed = False
+    if eager:
+        print("eagerly imported: " + ", ".join(eager))
+        failed = True
+    if median > args.budget_ms:
+        print("over startup budget")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Upload-parse benchmark for the Reports tab (concurrent vs one-by-one).
+
+    python bench_uploads.py [--rows 200000] [--runs 5] [--workers 4] [--tolerance 0.25]
+
+Builds one synthetic export per device in memory (Flightscope with --rows rows,
+Blast a quarter of that, the small sheets a twentieth) and parses the set the
+way the Reports tab does: read_upload_csv one file after another, then
+read_uploads on a pool of --workers threads. Prints the median wall time of
+each and the speed-up next to the number of usable cores; on one core no
+overlap is possible and the two should match. Exits non-zero when the frames
+differ or the pool is slower than one-by-one by more than --tolerance.
+"""
+import argparse
+import logging
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import TNXLMIAMIREport as app
+
+def exports(rows, seed=5):
+    rng   = np.random.default_rng(seed)
+    names = [f"Player {i:03d}" for i in range(60)]
+    num   = lambda n, loc, scale: rng.normal(loc, scale, n).round(2)
+    small = max(rows // 20, 1)
+    frames = {
+        "flightscope": pd.DataFrame({"Batter": rng.choice(names, rows), "Exit_Speed": num(rows, 80, 9),
+                                     **{f"Hit_Poly_{a}": [f"{x:.3f};{y:.3f};-16.1;0;0" for x, y in rng.normal(0, 30, (rows, 2))]
+                                        for a in "XYZ"}}),
+        "blast":       pd.DataFrame({"Name": rng.choice(names, rows // 4), "Bat Speed (mph)": num(rows // 4, 66, 5),
+                                     "Attack Angle (deg)": num(rows // 4, 10, 4), "Power (kW)": num(rows // 4, 3.2, 0.6)}),
+        "throwing":    pd.DataFrame({"Player Name": rng.choice(names, small), "Pulldown Velocity": num(small, 78, 6)}),
+        "running":     pd.DataFrame({"AthleteID": rng.choice(names, small), "30yd Time": num(small, 4.0, 0.2)}),
+        "mobility":    pd.DataFrame({"Player Name": rng.choice(names, small), "Ankle Mobility": rng.integers(1, 4, small)}),
+        "dynamo":      pd.DataFrame({"Name": rng.choice(names, small), "Movement": "Hip", "Type": "IR",
+                                     "ROM Asymmetry (%)": rng.integers(0, 15, small)}),
+    }
+    return {src: df.to_csv(index=False).encode("utf-8") for src, df in frames.items()}
+
+def timed(fn, runs):
+    samples, out = [], None
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        out = fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples), out
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000, help="Flightscope rows (the largest file)")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=app.UPLOAD_PARSE_WORKERS)
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown of the pool")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)  # Streamlit's bare-mode warnings
+
+    files = exports(args.rows)
+    cores = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count()
+    mb    = sum(map(len, files.values())) / 1e6
+    one_ms, one = timed(lambda: {src: app.read_upload_csv(data) for src, data in files.items()}, args.runs)
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        pool_ms, (frames, errors) = timed(lambda: app.read_uploads(files, pool), args.runs)
+    largest_ms, _ = timed(lambda: app.read_upload_csv(files["flightscope"]), args.runs)
+
+    print(f"{len(files)} uploads, {mb:.1f} MB, {cores} usable core(s), {args.runs} runs")
+    print(f"one by one        {one_ms:8.0f} ms")
+    print(f"{args.workers} threads         {pool_ms:8.0f} ms   speed-up {one_ms / pool_ms:.2f}x")
+    print(f"largest file only {largest_ms:8.0f} ms")
+    failed = False
+    if errors or frames.keys() != one.keys() or not all(frames[s].equals(one[s]) for s in one):
+        print("concurrent parse differs from one-by-one: " + (", ".join(errors.values()) or "frames"))
+        failed = True
+    if pool_ms > one_ms * (1 + args.tolerance):
+        print("pool slower than one-by-one")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Watch an inbox folder and ingest device exports as they arrive.
+
+    python inbox_daemon.py [--inbox inbox] [--store ingested] [--interval 5] [--once]
+
+Blast / Flightscope / timing-gate / Dynamo (etc.) CSVs dropped into the inbox
+are recognised from their header, deduplicated by content hash and only rows
+not stored yet are appended to the ingested data store, which the Reports tab
+reads when nothing is uploaded in the browser. Every processed file is listed
+in <store>/processed_files.csv, so restarts never ingest a file twice.
+"""
+import argparse
+import logging
+import os
+import time
+
+import TNXLMIAMIREport as app
+
+log = logging.getLogger("inbox")
+
+RETRY_LIMIT        = 5   # read errors on one unchanged file before it waits for the file to change
+RETRY_BASE_SECONDS = 10  # delay before the first retry, doubled after each further error
+
+def ready_files(inbox, pending, done):
+    """CSV paths whose size and mtime held still for a full poll (export finished)."""
+    ready = []
+    for entry in os.scandir(inbox):
+        if not entry.is_file() or not entry.name.lower().endswith(".csv"):
+            continue
+        st = entry.stat()
+        stamp = (st.st_size, st.st_mtime_ns)
+        if done.get(entry.path) == stamp:
+            continue
+        if pending.get(entry.path) == stamp:
+            ready.append((entry.path, stamp))
+            del pending[entry.path]
+        else:
+            pending[entry.path] = stamp
+    return sorted(ready)
+
+def poll(inbox, store_dir, pending, done, known, retries):
+    """Ingest the files that are ready. A read error is retried with backoff
+    (*retries*: path → (stamp, errors, next attempt)) up to RETRY_LIMIT times;
+    a file whose content failed to parse is done until it changes."""
+    now = time.monotonic()
+    for path, stamp in ready_files(inbox, pending, done):
+        last = retries.get(path)
+        if last is not None and last[0] == stamp and now < last[2]:
+            continue
+        result = app.ingest_file(path, store_dir, known)
+        if result["status"].startswith("error"):
+            errors = last[1] + 1 if last is not None and last[0] == stamp else 1
+            retries[path] = (stamp, errors, now + RETRY_BASE_SECONDS * 2 ** (errors - 1))
+            if errors >= RETRY_LIMIT:
+                done[path] = stamp
+                log.warning("%s: giving up after %d errors until the file changes", result["file"], errors)
+        else:
+            done[path] = stamp
+            retries.pop(path, None)
+        if result["status"] == "ingested":
+            log.info("%s → %s: %s new of %s rows", result["file"], result["source"],
+                     result["new_rows"], result["rows"])
+        else:
+            log.info("%s: %s", result["file"], result["status"])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--inbox", default="inbox")
+    parser.add_argument("--store", default=app.INGEST_DIR)
+    parser.add_argument("--interval", type=float, default=5.0, help="seconds between scans")
+    parser.add_argument("--once", action="store_true", help="ingest what is there and exit")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+
+    os.makedirs(args.inbox, exist_ok=True)
+    os.makedirs(args.store, exist_ok=True)
+    known = app.processed_digests(args.store)
+    pending, done, retries = {}, {}, {}
+    log.info("watching %s (store: %s, %d files already processed)", args.inbox, args.store, len(known))
+    if args.once:
+        # a single pass has no previous scan to compare against: take the files as they are
+        ready_files(args.inbox, pending, done)
+        poll(args.inbox, args.store, pending, done, known, retries)
+        return
+    while True:
+        poll(args.inbox, args.store, pending, done, known, retries)
+        time.sleep(args.interval)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+"""Local HTTP report service for other facility tools (scheduling app, athlete portal).
+
+    python report_service.py [--host 127.0.0.1] [--port 8510] [--workers 2] [--data-root .]
+
+    POST /report   {"player": "John Doe", "date": "2026-05-01", "profile": "compact",
+                    "data": {"blast": "exports/blast.csv", "flightscope": "exports/fs.csv"}}
+                   → the combined PDF (application/pdf)
+    GET  /metrics?player=John+Doe&date=2026-05-01&blast=exports/blast.csv
+                   → the same report's numbers as JSON
+    GET  /health
+
+The player is looked up by name in the player database, exactly as the Reports
+tab picks them; "date" defaults to today and "by_position" ranks within the
+player's position. "window_days" keeps only sessions within that many days of
+the date (sources without a session date column use every row). "profile"
+picks the PDF output profile (standard / compact, the latter for archiving and
+bulk sends). Data references are CSV paths relative to --data-root; sources
+that are not referenced come from the ingested store (inbox_daemon.py).
+
+Reports are built by a pool of worker processes that are started and warmed
+(app module imported, ReportLab styles, logo, roster and compiled thresholds
+loaded, matplotlib ready) before the port opens, so a request only pays for
+the report itself. Finished PDFs share the app's report cache.
+"""
+import argparse
+import concurrent.futures
+import datetime
+import functools
+import json
+import logging
+import multiprocessing
+import os
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+
+import TNXLMIAMIREport as app
+
+log = logging.getLogger("report_service")
+
+SOURCES = list(app.REPORT_NAME_COLUMNS)
+MAX_BODY_BYTES = 64 * 1024
+STREAM_FLIGHTSCOPE_BYTES = 10 * 1024 * 1024  # bigger Flightscope files are aggregated in chunks
+
+class RequestError(Exception):
+    def __init__(self, status, message):
+        super().__init__(status, message)
+        self.status, self.message = status, message
+
+# ─────────────────────────────────────────────────────────────────────────────
+# WORKER SIDE (runs in the pool processes)
+# ─────────────────────────────────────────────────────────────────────────────
+_worker = {}
+
+def warm(data_root, store_dir, ready):
+    """Pool initializer: pay every one-off cost before the first request arrives."""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot  # noqa: F401
+
+    app.pdf_styles()
+    app.range_bar_flowable()
+    for profile in app.PDF_PROFILES:
+        app.logo_image_bytes(app.LOGO_FILENAME, profile)
+    _worker.update(root=os.path.realpath(data_root), store=store_dir, ready=ready)
+    tables()
+
+def ping(_):
+    _worker["ready"].wait(timeout=120)  # every worker holds one ping, so all of them ran warm()
+    return os.getpid()
+
+def _mtime(path):
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+def tables():
+    """Roster / notes / thresholds, reloaded only when the app has saved new versions."""
+    paths = (app.DATABASE_FILENAME, app.NOTES_FILENAME, app.THRESHOLDS_FILENAME)
+    stamp = tuple(_mtime(p) for p in paths)
+    if _worker.get("stamp") != stamp:
+        _worker.update(stamp=stamp,
+                       player_db=app.load_player_db(app.DATABASE_FILENAME),
+                       notes=app.load_notes(app.NOTES_FILENAME),
+                       thresholds=app.load_thresholds(app.THRESHOLDS_FILENAME))
+    return _worker["player_db"], _worker["notes"], _worker["thresholds"]
+
+# frames are only read by the report code, never modified, so cached ones are handed out as-is
+@functools.lru_cache(maxsize=32)
+def _read_csv(path, mtime):
+    return pd.read_csv(path, encoding_errors="replace")
+
+@functools.lru_cache(maxsize=len(SOURCES))
+def _read_ingested(source, store_dir, mtime):
+    return app.load_ingested(source, store_dir)
+
+def load_source(source, ref):
+    if not ref:
+        store = _worker["store"]
+        return _read_ingested(source, store, _mtime(app._ingest_path(source, store)))
+    root = _worker["root"]
+    path = os.path.realpath(os.path.join(root, ref))
+    if os.path.commonpath([root, path]) != root:
+        raise RequestError(400, f"{source}: {ref} is outside the data root")
+    if not os.path.isfile(path):
+        raise RequestError(404, f"{source}: {ref} not found")
+    if source == "flightscope" and os.path.getsize(path) > STREAM_FLIGHTSCOPE_BYTES:
+        return app.stream_flightscope(path)
+    return _read_csv(path, os.path.getmtime(path))
+
+def build(request, want_pdf):
+    """The Reports tab's computation for one player; PDF bytes or a JSON-ready dict."""
+    player_db, notes, thresholds = tables()
+    try:
+        as_of = datetime.date.fromisoformat(request.get("date") or datetime.date.today().isoformat())
+    except (TypeError, ValueError):
+        raise RequestError(400, "date must be YYYY-MM-DD")
+    profile = request.get("profile") or "standard"
+    if profile not in app.PDF_PROFILES:
+        raise RequestError(400, f"profile must be one of {', '.join(app.PDF_PROFILES)}")
+    window = None
+    if request.get("window_days") not in (None, ""):
+        try:
+            window = app.assessment_window(as_of, int(request["window_days"]))
+        except (TypeError, ValueError):
+            raise RequestError(400, "window_days must be a whole number of days")
+    refs = request.get("data") or {}
+    unknown = sorted(set(refs) - set(SOURCES))
+    if unknown:
+        raise RequestError(400, f"unknown data source(s): {', '.join(unknown)}; expected {', '.join(SOURCES)}")
+
+    roster = app.derive_ages(player_db, as_of)
+    key = str(request.get("player", "")).lower().strip()
+    hits = roster.index[roster["Name"].astype(str).str.lower().str.strip() == key]
+    if not key or hits.empty:
+        raise RequestError(404, f"player {request.get('player')!r} is not in the player database")
+    info = app.report_player_info(roster.loc[hits[-1]], as_of, notes)
+
+    sources = {src: load_source(src, refs.get(src)) for src in SOURCES}
+    metrics = app.report_metrics(info, sources, app.age_group_lookup(roster), window)
+    cohorts, members = app.CohortIndex(), app.cohort_members(roster)
+    for src, df in sources.items():
+        cohorts.ingest(src, df, members)
+    position = info["Position"] if request.get("by_position") else None
+    shown = app.shown_metrics(metrics)
+    percentiles = app.report_percentiles(cohorts, metrics, info, position)
+
+    if want_pdf:
+        rows = metrics["rows"]
+        digest = app.report_digest(
+            {**info, "Percentiles": percentiles},
+            {**rows, "flightscope": metrics["flightscope_agg"] if metrics["flightscope_agg"] is not None
+                                    else rows["flightscope"]},
+            thresholds.get(info["Age Group"], {}),
+            profile,
+        )
+        pdf = app.report_cache_get(digest)
+        if pdf is None:
+            pdf = app.report_pdf(info, metrics, percentiles, thresholds, profile)
+            app.report_cache_put(digest, pdf)
+        return pdf
+
+    return {
+        "player": {k: None if pd.isna(v) else getattr(v, "item", lambda: v)() for k, v in info.items()},
+        "metrics": {m: _number(v) for m, v in shown.items()},
+        "ranges": {m: [_number(lo), _number(hi)]
+                   for m, (lo, hi) in {**metrics["ranges"], **metrics["speed_ranges"]}.items()},
+        "percentiles": {m: _number(p) for m, p in percentiles.items()},
+        "cohort": {"age_group": info["Age Group"], "position": position},
+        "window": None if window is None else [window[0].date().isoformat(),
+                                               (window[1] - pd.Timedelta(days=1)).date().isoformat()],
+    }
+
+def _number(v):
+    v = app.safe_float(v)
+    return None if v is None or pd.isna(v) else v
+
+def run(request, want_pdf):
+    try:
+        return 200, build(request, want_pdf)
+    except RequestError as e:
+        return e.status, {"error": e.message}
+
+# ─────────────────────────────────────────────────────────────────────────────
+# HTTP SIDE (main process: parse, hand off to the pool, reply)
+# ─────────────────────────────────────────────────────────────────────────────
+class Handler(BaseHTTPRequestHandler):
+    pool = None  # set in main()
+    protocol_version = "HTTP/1.1"
+
+    def _reply(self, status, body, content_type="application/json"):
+        if not isinstance(body, bytes):
+            body = json.dumps(body, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _dispatch(self, request, want_pdf):
+        t0 = time.perf_counter()
+        try:
+            status, result = self.pool.submit(run, request, want_pdf).result()
+        except Exception as e:
+            log.exception("%s %s failed", self.command, self.path)
+            status, result = 500, {"error": f"{type(e).__name__}: {e}"}
+        log.info("%s %s → %s in %.0f ms", self.command, self.path, status, (time.perf_counter() - t0) * 1000)
+        if status == 200 and want_pdf:
+            name = str(request["player"]).replace(" ", "")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/pdf")
+            self.send_header("Content-Disposition", f'attachment; filename="{name}.pdf"')
+            self.send_header("Content-Length", str(len(result)))
+            self.end_headers()
+            self.wfile.write(result)
+        else:
+            self._reply(status, result)
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path == "/health":
+            return self._reply(200, {"status": "ok"})
+        if url.path != "/metrics":
+            return self._reply(404, {"error": "GET /metrics or /health"})
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        request = {"player": query.pop("player", ""), "date": query.pop("date", None),
+                   "by_position": query.pop("by_position", "").lower() in {"1", "true", "yes"},
+                   "window_days": query.pop("window_days", None),
+                   "data": query}
+        self._dispatch(request, want_pdf=False)
+
+    def do_POST(self):
+        if urlsplit(self.path).path != "/report":
+            return self._reply(404, {"error": "POST /report"})
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY_BYTES:
+            return self._reply(413, {"error": "request body too large"})
+        try:
+            request = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            return self._reply(400, {"error": "body must be JSON"})
+        if not isinstance(request, dict) or not isinstance(request.get("data", {}), dict):
+            return self._reply(400, {"error": 'expected {"player": ..., "date": ..., "data": {source: path}}'})
+        self._dispatch(request, want_pdf=True)
+
+    def log_message(self, fmt, *args):  # request lines are logged by _dispatch
+        pass
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8510)
+    parser.add_argument("--workers", type=int, default=2, help="report worker processes")
+    parser.add_argument("--data-root", default=".", help="data references resolve below this folder")
+    parser.add_argument("--store", default=app.INGEST_DIR, help="ingested store for unreferenced sources")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+
+    t0 = time.perf_counter()
+    ctx  = multiprocessing.get_context()
+    pool = concurrent.futures.ProcessPoolExecutor(args.workers, mp_context=ctx, initializer=warm,
+                                                  initargs=(args.data_root, args.store, ctx.Barrier(args.workers)))
+    # one task per worker forces every process to start (and warm) before we listen
+    pids = set(pool.map(ping, range(args.workers)))
+    log.info("%d workers warm in %.1f s", len(pids), time.perf_counter() - t0)
+
+    Handler.pool = pool
+    server = ThreadingHTTPServer((args.host, args.port), Handler)
+    log.info("serving on http://%s:%d", args.host, args.port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        pool.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+import logging
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+logging.disable(logging.WARNING)  # Streamlit's bare-mode (no `streamlit run`) warnings
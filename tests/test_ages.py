@@ -0,0 +1,34 @@
+"""derive_ages: age on the as-of date, age-group bucketing and a stable schema."""
+import datetime
+
+import pandas as pd
+
+import TNXLMIAMIREport as app
+
+AS_OF = datetime.date(2026, 6, 1)
+
+def test_age_turns_on_the_birthday():
+    roster = pd.DataFrame({"Name": ["Eve", "Day", "After"], "DOB": ["05/31/2010", "06/01/2010", "06/02/2010"]})
+    out = app.derive_ages(roster, AS_OF)
+    assert out["Age"].tolist() == [16, 16, 15]
+    assert str(out["Age"].dtype) == "Int64"
+
+def test_age_groups_follow_the_bins():
+    ages = [11, 12, 13, 14, 15, 16, 18, 19, 25]
+    out = app.derive_ages(pd.DataFrame({"Name": map(str, ages), "Age": ages}), AS_OF)
+    assert out["Age Group"].tolist() == ["unknown", *[app.AGE_LABELS[0]] * 2, *[app.AGE_LABELS[1]] * 2,
+                                         *[app.AGE_LABELS[2]] * 2, *[app.AGE_LABELS[3]] * 2]
+
+def test_unparseable_dob_keeps_the_stored_age():
+    roster = pd.DataFrame({"Name": ["A", "B"], "DOB": ["not a date", ""], "Age": [17, None]})
+    out = app.derive_ages(roster, AS_OF)
+    assert out["Age"].tolist() == [17, pd.NA]
+    assert out["Age Group"].tolist() == [app.AGE_LABELS[2], "unknown"]
+
+def test_empty_or_dobless_roster_still_has_both_columns():
+    for roster in [pd.DataFrame(columns=app.expected_columns), pd.DataFrame({"Name": ["A"]})]:
+        out = app.derive_ages(roster, AS_OF)
+        assert {"Age", "Age Group"} <= set(out.columns)
+        assert str(out["Age"].dtype) == "Int64"
+        assert (out["Age Group"] == "unknown").all()
+        assert app.age_group_lookup(out).isin(["unknown"]).all()
@@ -0,0 +1,27 @@
+"""The app on a fresh install: no roster, notes or thresholds files on disk."""
+import os
+
+import pandas as pd
+import pytest
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "TNXLMIAMIREport.py")
+
+@pytest.fixture
+def fresh_app(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    st.cache_resource.clear()  # the shared store would otherwise outlive the test
+    yield AppTest.from_file(APP, default_timeout=120).run()
+    st.cache_resource.clear()
+
+def test_every_tab_renders_with_an_empty_roster(fresh_app):
+    assert not fresh_app.exception
+    assert any("Add players first" in w.value for w in fresh_app.warning)
+
+def test_save_note_without_a_player_is_refused(fresh_app):
+    fresh_app.text_area(key="new_note_text").input("Quick hands").run()
+    fresh_app.button(key="save_note").click().run()
+    assert not fresh_app.exception
+    assert any("Select a player" in w.value for w in fresh_app.warning)
+    assert not os.path.exists("scout_notes.csv") or pd.read_csv("scout_notes.csv").empty
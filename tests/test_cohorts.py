@@ -0,0 +1,77 @@
+"""Cohort percentiles: shared per-source batches moved incrementally between uploads."""
+import numpy as np
+import pandas as pd
+import pytest
+
+import TNXLMIAMIREport as app
+
+ROSTER = pd.DataFrame({
+    "Name":      ["Ann", "Bo", "Cy", "Di", "Ed"],
+    "Age Group": ["varsity (16–18)"] * 4 + ["jv (14–15)"],
+    "Position":  ["C", "SS", "C", "SS", "C"],
+})
+
+def throws(*rows):
+    return pd.DataFrame(rows, columns=["Player Name", "Throw Velocity (mph)"])
+
+@pytest.fixture(autouse=True)
+def fresh_batches():
+    app.cohort_batches.clear()
+
+@pytest.fixture
+def measured(monkeypatch):
+    sizes = []
+    per_player = app.per_player_metrics
+    def counting(source, df):
+        sizes.append(len(df))
+        return per_player(source, df)
+    monkeypatch.setattr(app, "per_player_metrics", counting)
+    return sizes
+
+def cohort(df, tag="t"):
+    index = app.CohortIndex(tag)
+    index.ingest("throwing", df, app.cohort_members(ROSTER))
+    return index
+
+def arrays(index):
+    (batch,) = index.batches.values()
+    return batch.arrays
+
+FIRST = throws(("Ann", 80), ("Bo", 75), ("Ann", 82), ("Cy", 75), ("Ed", 65))  # Bo and Cy tie
+NEXT  = throws(("Ann", 80), ("Bo", 77), ("Ann", 82), ("Di", 75), ("Ed", 65))
+
+def test_changed_upload_measures_only_changed_players(measured):
+    index = cohort(FIRST)
+    assert index.ingest("throwing", NEXT, app.cohort_members(ROSTER))
+    assert measured == [5, 2]  # Bo changed and Di new (Cy gone: nothing to measure)
+
+    full = cohort(NEXT, tag="other")
+    assert arrays(index).keys() == arrays(full).keys()
+    for key, arr in arrays(full).items():
+        np.testing.assert_array_equal(arrays(index)[key], arr)
+    pd.testing.assert_frame_equal(index.batches["throwing"].players.sort_index(),
+                                  full.batches["throwing"].players.sort_index())
+
+def test_same_upload_is_a_no_op_and_shared_across_sessions(measured):
+    one, two = cohort(FIRST), cohort(FIRST.copy())
+    assert not one.ingest("throwing", FIRST, app.cohort_members(ROSTER))
+    assert one.batches["throwing"] is two.batches["throwing"]
+    assert measured == [5]
+
+def test_percentiles_rank_ties_at_mid_rank_across_batches():
+    index = cohort(NEXT)
+    grp = "varsity (16–18)"
+    assert index.percentile(grp, "Throw Velocity (mph)", 81) == pytest.approx(250 / 3)  # 75, 77, [81]
+    assert index.percentile(grp, "Throw Velocity (mph)", 75) == pytest.approx(50 / 3)   # tied with Di
+    assert index.percentile(grp, "Throw Velocity (mph)", 77, position="SS") == 75.0
+    assert index.percentile("college (18+)", "Throw Velocity (mph)", 80) is None
+    board = index.leaderboard(grp, "Throw Velocity (mph)")
+    assert board["Player"].tolist() == ["Ann", "Bo", "Di"]
+    # ranks add up over several batches' arrays; lower times rank higher
+    split = [np.array([4.0, 4.5]), np.array([4.2])]
+    assert app.CohortIndex.percentiles(split, "30yd Time", np.array([4.1]))[0] == pytest.approx(200 / 3)
+
+def test_removed_upload_empties_the_cohort():
+    index = cohort(FIRST)
+    assert index.ingest("throwing", None, app.cohort_members(ROSTER))
+    assert index.metrics_for("varsity (16–18)") == []
@@ -0,0 +1,71 @@
+"""Streamed Flightscope aggregate: chunked accumulators agree with the in-memory numbers."""
+import numpy as np
+import pandas as pd
+import pytest
+
+import TNXLMIAMIREport as app
+
+@pytest.fixture(scope="module")
+def export(tmp_path_factory):
+    rng = np.random.default_rng(7)
+    n = 1500
+    df = pd.DataFrame({
+        "Batter":           rng.choice(["Ann Lee", "ann lee ", "Bo Diaz", "Cy Park"], n),
+        "Exit Speed (mph)": rng.normal(80, 8, n).round(1),
+        "Hit_Poly_X":       [f"{x:.2f};{vx:.2f};0;0;0" for x, vx in rng.uniform(-1, 1, (n, 2)) * [1, 30]],
+        "Hit_Poly_Y":       [f"0;{vy:.2f};0;0;0" for vy in rng.uniform(60, 120, n)],
+        "Hit_Poly_Z":       [f"{z:.2f};{vz:.2f};-16;0;0" for z, vz in rng.uniform([1, 5], [4, 40], (n, 2))],
+        "Pitch Type":       "FB",  # not read by the stream
+    })
+    df.loc[::50, "Exit Speed (mph)"] = np.nan
+    path = tmp_path_factory.mktemp("fs") / "flightscope.csv"
+    df.to_csv(path, index=False)
+    return path, df
+
+def test_per_player_values_match_the_full_frame(export):
+    path, df = export
+    agg = app.stream_flightscope(str(path), chunksize=256)
+    nm  = df["Batter"].str.lower().str.strip()
+    ev  = df["Exit Speed (mph)"].groupby(nm)
+    got = agg.per_player()
+    assert agg.rows == len(df)
+    assert sorted(got.index) == ["ann lee", "bo diaz", "cy park"]
+    pd.testing.assert_series_equal(got["Balls"].sort_index(), ev.count(), check_names=False, check_index_type=False)
+    np.testing.assert_allclose(got["Mean EV (mph)"].sort_index(), ev.mean())
+    np.testing.assert_array_equal(got["Max EV (mph)"].sort_index(), ev.max())
+    np.testing.assert_allclose(got["90th % EV (mph)"].sort_index(), ev.quantile(0.9), atol=app.EV_SKETCH_STEP)
+
+    top, p90 = agg.summary()
+    assert top == df["Exit Speed (mph)"].max()
+    assert p90 == pytest.approx(df["Exit Speed (mph)"].quantile(0.9), abs=app.EV_SKETCH_STEP)
+
+def test_chunk_size_and_merging_do_not_change_the_totals(export):
+    path, df = export
+    whole = app.stream_flightscope(str(path), chunksize=len(df))
+    small = app.stream_flightscope(str(path), chunksize=100)
+    halves = app.FlightscopeAggregate()
+    halves.add_chunk(df.iloc[:700])
+    other = app.FlightscopeAggregate()
+    other.add_chunk(df.iloc[700:])
+    halves.merge(other)
+    for agg in (small, halves):
+        a, b = agg.per_player().sort_index(), whole.per_player().sort_index()
+        pd.testing.assert_frame_equal(a[["Balls", "Max EV (mph)", "90th % EV (mph)"]],
+                                      b[["Balls", "Max EV (mph)", "90th % EV (mph)"]])
+        np.testing.assert_allclose(a["Mean EV (mph)"], b["Mean EV (mph)"])
+        order = [agg.index[k] for k in sorted(agg.index)]
+        np.testing.assert_array_equal(agg.zone_n[order], whole.zone_n[[whole.index[k] for k in sorted(whole.index)]])
+
+def test_spray_sample_is_bounded_per_player_and_select_keeps_players(export, monkeypatch):
+    path, _ = export
+    monkeypatch.setattr(app, "SPRAY_SAMPLE_PER_PLAYER", 20)
+    agg = app.stream_flightscope(str(path), chunksize=256)
+    counts = agg.sample.groupby("nm").size()
+    assert (counts == 20).all() and len(counts) == 3
+    assert agg.sample["Carry"].notna().all()
+
+    one = agg.select(["bo diaz", "nobody"])
+    assert list(one.per_player().index) == ["bo diaz"]
+    assert one.rows == agg.per_player().loc["bo diaz", "Balls"]
+    assert set(one.sample["nm"]) == {"bo diaz"}
+    assert one.digest != agg.digest
@@ -0,0 +1,53 @@
+"""Inbox ingest: row deduplication across files, parse failures and daemon retries."""
+import inbox_daemon
+import TNXLMIAMIREport as app
+
+BLAST_HEADER = "Name,Bat Speed (mph),Attack Angle (deg)\n"
+
+def write(path, text):
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+def test_same_rows_in_another_number_format_are_not_stored_twice(tmp_path):
+    store = tmp_path / "store"
+    store.mkdir()
+    first  = app.ingest_file(write(tmp_path / "a.csv", BLAST_HEADER + "Ann,70,12\nBo,65.5,8\n"), str(store))
+    second = app.ingest_file(write(tmp_path / "b.csv", "Attack Angle (deg),Name,Bat Speed (mph)\n"
+                                                       "12.0,Ann,70.0\n8,Bo,65.50\n7,Cy,60\n"), str(store))
+    assert (first["status"], first["new_rows"]) == ("ingested", 2)
+    assert (second["status"], second["new_rows"]) == ("ingested", 1)
+    assert len(app.load_ingested("blast", str(store))) == 3
+
+def test_digest_index_rebuilt_from_the_store_matches_new_files(tmp_path):
+    store = tmp_path / "store"
+    store.mkdir()
+    app.ingest_file(write(tmp_path / "a.csv", BLAST_HEADER + "Ann,70,12\n"), str(store))
+    (store / f"blast.v{app.ROW_DIGEST_VERSION}.digests").unlink()  # e.g. a store from before the index
+    app._digest_index.clear()
+    again = app.ingest_file(write(tmp_path / "b.csv", BLAST_HEADER + "Ann,70.0,12\n"), str(store))
+    assert again["new_rows"] == 0
+
+def test_unparseable_file_is_skipped_until_it_changes(tmp_path):
+    store = tmp_path / "store"
+    store.mkdir()
+    bad   = write(tmp_path / "bad.csv", BLAST_HEADER + 'Ann,"70\n')  # quote never closed
+    known = app.processed_digests(str(store))
+    assert app.ingest_file(bad, str(store), known)["status"].startswith("failed")
+    assert app.ingest_file(bad, str(store), known)["status"] == "duplicate"
+    assert app.ingest_file(bad, str(store))["status"] == "duplicate"  # after a restart too
+    write(tmp_path / "bad.csv", BLAST_HEADER + "Ann,70,12\n")
+    assert app.ingest_file(bad, str(store), known)["status"] == "ingested"
+    assert len(app.load_manifest(str(store))) == 2
+
+def test_read_errors_are_retried_with_a_cap(tmp_path, monkeypatch):
+    inbox = tmp_path / "inbox"
+    inbox.mkdir()
+    write(inbox / "locked.csv", BLAST_HEADER + "Ann,70,12\n")
+    calls = []
+    monkeypatch.setattr(app, "ingest_file", lambda path, store, known: calls.append(path) or
+                        {"file": "locked.csv", "status": "error: [Errno 13] Permission denied"})
+    monkeypatch.setattr(inbox_daemon, "RETRY_BASE_SECONDS", 0)
+    pending, done, known, retries = {}, {}, set(), {}
+    for _ in range(4 * inbox_daemon.RETRY_LIMIT):
+        inbox_daemon.poll(str(inbox), str(tmp_path), pending, done, known, retries)
+    assert len(calls) == inbox_daemon.RETRY_LIMIT
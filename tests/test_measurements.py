@@ -0,0 +1,56 @@
+"""Long measurement table and the per-player / summary views grouped from it."""
+import numpy as np
+import pandas as pd
+import pytest
+
+import TNXLMIAMIREport as app
+
+BLAST = pd.DataFrame({
+    "Name":             ["Ann Lee", "ann lee", "Bo Diaz", None],
+    "Bat Speed (mph)":  [70, 72, np.nan, 60],
+    "Plane Score":      [50, 54, 40, 45],
+    "Date":             ["2026-03-01", "2026-03-02", "2026-03-01", "2026-03-01"],
+    "Notes":            ["x", "y", "z", "w"],  # not a report column
+})
+MOBILITY = pd.DataFrame({"Batter": ["Ann Lee", "Ann Lee"], "Ankle Mobility": [3, 5]})
+FLIGHTSCOPE = pd.DataFrame({"Batter": ["Ann Lee"] * 10 + ["Bo Diaz"],
+                            "Exit Speed (mph)": list(range(70, 80)) + [90]})
+DYNAMO = pd.DataFrame({"Name": ["Ann Lee"] * 3, "Movement": ["Hip", "Hip", "Shoulder"],
+                       "Type": ["IR", "IR", "ER"], "ROM Asymmetry (%)": [4.0, 6.0, 2.0]})
+
+def test_rows_are_long_encoded_and_skip_missing_values():
+    long = app.measurement_table({"blast": BLAST})
+    assert list(long.columns) == app.MEASUREMENT_COLUMNS
+    assert {c: str(long[c].dtype) for c in ("player", "source", "metric")} == dict.fromkeys(
+        ("player", "source", "metric"), "category")
+    assert len(long) == 5  # Bo's missing bat speed and the nameless row are left out
+    ann = long[(long["player"] == "ann lee") & (long["metric"] == "Plane Score")]
+    assert ann["rep"].tolist() == [0, 1]
+    assert ann["date"].tolist() == [pd.Timestamp("2026-03-01"), pd.Timestamp("2026-03-02")]
+    assert list(long["metric"].cat.categories) == ["Bat Speed (mph)", "Plane Score"]
+
+def test_player_values_use_each_sources_rule():
+    vals = app.player_values(app.measurement_table(
+        {"blast": BLAST, "mobility": MOBILITY, "flightscope": FLIGHTSCOPE, "dynamo": DYNAMO}))
+    ann = vals.loc["ann lee"]
+    assert ann["Bat Speed (mph)"] == 71 and ann["Plane Score"] == 52   # means
+    assert ann["Ankle"] == 3                                           # first reading
+    assert ann["Max EV (mph)"] == 79
+    assert ann["90th % EV (mph)"] == pytest.approx(np.percentile(range(70, 80), 90))
+    assert np.isnan(vals.loc["bo diaz", "Bat Speed (mph)"])
+    assert not any("ROM" in c for c in vals.columns)                   # Dynamo has its own view
+
+def test_metric_reported_by_two_sources_is_told_apart():
+    both = pd.DataFrame({"Name": ["Ann Lee"], "30yd Velocity": [18.0]})  # a throwing and a running column
+    vals = app.player_values(app.measurement_table({"running": both, "throwing": both.assign(**{"30yd Velocity": [20.0]})}))
+    assert vals.loc["ann lee", "30yd Velocity"] == 20.0                # source order: throwing first
+    assert vals.loc["ann lee", "30yd Velocity (running)"] == 18.0
+
+def test_summary_and_dynamo_views():
+    long = app.measurement_table({"blast": BLAST, "dynamo": DYNAMO})
+    summary = app.metric_summary(long).loc[("blast", "Bat Speed (mph)")]
+    assert (summary["mean"], summary["min"], summary["max"], summary["first"]) == (71, 70, 72, 70)
+    dyn = app.dynamo_means(long)
+    assert dyn[["nm", "Movement", "Type"]].values.tolist() == [["ann lee", "Hip", "IR"], ["ann lee", "Shoulder", "ER"]]
+    assert dyn["ROM Asymmetry (%)"].tolist() == [5.0, 2.0]
+    assert app.dynamo_means(app.measurement_table({"blast": BLAST})).empty
@@ -0,0 +1,85 @@
+"""Scout-note search: the index follows each save / delete / import from its delta."""
+import datetime
+
+import pandas as pd
+import pytest
+
+import TNXLMIAMIREport as app
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # the store loads and persists its CSVs in the working directory
+    return app.SharedStore()
+
+@pytest.fixture
+def resyncs(monkeypatch):
+    count = []
+    resync = app.NoteSearchIndex._resync
+    def counting(self, notes):
+        count.append(1)
+        resync(self, notes)
+    monkeypatch.setattr(app.NoteSearchIndex, "_resync", counting)
+    return count
+
+def note(name, day, text):
+    return pd.DataFrame([{"Name": name, "Date": pd.Timestamp(day), "Note": text}])
+
+def save(store, name, day, text):
+    def append(df):
+        out = pd.concat([df, note(name, day, text)], ignore_index=True)
+        return out, (out.iloc[len(df):], None)
+    store.update("notes_df", append)
+
+def delete(store, text):
+    def drop(df):
+        hit = df.index[df["Note"] == text][:1]
+        return df.drop(hit).reset_index(drop=True), (None, df.loc[hit])
+    store.update("notes_df", drop)
+
+def contents(index):
+    return sorted((n, str(pd.Timestamp(d).date()), t) for n, d, t, _ in index.notes.values())
+
+def matches_fresh(store):
+    fresh = app.NoteSearchIndex()
+    notes, version = store.get("notes_df")
+    fresh.sync(notes, version)
+    index = store.note_search()
+    assert contents(index) == contents(fresh)
+    assert index.vocab == fresh.vocab
+    return index
+
+def test_saves_deletes_and_imports_apply_incrementally(store, resyncs):
+    store.note_search()  # first sync reads the table
+    save(store, "Ann Lee", "2026-03-01", "Late load, hips fly open")
+    save(store, "Bo Diaz", "2026-03-02", "Quick hands; loading early")
+    save(store, "Ann Lee", "2026-03-01", "Late load, hips fly open")  # same note twice
+    delete(store, "Late load, hips fly open")
+    store.upsert("notes_df", pd.concat([note("Cy Park", "2026-03-03", "Hip hinge drill"),
+                                        note("Bo Diaz", "2026-03-02", "Quick hands; loading early")]))
+    index = matches_fresh(store)
+    assert len(resyncs) == 2  # the store index's first sync and the fresh index
+    assert len(index.search("late")) == 1  # one copy left
+    delete(store, "Late load, hips fly open")
+    assert matches_fresh(store).search("late").empty
+    assert len(resyncs) == 3  # only the second fresh index
+
+def test_commit_without_a_delta_falls_back_to_a_resync(store, resyncs):
+    store.note_search()
+    store.update("notes_df", lambda df: note("Ann Lee", "2026-03-01", "Bat drag"))
+    matches_fresh(store)
+    assert len(resyncs) == 3  # first sync, the gap, and the fresh index
+
+def test_search_words_phrases_and_filters(store):
+    for row in [("Ann Lee", "2026-03-01", "Late load, hips fly open"),
+                ("Bo Diaz", "2026-03-05", "Loading late; hips stay closed"),
+                ("Ann Lee", "2026-04-01", "Hips load late now")]:
+        save(store, *row)
+    index = store.note_search()
+    assert len(index.search("hip lat")) == 3                       # words are prefixes, any order
+    assert index.search('"late load"')["Name"].tolist() == ["Ann Lee"]
+    assert index.search("", names=[" ann lee"])["Date"].tolist() == [pd.Timestamp("2026-04-01"),
+                                                                     pd.Timestamp("2026-03-01")]
+    lookup = pd.Series({"bo diaz": "jv (14–15)"})
+    assert index.search("hips", age_groups=["jv (14–15)"], lookup=lookup)["Name"].tolist() == ["Bo Diaz"]
+    assert len(index.search("", start=datetime.date(2026, 3, 2), end=datetime.date(2026, 3, 5))) == 1
+    assert index.search("swing").empty
@@ -0,0 +1,24 @@
+"""The compact PDF profile stays well below the standard one for the same report."""
+from concurrent.futures import ThreadPoolExecutor
+
+import TNXLMIAMIREport as app
+from bench_pdf_size import MAX_COMPACT_RATIO, synthetic_report
+
+BALLS       = 3000
+PDF_ASCII85 = {p: bool(v["ascii85"]) for p, v in app.PDF_PROFILES.items()}
+
+def build(profile):
+    info, metrics = synthetic_report(BALLS)
+    thresholds = app.broadcast_metrics_to_ages(app.metric_thresholds)
+    return app.report_pdf(info, metrics, None, thresholds, profile)
+
+def test_compact_smaller_than_standard():
+    sizes = {p: len(build(p)) for p in ("standard", "compact")}
+    assert sizes["compact"] <= MAX_COMPACT_RATIO * sizes["standard"], sizes
+
+def test_concurrent_builds_keep_their_encoding():
+    # rl_config.useA85 is process-wide: overlapping builds must each get their own profile's setting
+    with ThreadPoolExecutor(4) as pool:
+        pdfs = list(pool.map(build, ["standard", "compact"] * 2))
+    for profile, pdf in zip(["standard", "compact"] * 2, pdfs):
+        assert (b"/ASCII85Decode" in pdf) == PDF_ASCII85[profile], profile
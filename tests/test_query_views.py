@@ -0,0 +1,48 @@
+"""Server-side roster / notes views: prefix search, facets, sorting and paging."""
+import numpy as np
+import pandas as pd
+
+import TNXLMIAMIREport as app
+
+ROSTER = pd.DataFrame({
+    "Name":      ["John Doe", "jane doe", "Ann Lee", "Doug Park", "Bo Diaz", None],
+    "Position":  ["C", "SS", "C", "OF", np.nan, "C"],
+    "Height":    [70, 64, np.nan, 72, 68, 66],
+    "Age Group": ["varsity (16–18)", "jv (14–15)", "varsity (16–18)", "varsity (16–18)", "jv (14–15)", "jv (14–15)"],
+}, index=[10, 11, 12, 13, 14, 15])  # labels need not be positions
+
+def names(index, pos):
+    return index.df.iloc[pos]["Name"].tolist()
+
+def test_prefix_matches_any_word_in_name_order():
+    index = app.QueryIndex(ROSTER, facets=app.ROSTER_FACETS)
+    assert names(index, index.prefix("do")) == ["Doug Park", "jane doe", "John Doe"]
+    assert names(index, index.prefix(" JOHN D")) == ["John Doe"]  # the full name is a key too
+    assert names(index, index.prefix("zz")) == []
+    assert len(index.prefix("")) == len(ROSTER)
+
+def test_facets_filter_and_list_their_values():
+    index = app.QueryIndex(ROSTER, facets=app.ROSTER_FACETS)
+    assert index.facet_values("Position") == ["C", "OF", "SS"]
+    assert index.facet_values("High School") == []  # not a column here
+    assert index.facet_rows("Age Group", "jv (14–15)")["Name"].tolist() == ["jane doe", "Bo Diaz", None]
+    pos = index.matches(prefix="d", filters={"Position": ["C", "OF"], "Age Group": ["varsity (16–18)"]})
+    assert names(index, pos) == ["Doug Park", "John Doe"]
+    assert len(index.matches(filters={"Position": []})) == len(ROSTER)  # an empty filter is no filter
+
+def test_sorting_keeps_blanks_last_either_way():
+    index = app.QueryIndex(ROSTER, facets=app.ROSTER_FACETS)
+    up   = names(index, index.matches(sort_by="Height"))
+    down = names(index, index.matches(sort_by="Height", descending=True))
+    assert up == ["jane doe", None, "Bo Diaz", "John Doe", "Doug Park", "Ann Lee"]
+    assert down == ["Doug Park", "John Doe", "Bo Diaz", None, "jane doe", "Ann Lee"]
+    assert names(index, index.matches(sort_by="Position"))[-1] == "Bo Diaz"
+    assert names(index, index.matches(sort_by="no such column"))[:2] == ["Ann Lee", "Bo Diaz"]
+
+def test_pages_slice_the_matches():
+    index = app.QueryIndex(ROSTER)
+    pos = index.matches()
+    assert index.page(pos, 1, 4)["Name"].tolist() == names(index, pos[:4])
+    assert index.page(pos, 2, 4)["Name"].tolist() == names(index, pos[4:])
+    assert index.page(pos, 0, 4).equals(index.page(pos, 1, 4))
+    assert index.page(pos, 3, 4).empty
@@ -0,0 +1,64 @@
+"""Peak allocation of one report stays within the documented bound (report_peak_bound)."""
+import datetime
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+import TNXLMIAMIREport as app
+
+AS_OF   = datetime.date(2026, 5, 1)
+BALLS   = 50_000
+PLAYERS = 120
+NAMES   = [f"Player {i:03d}" for i in range(PLAYERS)]
+
+def poly(*coeffs):
+    return [";".join(f"{v:.3f}" for v in row) for row in np.column_stack(coeffs)]
+
+def synthetic_sources(balls, seed=5):
+    """Large Flightscope / Blast uploads carrying many columns the report never reads."""
+    rng = np.random.default_rng(seed)
+    ev, zero = rng.normal(82, 9, balls).clip(40, 115), np.zeros(balls)
+    flightscope = pd.DataFrame({
+        "Batter": rng.choice(NAMES, balls), "Exit_Speed": ev.round(1),
+        "Hit_Poly_X": poly(rng.normal(0, 0.6, balls), ev * np.sin(rng.normal(0, 0.3, balls)), zero, zero, zero),
+        "Hit_Poly_Y": poly(zero, ev * 1.3, zero, zero, zero),
+        "Hit_Poly_Z": poly(rng.normal(2.6, 0.5, balls), ev * 0.4, np.full(balls, -16.1), zero, zero),
+        **{f"Extra_{i}": rng.normal(0, 1, balls) for i in range(20)},
+    })
+    swings = balls // 4
+    blast = pd.DataFrame({
+        "Name": rng.choice(NAMES, swings), "Bat Speed (mph)": rng.normal(66, 5, swings),
+        "Attack Angle (deg)": rng.normal(10, 4, swings), **{f"Junk {i}": rng.normal(0, 1, swings) for i in range(10)},
+    })
+    return {"flightscope": flightscope, "blast": blast}
+
+def test_report_peak_within_bound():
+    # one age group: the cohort sources (Blast, Flightscope) select every row, the worst case
+    roster = app.derive_ages(pd.DataFrame({c: "" for c in app.expected_columns}, index=range(PLAYERS)).assign(
+        Name=NAMES, DOB="05/01/2012", Position="SS", Class=2028), AS_OF)
+    info    = app.report_player_info(roster.iloc[0], AS_OF, pd.DataFrame(columns=["Name", "Date", "Note"]))
+    lookup  = app.age_group_lookup(roster)
+    thr     = app.broadcast_metrics_to_ages(app.metric_thresholds)
+    sources = synthetic_sources(BALLS)
+    projected = app.report_projected_bytes(sources)
+    # lazy imports and one-off caches (ReportLab, matplotlib, logo) are not per-report memory
+    small = {src: df.head(200) for src, df in sources.items()}
+    app.report_pdf(info, app.report_metrics(info, small, lookup), thresholds=thr)
+
+    tracemalloc.start()
+    try:
+        base    = tracemalloc.get_traced_memory()[0]
+        metrics = app.report_metrics(info, sources, lookup)
+        metrics_peak = tracemalloc.get_traced_memory()[1] - base
+        pdf     = app.report_pdf(info, metrics, thresholds=thr)
+        report_peak  = tracemalloc.get_traced_memory()[1] - base
+    finally:
+        tracemalloc.stop()
+
+    assert pdf.startswith(b"%PDF")
+    # a copy of either whole upload on the selection path alone exceeds this
+    assert metrics_peak <= app.REPORT_PEAK_MULTIPLE * projected, \
+        f"report_metrics peaked at {metrics_peak / projected:.2f}× the projected columns"
+    bound = app.report_peak_bound(sources)
+    assert report_peak <= bound, f"report peaked at {report_peak / 1e6:.1f} MB, bound {bound / 1e6:.1f} MB"
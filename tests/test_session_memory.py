@@ -0,0 +1,65 @@
+"""Per-session byte accounting and LRU eviction under the session and global budgets."""
+import gc
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import TNXLMIAMIREport as app
+
+KB = 8 * 128  # bytes of np.zeros(128)
+
+@pytest.fixture
+def accountant(monkeypatch):
+    acct = app.MemoryAccountant(session_budget=3 * KB + 500, global_budget=4 * KB + 500)
+    monkeypatch.setattr(app, "memory_accountant", lambda: acct)
+    monkeypatch.setattr(app, "shared_ids", frozenset)
+    return acct
+
+def session(acct, sid):
+    cache = app.DerivedCache(sid)
+    acct.register(cache)
+    return cache
+
+def fill(cache, *slots):
+    for slot in slots:
+        cache.put(slot, 0, np.zeros(128), "frames")
+        time.sleep(0.002)  # distinct last-use stamps
+
+def test_object_bytes_counts_frames_arrays_and_skips_shared():
+    df = pd.DataFrame({"a": np.arange(100, dtype=np.int64)})
+    assert app.object_bytes(np.zeros(10)) == 80
+    assert app.object_bytes(df) == df.memory_usage(index=True, deep=True).sum()
+    assert app.object_bytes({"x": df}, skip=frozenset([id(df)])) < 1000
+    assert app.object_bytes({"x": [df, np.zeros(10)]}) > df.memory_usage(deep=True).sum() + 80
+
+def test_session_budget_drops_least_recently_used(accountant):
+    cache = session(accountant, "a")
+    fill(cache, "one", "two", "three")
+    assert cache.get("one", 0, lambda: pytest.fail("rebuilt a cached entry"), "frames") is not None
+    fill(cache, "four")
+    assert list(cache.entries) == ["three", "one", "four"]
+    assert cache.evicted == 1 and cache.nbytes <= accountant.session_budget
+
+def test_changed_tag_rebuilds_and_an_oversized_entry_is_kept(accountant):
+    cache = session(accountant, "a")
+    fill(cache, "one")
+    assert cache.get("one", 1, lambda: "new", "frames") == "new"
+    cache.put("big", 0, np.zeros(1024), "pdfs")
+    assert list(cache.entries) == ["big"]  # everything else went, the entry just built stays
+    assert cache.by_kind()["pdfs"] == cache.nbytes
+
+def test_global_budget_evicts_the_idlest_session_first(accountant):
+    idle, busy = session(accountant, "idle"), session(accountant, "busy")
+    fill(idle, "a1", "a2", "a3")
+    fill(busy, "b1", "b2", "b3")
+    assert list(idle.entries) == ["a3"] and list(busy.entries) == ["b1", "b2", "b3"]
+    report = accountant.report(current="busy")
+    assert sorted(report["Session"]) == ["busy (this)", "idle"]
+    assert report["Evicted"].sum() == 2
+
+def test_closed_sessions_drop_out_of_the_accounting(accountant):
+    fill(session(accountant, "gone"), "x")
+    gc.collect()
+    assert len(accountant.sessions) == 0
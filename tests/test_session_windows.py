@@ -0,0 +1,50 @@
+"""Session windows: binary-searched row selection agrees with a full-frame mask."""
+import datetime
+
+import numpy as np
+import pandas as pd
+
+import TNXLMIAMIREport as app
+
+def season(n=400, seed=3):
+    rng = np.random.default_rng(seed)
+    dates = pd.Timestamp("2026-02-01") + pd.to_timedelta(rng.integers(0, 120, n), unit="D")
+    df = pd.DataFrame({"Name": rng.choice(["Ann Lee", "ANN LEE", "Bo Diaz", "Cy Park"], n),
+                       "Session Date": dates.strftime("%m/%d/%Y"), "Bat Speed (mph)": rng.normal(70, 5, n)})
+    df.loc[::37, "Session Date"] = None
+    return df
+
+def test_window_rows_match_a_mask_over_the_frame():
+    df = season()
+    index = app.SessionIndex(df, ["Name"])
+    nm = df["Name"].str.lower().str.strip()
+    when = pd.to_datetime(df["Session Date"], format="%m/%d/%Y")
+    for day, days in [(datetime.date(2026, 3, 15), 14), (datetime.date(2026, 2, 1), 0), (datetime.date(2027, 1, 1), 7)]:
+        start, end = app.assessment_window(day, days)
+        for keys in (["ann lee"], ["bo diaz", "cy park"], ["nobody"]):
+            expect = np.flatnonzero(nm.isin(keys) & (when >= start) & (when < end))
+            np.testing.assert_array_equal(index.positions(keys, start, end), expect)
+
+def test_window_covers_whole_days_either_side():
+    start, end = app.assessment_window(datetime.date(2026, 3, 15), 2)
+    assert (start, end) == (pd.Timestamp("2026-03-13"), pd.Timestamp("2026-03-18"))
+    df = pd.DataFrame({"Name": ["Ann"] * 4, "Date": ["2026-03-12", "2026-03-13", "2026-03-17 23:59", "2026-03-18"]})
+    assert app.SessionIndex(df, ["Name"]).positions(["ann"], start, end).tolist() == [1, 2]
+
+def test_undated_sources_span_and_cohort_players():
+    index = app.SessionIndex(season(), ["Name"])
+    assert index.dated
+    assert index.span() == (pd.Timestamp("2026-02-01"), pd.Timestamp("2026-05-31"))
+    lookup = pd.Series({"ann lee": "varsity (16–18)", "bo diaz": "jv (14–15)"})
+    assert index.players_in(lookup, "varsity (16–18)") == ["ann lee"]
+
+    undated = app.SessionIndex(pd.DataFrame({"Name": ["Ann"], "Bat Speed (mph)": [70]}), ["Name"])
+    assert not undated.dated and undated.span() is None
+    assert len(undated.positions(["ann"], *app.assessment_window(datetime.date(2026, 3, 1), 30))) == 0
+
+def test_window_comparison_lists_each_metric_once():
+    out = app.window_comparison({"Bat Speed (mph)": 68.0, "Plane Score": None}, {"Bat Speed (mph)": 71.5, "Max EV (mph)": 90})
+    rows = out.set_index("Metric")
+    assert rows.loc["Bat Speed (mph)", "Change"] == 3.5
+    assert np.isnan(rows.loc["Max EV (mph)", "Baseline"])
+    assert "Plane Score" not in rows.index
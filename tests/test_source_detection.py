@@ -0,0 +1,53 @@
+"""Device detection from a CSV header and routing of a multi-file drop."""
+import io
+
+import pytest
+
+import TNXLMIAMIREport as app
+
+HEADERS = {
+    "blast":       ["Date", "Name", "Bat Speed (mph)", "Attack Angle (deg)", "Plane Score"],
+    "flightscope": ["Batter", "Exit_Speed", "Hit_Poly_X", "Hit_Poly_Y", "Hit_Poly_Z", "Pitch Type"],
+    "throwing":    ["Player Name", "Pulldown Velocity"],           # one metric plus the name column
+    "running":     ["AthleteID", "30yd Time", "60yd Time"],
+    "mobility":    ["Batter", "Ankle Mobility", "Thoracic Mobility", "Lumbar Mobility"],
+    "dynamo":      ["Name", "Movement", "Type", "ROM Asymmetry (%)", "L Max Force (N)"],
+}
+
+@pytest.mark.parametrize("source", sorted(HEADERS))
+def test_each_device_header_is_recognized(source):
+    assert app.detect_source(HEADERS[source]) == source
+    assert app.detect_source([f"  {c.upper()} " for c in HEADERS[source]]) == source
+
+@pytest.mark.parametrize("columns", [
+    ["Batter", "Movement", "Type"],               # identifiers only
+    ["Pulldown Velocity"],                        # a lone metric without the name column
+    ["Name", "Ankle Mobility", "30yd Time", "60yd Time", "Thoracic Mobility"],  # a tie
+    [],
+])
+def test_ambiguous_headers_stay_unrecognized(columns):
+    assert app.detect_source(columns) is None
+
+def test_sniff_columns_decodes_and_drops_a_cut_off_name():
+    assert app.sniff_columns("﻿Name,Bat Speed (mph)\r\n70,1\n".encode("utf-8")) == ["Name", "Bat Speed (mph)"]
+    assert app.sniff_columns("Name,L Max ROM (°)\n".encode("cp1252")) == ["Name", "L Max ROM (°)"]
+    assert app.sniff_columns(b'"Player Name","Pulldown Velocity","Posi') == ["Player Name", "Pulldown Velocity"]
+
+def upload(name, header, rows=3):
+    f = io.BytesIO((",".join(header) + "\n" + "x,1,2,3,4,5\n" * rows).encode("utf-8"))
+    f.name = name
+    return f
+
+def test_route_uploads_keeps_the_first_file_per_source(tmp_path):
+    blast, blast2 = upload("a.csv", HEADERS["blast"]), upload("b.csv", HEADERS["blast"])
+    fs, junk = upload("fs.csv", HEADERS["flightscope"]), upload("junk.csv", ["foo", "bar"])
+    fs.seek(5)
+    routed, unknown, extra = app.route_uploads([blast, fs, junk, blast2])
+    assert routed == {"blast": blast, "flightscope": fs}
+    assert unknown == [junk] and extra == [("blast", blast2)]
+    assert fs.tell() == 5  # sniffing leaves the read position alone
+
+    path = tmp_path / "running.csv"
+    path.write_text(",".join(HEADERS["running"]) + "\n1,4.1,7.0\n")
+    assert app.sniff_source(str(path)) == "running"
+    assert app.route_uploads(None) == ({}, [], [])
@@ -0,0 +1,48 @@
+"""Batted-ball trajectories from Hit_Poly_X/Y/Z quartics, checked against closed forms."""
+import numpy as np
+import pandas as pd
+import pytest
+
+import TNXLMIAMIREport as app
+
+def poly(*coeffs):
+    return ";".join(str(c) for c in (list(coeffs) + [0] * 5)[:5])
+
+def balls(*rows):
+    return pd.DataFrame(rows, columns=["Hit_Poly_X", "Hit_Poly_Y", "Hit_Poly_Z"])
+
+def test_parabola_lands_where_the_quadratic_says():
+    # x = 10t, y = 100t, z = 3 + 50t − 16t²
+    out = app.batted_ball_trajectories(balls((poly(0, 10), poly(0, 100), poly(3, 50, -16))))
+    t = (50 + np.sqrt(50 ** 2 + 4 * 16 * 3)) / 32
+    row = out.iloc[0]
+    assert row["Hang_Time"] == pytest.approx(t, abs=0.01)
+    assert row["Carry"] == pytest.approx(np.hypot(10, 100) * t, rel=0.005)
+    assert row["Land_Y"] == pytest.approx(100 * t, rel=0.005)
+    assert row["Apex"] == pytest.approx(3 + 50 ** 2 / 64, abs=0.05)
+    assert row["Spray_Angle"] == pytest.approx(np.degrees(np.arctan2(10, 100)))
+
+def test_balls_without_a_landing_or_with_bad_polynomials_are_nan():
+    out = app.batted_ball_trajectories(balls(
+        (poly(0, -20), poly(0, 80), poly(4, 30, -16)),   # pulled to −X
+        (poly(0, 1), poly(0, 1), poly(10)),              # never comes down
+        ("1;2;3", poly(0, 1), poly(3, 50, -16)),         # truncated X
+    ))
+    assert out.loc[0, "Spray_Angle"] < 0
+    assert out.loc[1, ["Land_X", "Carry", "Hang_Time"]].isna().all()
+    assert out.loc[1, "Apex"] == pytest.approx(10)
+    assert out.loc[2].isna().all()
+
+def test_chunked_evaluation_matches_one_batch(monkeypatch):
+    rng = np.random.default_rng(1)
+    v = rng.uniform(20, 60, size=(50, 3))
+    df = balls(*[(poly(0, a), poly(0, b), poly(3, c, -16)) for a, b, c in v])
+    whole = app.batted_ball_trajectories(df)
+    monkeypatch.setattr(app, "TRAJ_CHUNK", 7)
+    pd.testing.assert_frame_equal(app.batted_ball_trajectories(df), whole)
+
+def test_parse_poly_coeffs_handles_spacing_and_extra_terms():
+    out = app.parse_poly_coeffs(pd.Series(["1;2;3;4;5", " 1; 2;3;4;5;6", "x;2;3;4;5", None]))
+    np.testing.assert_array_equal(out[0], [1, 2, 3, 4, 5])
+    np.testing.assert_array_equal(out[1], [1, 2, 3, 4, 5])
+    assert np.isnan(out[2:]).all()
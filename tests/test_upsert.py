@@ -0,0 +1,89 @@
+"""Import upsert: key / content semantics and the key index following every commit."""
+import pandas as pd
+import pytest
+
+import TNXLMIAMIREport as app
+
+def roster(*rows):
+    return pd.DataFrame([dict(zip(["Name", "DOB", "Class", "Height"], r)) for r in rows],
+                        columns=app.expected_columns)
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # the store loads and persists its CSVs in the working directory
+    s = app.SharedStore()
+    s.commit("player_db", roster(("Ann Lee", "01/02/2008", 2026, 70), ("Bo Diaz", "03/04/2009", 2027, 68)))
+    return s
+
+@pytest.fixture
+def builds(monkeypatch):
+    count = []
+    init  = app.KeyIndex.__init__
+    def counting(self, *args):
+        count.append(1)
+        init(self, *args)
+    monkeypatch.setattr(app.KeyIndex, "__init__", counting)
+    return count
+
+def names(store):
+    return store.get("player_db")[0]["Name"].tolist()
+
+def test_upsert_inserts_updates_and_skips_by_normalized_name(store):
+    summary = store.upsert("player_db", roster((" ann lee", "01/02/2008", 2026, 71.0),
+                                               ("Bo Diaz", "03/04/2009", 2027, 68.0),
+                                               ("Cy Park", "05/06/2010", 2028, 66)))
+    assert summary == {"inserted": 1, "updated": 1, "unchanged": 1}
+    db = store.get("player_db")[0]
+    assert names(store) == [" ann lee", "Bo Diaz", "Cy Park"]  # replaced in place, new rows appended
+    assert db["Height"].tolist() == [71.0, 68, 66]
+    assert db["Age Group"].notna().all()
+
+def test_later_duplicates_in_an_import_win(store):
+    summary = store.upsert("player_db", roster(("Cy Park", "05/06/2010", 2028, 60),
+                                               ("Cy Park", "05/06/2010", 2028, 62)))
+    assert summary == {"inserted": 1, "updated": 0, "unchanged": 0}
+    assert store.get("player_db")[0]["Height"].tolist()[-1] == 62
+
+def test_unchanged_import_does_not_commit(store):
+    version = store.get("player_db")[1]
+    store.upsert("player_db", roster(("Ann Lee", "01/02/2008", 2026, 70)))
+    assert store.get("player_db")[1] == version
+
+def test_key_index_follows_adds_edits_and_deletes(store, builds):
+    store.upsert("player_db", roster(("Cy Park", "05/06/2010", 2028, 66)))
+    def append(db):
+        out = pd.concat([db, roster(("Di Ng", "07/08/2009", 2027, 64))], ignore_index=True)
+        return out, (out.iloc[len(db):], None)
+    def edit(db):
+        out = db.copy()
+        out.loc[1, "Height"] = 69
+        return out, (out.loc[[1]], db.loc[[1]])
+    def drop(db):
+        return db.drop([0]).reset_index(drop=True), (None, db.loc[[0]])
+    for fn in (append, edit, drop):
+        store.update("player_db", fn)
+    summary = store.upsert("player_db", roster(("Bo Diaz", "03/04/2009", 2027, 69),
+                                               ("Di Ng", "07/08/2009", 2027, 65),
+                                               ("Ann Lee", "01/02/2008", 2026, 70)))
+    assert summary == {"inserted": 1, "updated": 1, "unchanged": 1}
+    assert builds == [1]  # built by the first upsert only
+    assert names(store) == ["Bo Diaz", "Cy Park", "Di Ng", "Ann Lee"]
+
+    db, version = store.get("player_db")
+    fresh = app.KeyIndex(db, *app.UPSERT_KEYS["player_db"], version)
+    index = store._indexes["player_db"]
+    assert index.version == version
+    assert (index.keys == fresh.keys).all() and (index.vals == fresh.vals).all()
+
+def test_commit_without_delta_rebuilds_the_key_index(store, builds):
+    store.upsert("player_db", roster(("Cy Park", "05/06/2010", 2028, 66)))
+    store.update("player_db", lambda db: roster(("Cy Park", "05/06/2010", 2028, 61)))
+    summary = store.upsert("player_db", roster(("Cy Park", "05/06/2010", 2028, 61)))
+    assert summary == {"inserted": 0, "updated": 0, "unchanged": 1}
+    assert builds == [1, 1]
+
+def test_note_import_skips_notes_already_stored(store):
+    note = pd.DataFrame({"Name": ["Ann Lee"], "Date": [pd.Timestamp("2026-03-01")], "Note": ["Quick hands"]})
+    assert store.upsert("notes_df", note)["inserted"] == 1
+    again = note.assign(Date=["2026-03-01"])  # as read back from a CSV
+    assert store.upsert("notes_df", again) == {"inserted": 0, "updated": 0, "unchanged": 1}